@@ -1,22 +1,35 @@
-from flask import Flask, render_template, request, redirect, url_for, session, send_from_directory, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, send_file, send_from_directory, flash, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 import os
 from datetime import datetime
 
+import click
+
+from blob_store import BlobStore, retention_cutoff
+from extraction_sandbox import ExtractionFailed, extract_text
+from fair_scheduler import FairScheduler, QueueTimeout
+from ingest import INGEST_ENABLED, IngestPipeline
+from metrics import instrument_flask, record_cache
+import screening_memo
+
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
+UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', os.path.join(BASE_DIR, 'uploads'))
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'dev-secret-change'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(BASE_DIR, 'app.db')
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join(BASE_DIR, 'app.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Uploads are stored by content hash under uploads/blobs (see blob_store.py and StoredFile)
+UPLOAD_STORE = BlobStore(os.path.join(UPLOAD_FOLDER, 'blobs'))
 
 db = SQLAlchemy(app)
+# Request latency / in-flight / status metrics, exposed on /metrics (Prometheus format)
+instrument_flask(app, 'flask')
 
 
 class HR(db.Model):
@@ -51,6 +64,54 @@ class Job(db.Model):
     title = db.Column(db.String(200), nullable=False)
     company = db.Column(db.String(200), nullable=False)
     tags = db.Column(db.String(200), default='')
+    description = db.Column(db.Text, default='')
+    # Precomputed JD artifacts (see ats_service.JobArtifacts), computed by the job views
+    # (set_description) and whenever ats_service.job_artifacts_version() changes.
+    description_norm = db.Column(db.Text)
+    jd_embedding = db.Column(db.LargeBinary)
+    jd_skills = db.Column(db.Text, default='')
+    artifacts_version = db.Column(db.String(200))
+
+    def set_description(self, description: str) -> bool:
+        """Set the description and precompute its artifacts, before the job is added/committed,
+        so no model runs inside a flush. Returns False if that failed; the artifacts are then
+        computed on first use (see artifacts())."""
+        self.description = description
+        try:
+            self.refresh_artifacts()
+        except Exception:
+            app.logger.exception('Could not precompute artifacts for job %s', self.id)
+            self._clear_artifacts()
+            return False
+        return True
+
+    def _clear_artifacts(self) -> None:
+        self.description_norm = None
+        self.jd_embedding = None
+        self.jd_skills = ''
+        self.artifacts_version = None
+
+    def refresh_artifacts(self) -> None:
+        from ats_service import prepare_job
+        if not self.description:
+            self._clear_artifacts()
+            return
+        fields = prepare_job(self.description).to_fields()
+        fields['jd_skills'] = ','.join(fields['jd_skills'])
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    def artifacts(self):
+        """JobArtifacts for screening, recomputed (and saved by the caller's commit) if stale."""
+        from ats_service import JobArtifacts, job_artifacts_version
+        if not self.description:
+            return None
+        if self.jd_embedding is None or self.artifacts_version != job_artifacts_version():
+            self.refresh_artifacts()
+        skills = [s for s in (self.jd_skills or '').split(',') if s]
+        return JobArtifacts.from_fields(
+            self.description, self.description_norm, self.jd_embedding, skills, self.artifacts_version
+        )
 
 
 class Application(db.Model):
@@ -60,15 +121,392 @@ class Application(db.Model):
     status = db.Column(db.String(50), default='New')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     resume_filename = db.Column(db.String(255))
+    # Filled in by the background ingest pipeline (see _score_application)
+    score = db.Column(db.Integer, index=True)
+    verdict = db.Column(db.String(50))
+    matched_skills = db.Column(db.Text, default='')
+    score_status = db.Column(db.String(20), default='pending', index=True)
+    score_error = db.Column(db.Text)
+    scored_at = db.Column(db.DateTime)
+    # MinHash signature of the resume text and the earlier near-duplicate, if any (see dedup.py)
+    resume_signature = db.Column(db.LargeBinary)
+    # float32 resume embedding; /hr/jobs/<id>/matches reranks the BM25 shortlist with it
+    resume_embedding = db.Column(db.LargeBinary)
+    resume_embedding_version = db.Column(db.String(200))
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('application.id'))
 
     candidate = db.relationship('Candidate', backref=db.backref('applications', lazy=True))
     job = db.relationship('Job', backref=db.backref('applications', lazy=True))
 
 
+class StoredFile(db.Model):
+    """User-facing upload name (e.g. Application.resume_filename) -> content-addressed blob.
+
+    Several names may share one blob. ``kind`` is 'resume' for application
+    resumes (kept) or 'screening' for ad-hoc screening uploads, which the
+    sweeper deletes after UPLOAD_RETENTION_HOURS.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    blob = db.Column(db.String(80), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False, default='resume', index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
+class ScreeningResult(db.Model):
+    """Memoized screening result, from /hr/screening or background scoring (see screening_memo.py).
+
+    Keyed by the normalized JD hash, the resume content hash and
+    ats_service.scorer_version(); a new embedding model, LLM or rules version
+    yields a different key, so old rows are simply never hit again.
+    """
+    __table_args__ = (db.UniqueConstraint('job_hash', 'resume_hash', 'scorer_version'),)
+    id = db.Column(db.Integer, primary_key=True)
+    job_hash = db.Column(db.String(64), nullable=False)
+    resume_hash = db.Column(db.String(64), nullable=False)
+    scorer_version = db.Column(db.String(300), nullable=False, index=True)
+    result = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ResumeLshBucket(db.Model):
+    """LSH band key -> application; an indexed lookup finds near-duplicate candidates."""
+    id = db.Column(db.Integer, primary_key=True)
+    band_key = db.Column(db.String(40), nullable=False, index=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False)
+
+
+def ensure_schema() -> None:
+    """create_all() plus ALTER TABLE (and CREATE INDEX) for columns added to existing
+    tables since the database was created (SQLite has no migrations in this project)."""
+    db.create_all()
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    col_type = column.type.compile(dialect=db.engine.dialect)
+                    conn.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+            # create_all() skips existing tables, so index=True columns added above have no index yet
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)  # CREATE INDEX unless it exists
+        # Full-text index over extracted resume text; rowid = application.id
+        conn.execute(db.text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(content, tokenize='porter unicode61')"
+        ))
+
+
+# -------------------- Upload storage --------------------
+def store_upload(file_storage, name: str, kind: str = 'resume') -> str:
+    """Save an uploaded file in the blob store and index it under ``name`` (caller commits).
+
+    Returns the name actually used: a name already taken by different content
+    gets a short content-hash suffix instead of overwriting it.
+    """
+    key = UPLOAD_STORE.put(file_storage.stream, os.path.splitext(name)[1])
+    existing = StoredFile.query.filter_by(name=name).first()
+    if existing is not None and existing.blob != key:
+        stem, ext = os.path.splitext(name)
+        name = f'{stem}-{key[:8]}{ext}'
+        existing = StoredFile.query.filter_by(name=name).first()
+    if existing is None:
+        db.session.add(StoredFile(name=name, blob=key, kind=kind))
+    else:
+        existing.created_at = datetime.utcnow()  # re-uploaded: restart its retention window
+        if kind == 'resume':
+            existing.kind = kind
+    UPLOAD_STORE.start_sweeper(sweep_uploads)
+    return name
+
+
+def upload_path(name: str):
+    """Filesystem path of an upload; names predating the blob store live flat in UPLOAD_FOLDER."""
+    from pathlib import Path
+    row = StoredFile.query.filter_by(name=name).first()
+    if row is not None:
+        return UPLOAD_STORE.path(row.blob)
+    return Path(app.config['UPLOAD_FOLDER']) / secure_filename(name)
+
+
+def sweep_uploads() -> int:
+    """Drop screening uploads past the retention window, then delete unreferenced blobs."""
+    cutoff = retention_cutoff()
+    with app.app_context():
+        StoredFile.query.filter(
+            StoredFile.kind == 'screening', StoredFile.created_at < datetime.utcfromtimestamp(cutoff)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        live = {row[0] for row in db.session.query(StoredFile.blob).distinct()}
+    return UPLOAD_STORE.sweep(live, cutoff)
+
+
+# -------------------- Screening result memo --------------------
+def upload_hash(name: str) -> str:
+    """SHA-256 of an upload's content: the blob key already is one, legacy files are hashed."""
+    row = StoredFile.query.filter_by(name=name).first()
+    return row.blob[:64] if row is not None else screening_memo.file_hash(upload_path(name))
+
+
+def find_screening_result(key):
+    """The ScreeningResult memoized under (job_hash, resume_hash, scorer_version), or None."""
+    job_hash, resume_hash, version = key
+    row = ScreeningResult.query.filter_by(job_hash=job_hash, resume_hash=resume_hash,
+                                          scorer_version=version).first()
+    record_cache('screening_result', row is not None)
+    return row
+
+
+def save_screening_result(key, result: dict) -> int:
+    """Memoize ``result`` under ``key`` (caller commits) and return its id.
+
+    INSERT OR IGNORE: when a concurrent request stored the same key first, its row is kept.
+    """
+    from sqlalchemy.dialects.sqlite import insert
+    job_hash, resume_hash, version = key
+    db.session.execute(insert(ScreeningResult).values(
+        job_hash=job_hash, resume_hash=resume_hash, scorer_version=version,
+        result=screening_memo.dumps(result), created_at=datetime.utcnow(),
+    ).on_conflict_do_nothing())
+    return db.session.query(ScreeningResult.id).filter_by(
+        job_hash=job_hash, resume_hash=resume_hash, scorer_version=version).scalar()
+
+
+# -------------------- Resume full-text search --------------------
+FTS_PAGE_SIZE = 20
+_SNIPPET_START, _SNIPPET_END = '\ue000', '\ue001'  # private-use markers, swapped for <mark> after escaping
+
+
+def index_resume_fts(app_id: int, text: str) -> None:
+    """Store an application's resume text in the FTS5 index (caller commits)."""
+    db.session.execute(db.text('DELETE FROM resume_fts WHERE rowid = :id'), {'id': app_id})
+    db.session.execute(db.text('INSERT INTO resume_fts(rowid, content) VALUES (:id, :content)'),
+                       {'id': app_id, 'content': text})
+
+
+def index_application_fts(app_row) -> None:
+    """Make a new application searchable right away (text extraction only, no models), even
+    when background scoring is off or behind; scoring indexes it again (caller commits)."""
+    if not app_row.resume_filename:
+        return
+    try:
+        text = extract_text(upload_path(app_row.resume_filename))
+    except ExtractionFailed:
+        return  # background scoring or `flask index-resumes` retries
+    if text.strip():
+        index_resume_fts(app_row.id, text)
+
+
+def _fts_query(raw: str) -> str:
+    """Turn free text into an FTS5 AND query of quoted terms (no operator injection)."""
+    import re
+    terms = re.findall(r'\w+', raw)
+    return ' '.join('"{}"'.format(t) for t in terms)
+
+
+def search_resumes(raw_query: str, page: int = 1, per_page: int = FTS_PAGE_SIZE):
+    """(applications with highlighted snippets, total matches) for one page of an FTS search."""
+    from markupsafe import Markup, escape
+    match = _fts_query(raw_query)
+    if not match:
+        return [], 0
+    total = db.session.execute(db.text('SELECT count(*) FROM resume_fts WHERE resume_fts MATCH :q'),
+                               {'q': match}).scalar()
+    rows = db.session.execute(db.text(
+        "SELECT rowid, snippet(resume_fts, 0, :start, :end, ' … ', 16) FROM resume_fts "
+        "WHERE resume_fts MATCH :q ORDER BY rank LIMIT :limit OFFSET :offset"
+    ), {'q': match, 'start': _SNIPPET_START, 'end': _SNIPPET_END,
+        'limit': per_page, 'offset': (max(page, 1) - 1) * per_page}).all()
+    apps = {a.id: a for a in Application.query.filter(Application.id.in_([r[0] for r in rows])).all()}
+    results = []
+    for app_id, snippet in rows:
+        if app_id in apps:
+            html = str(escape(snippet)).replace(_SNIPPET_START, '<mark>').replace(_SNIPPET_END, '</mark>')
+            results.append((apps[app_id], Markup(html)))
+    return results, total
+
+
+# -------------------- Background scoring --------------------
+def _score_application(app_id: int) -> None:
+    """Extract the resume of one application and score it against its job."""
+    import json
+    import numpy as np
+    from ats_service import encode_resume, extract_resume_text, score_resume_text, scorer_version
+    from bm25_index import get_resume_index
+    from embeddings import current_version
+    from text_processing import process
+    with app.app_context():
+        app_row = db.session.get(Application, app_id)
+        if app_row is None or app_row.score_status == 'done':
+            return
+        if not app_row.resume_filename:
+            app_row.score_status = 'no_resume'
+            db.session.commit()
+            return
+        resume_path = upload_path(app_row.resume_filename)
+        resume_text = extract_resume_text(resume_path)
+        if not resume_text.strip():
+            app_row.score_status = 'failed'
+            app_row.score_error = 'Could not extract text from resume.'
+            db.session.commit()
+            return
+        resume = process(resume_text)
+        # Search indexes are filled even when the job cannot be scored yet
+        get_resume_index().add(app_row.id, resume)
+        index_resume_fts(app_row.id, resume_text)
+        job_artifacts = app_row.job.artifacts()
+        if job_artifacts is None:
+            app_row.score_status = 'no_description'
+            db.session.commit()
+            return
+        original = _register_near_duplicate(app_row, resume_text)
+        if original is not None and original.job_id == app_row.job_id and original.score_status == 'done':
+            # Same (lightly edited) resume already scored for this job: reuse instead of re-scoring
+            app_row.score = original.score
+            app_row.verdict = original.verdict
+            app_row.matched_skills = original.matched_skills
+            app_row.resume_embedding = original.resume_embedding
+            app_row.resume_embedding_version = original.resume_embedding_version
+        else:
+            embedding = encode_resume(resume)
+            app_row.resume_embedding = np.asarray(embedding, dtype=np.float32).tobytes()
+            app_row.resume_embedding_version = current_version()
+            key = (screening_memo.job_hash(job_artifacts.text), upload_hash(app_row.resume_filename),
+                   scorer_version())
+            memo = find_screening_result(key)
+            if memo is not None:
+                result = json.loads(memo.result)
+            else:
+                result = score_resume_text(job_artifacts, resume, resume_embedding=embedding)
+                save_screening_result(key, result)
+            app_row.score = int(result['ATS Score'])
+            app_row.verdict = result['Fit Verdict']
+            app_row.matched_skills = ','.join(result['Matched Skills'])
+        app_row.score_status = 'done'
+        app_row.score_error = None
+        app_row.scored_at = datetime.utcnow()
+        db.session.commit()
+
+
+def _register_near_duplicate(app_row, resume_text: str):
+    """Store the resume's MinHash signature and LSH band keys; return the earlier
+    application it near-duplicates (flagged via duplicate_of_id), or None."""
+    import dedup
+    sig = dedup.signature(resume_text)
+    keys = dedup.band_keys(sig)
+    candidate_ids = {
+        row.application_id
+        for row in ResumeLshBucket.query.filter(ResumeLshBucket.band_key.in_(keys)).all()
+        if row.application_id != app_row.id
+    }
+    original = None
+    if candidate_ids:
+        candidates = Application.query.filter(Application.id.in_(candidate_ids),
+                                              Application.resume_signature.isnot(None)).all()
+        # Prefer an already-scored copy for the same job, then the closest match
+        same_job = [c for c in candidates if c.job_id == app_row.job_id and c.score_status == 'done']
+        match = dedup.best_match(sig, ((c, dedup.from_bytes(c.resume_signature)) for c in same_job)) \
+            or dedup.best_match(sig, ((c, dedup.from_bytes(c.resume_signature)) for c in candidates))
+        if match is not None:
+            original = match[0]
+            app_row.duplicate_of_id = original.duplicate_of_id or original.id
+    app_row.resume_signature = dedup.to_bytes(sig)
+    if not db.session.query(ResumeLshBucket.id).filter_by(application_id=app_row.id).first():
+        db.session.add_all(ResumeLshBucket(band_key=key, application_id=app_row.id) for key in keys)
+    if original is None:
+        outcome = 'unique'
+    elif original.job_id == app_row.job_id and original.score_status == 'done':
+        outcome = 'reused'
+    else:
+        outcome = 'flagged'
+    dedup.DEDUP_LOOKUPS.labels(outcome).inc()
+    return original
+
+
+def _score_application_failed(app_id: int, exc: BaseException) -> None:
+    with app.app_context():
+        app_row = db.session.get(Application, app_id)
+        if app_row is not None:
+            app_row.score_status = 'failed'
+            app_row.score_error = str(exc)[:1000]
+            db.session.commit()
+
+
+scoring_pipeline = IngestPipeline('application_scoring', _score_application, on_failure=_score_application_failed)
+# Interactive screening: per-HR-user concurrency cap, round-robin across users
+SCREENING_SCHEDULER = FairScheduler('hr_screening')
+
+
+def enqueue_scoring(app_id: int) -> None:
+    if INGEST_ENABLED:
+        scoring_pipeline.submit(app_id)
+
+
+def requeue_pending() -> int:
+    """Re-enqueue applications whose scoring was interrupted by a restart.
+
+    Call from exactly one process per deployment: ``app.run`` below, or the first
+    gunicorn worker (``post_worker_init`` in gunicorn.conf.py). Every worker doing it
+    would score each pending row once per worker.
+    """
+    if not INGEST_ENABLED:
+        return 0
+    with app.app_context():
+        ensure_schema()
+        ids = [row.id for row in Application.query.filter_by(score_status='pending').all()]
+    return scoring_pipeline.requeue(ids)
+
+
+@app.cli.command('score-pending')
+def score_pending_command():
+    """Score every application that is still pending (e.g. after a restart) and wait."""
+    ensure_schema()
+    unscored = db.or_(Application.score_status.is_(None), Application.score_status.in_(['pending', 'failed']))
+    ids = [row.id for row in Application.query.filter(unscored).all()]
+    scoring_pipeline.requeue(ids)
+    scoring_pipeline.drain()
+    print(f'Scored {len(ids)} application(s).')
+
+
+@app.cli.command('index-resumes')
+@click.option('--rebuild', is_flag=True, help='Re-extract and re-index every resume, not just missing ones.')
+def index_resumes_command(rebuild):
+    """Backfill the BM25 and full-text resume indexes (and stored embeddings) from uploads/."""
+    import numpy as np
+    from ats_service import encode_resume, extract_resume_text
+    from bm25_index import get_resume_index
+    from embeddings import current_version
+    ensure_schema()
+    index = get_resume_index()
+    version = current_version()
+    added = failed = 0
+    in_fts = {row[0] for row in db.session.execute(db.text('SELECT rowid FROM resume_fts'))}
+    for app_row in Application.query.filter(Application.resume_filename.isnot(None)).all():
+        stale_embedding = app_row.resume_embedding is None or app_row.resume_embedding_version != version
+        if not rebuild and app_row.id in index and app_row.id in in_fts and not stale_embedding:
+            continue
+        try:
+            text = extract_resume_text(upload_path(app_row.resume_filename))
+        except Exception as e:
+            print(f'Application {app_row.id}: {e}')
+            failed += 1
+            continue
+        index.add(app_row.id, text)
+        index_resume_fts(app_row.id, text)
+        if text.strip() and (rebuild or stale_embedding):
+            app_row.resume_embedding = np.asarray(encode_resume(text), dtype=np.float32).tobytes()
+            app_row.resume_embedding_version = version
+        added += 1
+    db.session.commit()
+    index.compact()
+    print(f'Indexed {added} resume(s), {failed} failed; index holds {len(index)} resume(s).')
+
+
 @app.cli.command('init-db')
 def init_db_command():
     db.drop_all()
-    db.create_all()
+    ensure_schema()
+    db.session.execute(db.text('DELETE FROM resume_fts'))
     # seed HR
     hr = HR(username='hr')
     hr.set_password('hr123')
@@ -90,6 +528,74 @@ def init_db_command():
     print('Database initialized with sample data.')
 
 
+@app.cli.command('screen-batch')
+@click.argument('job', type=click.Path(exists=True, dir_okay=False))
+@click.argument('resumes')
+@click.option('-o', '--output', required=True, help='Results .csv, or .parquet dataset directory.')
+@click.option('--workers', type=int, default=None, help='Worker processes (default: CPU count).')
+@click.option('--mode', type=click.Choice(['fast', 'full', 'tiered']), default=None,
+              help='Scoring mode (default: ATS_SCORING_MODE).')
+def screen_batch_command(job, resumes, output, workers, mode):
+    """Screen a directory or glob of resumes against a JD file (see batch_screen.py)."""
+    from batch_screen import run
+    stats = run(job, resumes, output, workers, mode=mode)
+    print(f"Done: {stats['ok']} scored, {stats['error']} failed, {stats['skipped']} skipped "
+          f"in {stats['elapsed_s']}s ({stats['resumes_per_s']}/s)")
+
+
+@app.cli.command('refresh-jobs')
+def refresh_jobs_command():
+    """Recompute stored JD artifacts that were built with another model/rules version."""
+    from ats_service import job_artifacts_version
+    ensure_schema()
+    version = job_artifacts_version()
+    stale = Job.query.filter(Job.description != '', Job.artifacts_version.is_distinct_from(version)).all()
+    for job in stale:
+        job.refresh_artifacts()
+    db.session.commit()
+    print(f'Refreshed artifacts for {len(stale)} job(s) (version {version}).')
+
+
+@app.cli.command('sweep-uploads')
+def sweep_uploads_command():
+    """Delete screening uploads older than UPLOAD_RETENTION_HOURS and unreferenced blobs."""
+    ensure_schema()
+    print(f'Deleted {sweep_uploads()} blob(s).')
+
+
+@app.cli.command('prune-screening-results')
+def prune_screening_results_command():
+    """Delete memoized screening results computed with an outdated scorer version."""
+    from ats_service import SCORING_MODES, scorer_version
+    ensure_schema()
+    current = {scorer_version(mode) for mode in SCORING_MODES}
+    deleted = ScreeningResult.query.filter(ScreeningResult.scorer_version.notin_(current)).delete(
+        synchronize_session=False)
+    db.session.commit()
+    print(f'Deleted {deleted} screening result(s) from older scorer versions.')
+
+
+@app.cli.command('migrate-uploads')
+def migrate_uploads_command():
+    """Move resumes saved flat in uploads/ (before the blob store) into it."""
+    from pathlib import Path
+    ensure_schema()
+    moved = missing = 0
+    for app_row in Application.query.filter(Application.resume_filename.isnot(None)).all():
+        name = app_row.resume_filename
+        if StoredFile.query.filter_by(name=name).first() is not None:
+            continue
+        legacy = Path(app.config['UPLOAD_FOLDER']) / name
+        if not legacy.is_file():
+            missing += 1
+            continue
+        db.session.add(StoredFile(name=name, blob=UPLOAD_STORE.put_file(legacy), kind='resume'))
+        db.session.commit()
+        legacy.unlink()
+        moved += 1
+    print(f'Moved {moved} upload(s) into the blob store; {missing} missing.')
+
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -165,13 +671,41 @@ def hr_dashboard():
     )
 
 
+def _filtered_applications():
+    """Applications for the HR lists, filtered/sorted by the stored ingest score.
+
+    Query args: sort=score|date, min_score=<int>, verdict=<Fit Verdict>.
+    """
+    query = Application.query
+    min_score = request.args.get('min_score', type=int)
+    if min_score is not None:
+        query = query.filter(Application.score >= min_score)
+    verdict = request.args.get('verdict')
+    if verdict:
+        query = query.filter(Application.verdict == verdict)
+    if request.args.get('sort') == 'score':
+        query = query.order_by(Application.score.is_(None), Application.score.desc(), Application.created_at.desc())
+    else:
+        query = query.order_by(Application.created_at.desc())
+    return query.all()
+
+
+VERDICT_OPTIONS = ['Strong Fit', 'Partial Fit', 'Not a Good Fit']
+
+
 @app.route('/hr/resumes')
 def hr_resumes():
     guard = require_hr()
     if guard:
         return guard
-    apps = Application.query.order_by(Application.created_at.desc()).all()
-    return render_template('hr_resumes.html', applications=apps)
+    q = request.args.get('q', '').strip()
+    if q:
+        page = max(request.args.get('page', 1, type=int), 1)
+        results, total = search_resumes(q, page)
+        return render_template('hr_resumes.html', search_enabled=True, search=q, results=results, total=total,
+                               page=page, pages=max(1, -(-total // FTS_PAGE_SIZE)), verdict_options=VERDICT_OPTIONS)
+    apps = _filtered_applications()
+    return render_template('hr_resumes.html', search_enabled=True, applications=apps, verdict_options=VERDICT_OPTIONS)
 
 
 STATUS_OPTIONS = ['New', 'Interview', 'Reviewed', 'Hired', 'Rejected']
@@ -182,19 +716,106 @@ def hr_candidates():
     guard = require_hr()
     if guard:
         return guard
-    apps = Application.query.order_by(Application.created_at.desc()).all()
-    return render_template('hr_candidates.html', applications=apps, status_options=STATUS_OPTIONS)
+    apps = _filtered_applications()
+    return render_template('hr_candidates.html', applications=apps, status_options=STATUS_OPTIONS,
+                           verdict_options=VERDICT_OPTIONS)
 
 
-@app.route('/hr/jobs')
+@app.route('/hr/jobs', methods=['GET', 'POST'])
 def hr_jobs():
     guard = require_hr()
     if guard:
         return guard
+    if request.method == 'POST':
+        title = request.form.get('title', '').strip()
+        company = request.form.get('company', '').strip()
+        if not title or not company:
+            flash('Title and company are required', 'danger')
+            return redirect(url_for('hr_jobs'))
+        job = Job(
+            title=title,
+            company=company,
+            tags=request.form.get('tags', '').strip(),
+        )
+        # JD artifacts are computed here, outside the write transaction
+        precomputed = job.set_description(request.form.get('description', '').strip())
+        db.session.add(job)
+        db.session.commit()
+        flash('Job created', 'success')
+        if not precomputed:
+            flash('The description will be analyzed on first use (the model is unavailable).', 'warning')
+        return redirect(url_for('hr_jobs'))
     jobs = Job.query.order_by(Job.id.desc()).all()
     return render_template('hr_jobs.html', jobs=jobs)
 
 
+@app.post('/hr/jobs/<int:job_id>/description')
+def hr_update_job_description(job_id: int):
+    guard = require_hr()
+    if guard:
+        return guard
+    job = Job.query.get_or_404(job_id)
+    precomputed = job.set_description(request.form.get('description', '').strip())
+    db.session.commit()
+    flash('Job description updated', 'success')
+    if not precomputed:
+        flash('The description will be analyzed on first use (the model is unavailable).', 'warning')
+    return redirect(url_for('hr_jobs'))
+
+
+@app.get('/hr/jobs/<int:job_id>/matches')
+def hr_job_matches(job_id: int):
+    """Best-matching resumes across all applications: BM25 shortlist, embedding rerank.
+
+    Only the shortlisted applications' embeddings are read from the database, so the
+    per-request cost follows the shortlist size, not the number of stored resumes.
+    """
+    guard = require_hr()
+    if guard:
+        return guard
+    import numpy as np
+    from bm25_index import get_resume_index, rerank
+    from embeddings import current_version
+    job = Job.query.get_or_404(job_id)
+    artifacts = job.artifacts()
+    if artifacts is None:
+        return jsonify({"error": "This job has no description to match against."}), 400
+    if db.session.is_modified(job):
+        db.session.commit()
+    k = min(max(request.args.get('k', 20, type=int), 1), 200)
+    shortlist = get_resume_index().search(artifacts.text)
+    # Vectors from another embedding model are not comparable; those rows keep BM25 order
+    version = current_version()
+    vectors = {}
+    ids = [app_id for app_id, _ in shortlist]
+    for start in range(0, len(ids), 500):  # stay under SQLite's bound-parameter limit
+        for app_id, blob in db.session.query(Application.id, Application.resume_embedding).filter(
+            Application.id.in_(ids[start:start + 500]),
+            Application.resume_embedding.isnot(None),
+            Application.resume_embedding_version == version,
+        ):
+            vectors[app_id] = np.frombuffer(blob, dtype=np.float32)
+    # A few spare candidates in case some shortlisted rows were deleted since indexing
+    ranked = rerank(artifacts.embedding, shortlist, vectors, k=k + 10)
+    rows = {a.id: a for a in Application.query.filter(Application.id.in_([i for i, _, _ in ranked])).all()}
+    matches = []
+    for app_id, cosine, bm25 in ranked:
+        a = rows.get(app_id)
+        if a is None:
+            continue  # indexed but since deleted
+        matches.append({
+            "application_id": a.id,
+            "candidate": a.candidate.name or a.candidate.username,
+            "applied_for": a.job.title,
+            "cosine": None if np.isnan(cosine) else round(cosine, 4),
+            "bm25": round(bm25, 3),
+            "score": a.score,
+        })
+        if len(matches) >= k:
+            break
+    return jsonify({"job_id": job.id, "shortlisted": len(shortlist), "matches": matches})
+
+
 @app.route('/hr/screening', methods=['GET', 'POST'])
 def hr_screening():
     guard = require_hr()
@@ -202,9 +823,16 @@ def hr_screening():
         return guard
         
     if request.method == 'POST':
-        # Handle AJAX submission: job_description + resume PDF
+        # Handle AJAX submission: job_description (or a stored job_id) + resume PDF
         job_description = request.form.get('job_description', '')
         resume_file = request.files.get('resume')
+        stored_job = None
+        if request.form.get('job_id'):
+            stored_job = Job.query.get(int(request.form['job_id']))
+            if stored_job is not None and stored_job.description:
+                job_description = stored_job.description
+            else:
+                stored_job = None
 
         if not job_description or not resume_file or not resume_file.filename:
             # For AJAX use JSON error; for non-AJAX, flash
@@ -220,22 +848,123 @@ def hr_screening():
             flash('Only PDF resumes are supported at the moment.', 'danger')
             return redirect(url_for('hr_screening'))
 
-        filename = secure_filename(resume_file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        resume_file.save(filepath)
+        stored_name = store_upload(resume_file, 'screening-' + secure_filename(resume_file.filename), kind='screening')
+        db.session.commit()
+        filepath = upload_path(stored_name)
+
+        mode = request.form.get('mode') or None
+        from ats_service import SCORING_MODES
+        if mode is not None and mode not in SCORING_MODES:
+            return jsonify({"error": f"mode must be one of {', '.join(SCORING_MODES)}"}), 400
 
-        # Run ATS processing
+        # Run ATS processing once this HR user's turn comes up (see fair_scheduler.py)
         try:
-            from pathlib import Path
-            from ats_service import process_ats
-            result = process_ats(job_description, Path(filepath))
+            import json
+            from ats_service import process_ats, scorer_version
+            # debug=1 adds a per-stage timing breakdown to the response (and bypasses the memo)
+            debug = request.values.get('debug') == '1'
+            jd_hash, resume_hash = screening_memo.job_hash(job_description), upload_hash(stored_name)
+            memo = None if debug else find_screening_result((jd_hash, resume_hash, scorer_version(mode)))
+            if memo is not None:
+                result = json.loads(memo.result)
+                result.update(result_id=memo.id, cached=True)
+                return jsonify(result)
+            with SCREENING_SCHEDULER.slot(session['hr_id']) as ticket:
+                job_artifacts = stored_job.artifacts() if stored_job is not None else None
+                result = process_ats(job_description, filepath, debug=debug, job=job_artifacts, mode=mode)
+                if stored_job is not None and db.session.is_modified(stored_job):
+                    db.session.commit()  # artifacts were refreshed for a new model version
+            # Versioned after scoring: the LLM backend may have changed during it (HF fell back to OpenAI)
+            result_id = save_screening_result((jd_hash, resume_hash, scorer_version(mode)), result)
+            db.session.commit()
+            result.update(result_id=result_id, cached=False)
+            result["queue"] = {"position": ticket.position, "wait_ms": round(ticket.wait_s * 1000.0, 1)}
             return jsonify(result)
+        except QueueTimeout as e:
+            return jsonify({"error": str(e)}), 503, {'Retry-After': '5'}
+        except ExtractionFailed as e:
+            return jsonify({"error": str(e)}), 422
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
     # Get recent applications for the table
     apps = Application.query.order_by(Application.created_at.desc()).limit(10).all()
-    return render_template('hr_screening.html', applications=apps)
+    jobs = Job.query.filter(Job.description != '').order_by(Job.id.desc()).all()
+    return render_template('hr_screening.html', applications=apps, jobs=jobs)
+
+
+@app.get('/hr/screening/queue')
+def hr_screening_queue():
+    """The current HR user's screening queue: running, waiting and position of the next job."""
+    guard = require_hr()
+    if guard:
+        return guard
+    return jsonify(SCREENING_SCHEDULER.stats(session['hr_id']))
+
+
+@app.get('/hr/screening/results/<int:result_id>')
+def hr_screening_result(result_id: int):
+    """Re-open a stored screening result (the ``result_id`` returned by /hr/screening)."""
+    import json
+    guard = require_hr()
+    if guard:
+        return guard
+    row = db.session.get(ScreeningResult, result_id)
+    if row is None:
+        return jsonify({"error": "Screening result not found."}), 404
+    result = json.loads(row.result)
+    result.update(result_id=row.id, cached=True, created_at=row.created_at.isoformat())
+    return jsonify(result)
+
+
+@app.post('/hr/screening/bulk')
+def hr_screening_bulk():
+    """Screen every resume in a ZIP archive against one JD, streaming a row per resume."""
+    guard = require_hr()
+    if guard:
+        return guard
+    archive = request.files.get('archive')
+    if not archive or not archive.filename:
+        return jsonify({"error": "Please upload a ZIP archive of resumes."}), 400
+    if not archive.filename.lower().endswith('.zip'):
+        return jsonify({"error": "Bulk screening expects a .zip archive."}), 400
+
+    from ats_service import SCORING_MODES, prepare_job
+    from bulk_screening import ArchiveError, screen_archive, to_csv, to_ndjson
+    mode = request.form.get('mode') or None
+    if mode is not None and mode not in SCORING_MODES:
+        return jsonify({"error": f"mode must be one of {', '.join(SCORING_MODES)}"}), 400
+    job = None
+    if request.form.get('job_id'):
+        stored_job = Job.query.get(int(request.form['job_id']))
+        if stored_job is not None:
+            job = stored_job.artifacts()
+            if db.session.is_modified(stored_job):
+                db.session.commit()
+    if job is None:
+        job_description = request.form.get('job_description', '').strip()
+        if not job_description:
+            return jsonify({"error": "Please provide a job description or pick a stored job."}), 400
+        job = prepare_job(job_description)
+
+    # The whole archive holds one of this HR user's screening slots, like an interactive screening
+    hr_id = session['hr_id']
+    rows = screen_archive(archive.stream, job, mode=mode, slot=lambda: SCREENING_SCHEDULER.slot(hr_id))
+    try:
+        first = next(rows)  # surface a corrupt archive or a full queue before streaming starts
+    except ArchiveError as e:
+        return jsonify({"error": str(e)}), 400
+    except QueueTimeout as e:
+        return jsonify({"error": str(e)}), 503
+
+    def all_rows():
+        yield first
+        yield from rows
+
+    if request.values.get('format') == 'csv':
+        return Response(stream_with_context(to_csv(all_rows())), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=screening.csv'})
+    return Response(stream_with_context(to_ndjson(all_rows())), mimetype='application/x-ndjson')
 
 
 @app.post('/hr/application/<int:app_id>/status')
@@ -257,6 +986,9 @@ def hr_update_status(app_id: int):
 
 @app.route('/uploads/<path:filename>')
 def download_resume(filename):
+    row = StoredFile.query.filter_by(name=filename).first()
+    if row is not None:
+        return send_file(UPLOAD_STORE.path(row.blob), as_attachment=True, download_name=row.name)
     return send_from_directory(app.config['UPLOAD_FOLDER'], filename, as_attachment=True)
 
 
@@ -311,13 +1043,15 @@ def apply(job_id: int):
         filename = None
         if resume_file and resume_file.filename:
             safe_name = secure_filename(f"{user.username}_{job.id}_{resume_file.filename}")
-            resume_path = os.path.join(app.config['UPLOAD_FOLDER'], safe_name)
-            resume_file.save(resume_path)
-            filename = safe_name
+            filename = store_upload(resume_file, safe_name)
 
         app_row = Application(candidate_id=user.id, job_id=job.id, status='New', resume_filename=filename)
         db.session.add(app_row)
+        db.session.flush()  # get id
+        index_application_fts(app_row)
         db.session.commit()
+        # Score in the background so HR lists can sort by score without inference
+        enqueue_scoring(app_row.id)
         # flash('Application submitted successfully.', 'success')
         return redirect(url_for('index'))
 
@@ -326,7 +1060,7 @@ def apply(job_id: int):
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        ensure_schema()
         # Auto-seed minimal data on first run for convenience
         if HR.query.count() == 0:
             hr = HR(username='hr')
@@ -336,6 +1070,11 @@ if __name__ == '__main__':
             job = Job(title='Senior Frontend Developer', company='Company XYZ', tags='React,TypeScript')
             db.session.add(job)
         db.session.commit()
+    requeue_pending()
+    if os.getenv('ATS_WARMUP', '') == '1':
+        # Load the embedding model before serving instead of on the first screening request
+        from ats_service import warmup
+        warmup(load_llm=os.getenv('ATS_WARMUP_LLM', '') == '1')
     app.run(debug=True)
 
 
@@ -6,8 +6,9 @@ import os
 from io import BytesIO
 from bson import ObjectId
 from config import Config
-from mongo_models import HR, Candidate, Job, Application
+from mongo_models import HR, Candidate, Job, Application, ResumeLshBucket, ScreeningResult
 from gridfs_utils import storage
+from ingest import INGEST_ENABLED, IngestPipeline
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -27,6 +28,99 @@ def require_candidate():
         return redirect(url_for('login_candidate'))
     return None
 
+# -------------------- Background scoring --------------------
+def _score_application(application_id):
+    """Extract the resume of one application from GridFS and score it against its job."""
+    import tempfile
+    from pathlib import Path
+    import screening_memo
+    from ats_service import extract_resume_text, score_resume_text, scorer_version
+
+    application = Application.find_by_id(application_id)
+    if not application or application.get('score_status') == 'done':
+        return
+    resume = storage.get_file(application.get('resume_file_id')) if application.get('resume_file_id') else None
+    if resume is None:
+        Application.update(application_id, {'score_status': 'no_resume'})
+        return
+    job_artifacts = Job.get_artifacts(Job.find_by_id(application['job_id']))
+    if job_artifacts is None:
+        Application.update(application_id, {'score_status': 'no_description'})
+        return
+    suffix = os.path.splitext(resume.filename or '')[1] or '.pdf'
+    data = resume.read()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / f'resume{suffix}'
+        path.write_bytes(data)
+        resume_text = extract_resume_text(path)
+    if not resume_text.strip():
+        Application.update(application_id, {'score_status': 'failed',
+                                             'score_error': 'Could not extract text from resume.'})
+        return
+    fields = _register_near_duplicate(application_id, application, resume_text)
+    if 'score' not in fields:
+        key = (screening_memo.job_hash(job_artifacts.text), screening_memo.content_hash(data), scorer_version())
+        memo = ScreeningResult.lookup(key)
+        if memo is not None:
+            result = memo['result']
+        else:
+            result = score_resume_text(job_artifacts, resume_text)
+            ScreeningResult.save(key, result)
+        fields.update({
+            'score': int(result['ATS Score']),
+            'verdict': result['Fit Verdict'],
+            'matched_skills': result['Matched Skills'],
+        })
+    fields.update({'score_status': 'done', 'score_error': None, 'scored_at': datetime.utcnow()})
+    Application.update(application_id, fields)
+
+
+def _register_near_duplicate(application_id, application, resume_text):
+    """Index the resume's MinHash band keys and flag/reuse an earlier near-duplicate.
+
+    Returns the fields to store; includes the score when a scored copy for the
+    same job was found.
+    """
+    import dedup
+    sig = dedup.signature(resume_text)
+    keys = dedup.band_keys(sig)
+    fields = {'resume_signature': dedup.to_bytes(sig)}
+    ids = ResumeLshBucket.candidate_ids(keys, exclude=application_id)
+    candidates = [Application.find_by_id(i) for i in ids]
+    candidates = [c for c in candidates if c and c.get('resume_signature')]
+    same_job = [c for c in candidates if c['job_id'] == application['job_id'] and c.get('score_status') == 'done']
+    match = dedup.best_match(sig, ((c, dedup.from_bytes(c['resume_signature'])) for c in same_job)) \
+        or dedup.best_match(sig, ((c, dedup.from_bytes(c['resume_signature'])) for c in candidates))
+    outcome = 'unique'
+    if match is not None:
+        original = match[0]
+        fields['duplicate_of_id'] = original.get('duplicate_of_id') or str(original['_id'])
+        outcome = 'flagged'
+        if original in same_job:
+            fields.update({k: original.get(k) for k in ('score', 'verdict', 'matched_skills')})
+            outcome = 'reused'
+    ResumeLshBucket.add(application_id, keys)
+    dedup.DEDUP_LOOKUPS.labels(outcome).inc()
+    return fields
+
+
+def _score_application_failed(application_id, exc):
+    Application.update(application_id, {'score_status': 'failed', 'score_error': str(exc)[:1000]})
+
+
+scoring_pipeline = IngestPipeline('application_scoring', _score_application, on_failure=_score_application_failed)
+
+
+def requeue_pending():
+    """Re-enqueue applications whose scoring was interrupted by a restart.
+
+    Call from exactly one process per deployment, like app.requeue_pending: ``app.run``
+    below, or the first gunicorn worker (``post_worker_init`` in gunicorn.conf.py).
+    """
+    if not INGEST_ENABLED:
+        return 0
+    return scoring_pipeline.requeue(Application.pending_ids())
+
 # -------------------- Routes --------------------
 @app.route('/')
 def index():
@@ -162,10 +256,14 @@ def apply(job_id):
                 'job_id': job_id,
                 'status': 'New',
                 'resume_file_id': file_id,
+                'score_status': 'pending',
                 'created_at': datetime.utcnow()
             }
             
-            Application.create(application_data)
+            application_id = Application.create(application_data)
+            if INGEST_ENABLED:
+                # Score in the background so HR lists can sort by score without inference
+                scoring_pipeline.submit(application_id)
             flash('Application submitted successfully', 'success')
             return redirect(url_for('candidate_dashboard'))
     
@@ -174,4 +272,5 @@ def apply(job_id):
 # Add other routes as needed...
 
 if __name__ == '__main__':
+    requeue_pending()
     app.run(debug=True)
@@ -1,29 +1,59 @@
+from __future__ import annotations
+
 import os
 import json
-import re
+from functools import cached_property
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Set
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Set, Tuple, Union
+
+from metrics import Counter, Histogram, StageTimer, record_cache
+from model_manager import MODELS
+from text_processing import ProcessedText, process
 
-# PDF reading
-import PyPDF2
+if TYPE_CHECKING:
+    import numpy as np
 
-# For embedding-based keyword similarity
-from sentence_transformers import SentenceTransformer, util
+# Heavy dependencies (numpy and the embeddings, skill_matcher, summarizer and
+# extraction_sandbox modules built on it; PyPDF2, sentence_transformers,
+# transformers) are imported on first use so that importing this module stays
+# cheap for the web workers. Call warmup() to pay the model load cost up front instead.
 
 # Optional model generation: HF transformers or OpenAI fallback
 USE_OPENAI = os.getenv("USE_OPENAI", "") == "1"
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
 HF_CHAT_MODEL = os.getenv("HF_CHAT_MODEL", "meta-llama/Llama-2-7b-chat-hf")
-EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "all-MiniLM-L6-v2")
-
-# Try to import transformers only if not forcing OpenAI
-HF_AVAILABLE = False
-try:
-    if not USE_OPENAI:
-        from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
-        HF_AVAILABLE = True
-except Exception:
-    HF_AVAILABLE = False
+# Keep a simple model selection for now
+OPENAI_CHAT_MODEL = "gpt-4o-mini"
+
+# Only probe for transformers (without importing it) if not forcing OpenAI
+HF_AVAILABLE = (not USE_OPENAI) and find_spec("transformers") is not None
+
+# Scoring modes: "full" asks the LLM whenever one is available, "fast" never does,
+# "tiered" only when the cheap (embedding + skill) score lands in the uncertainty
+# band [ATS_UNCERTAIN_LOW, ATS_UNCERTAIN_HIGH); outside it the threshold rules
+# decide the verdict anyway. Requests can override the mode.
+SCORING_MODES = ("fast", "full", "tiered")
+ATS_SCORING_MODE = os.getenv("ATS_SCORING_MODE", "full")
+ATS_UNCERTAIN_LOW = int(os.getenv("ATS_UNCERTAIN_LOW", "40"))
+ATS_UNCERTAIN_HIGH = int(os.getenv("ATS_UNCERTAIN_HIGH", "80"))
+
+SCORING_TIERS = Counter(
+    "ats_scoring_tier_total", "Scored resumes by requested mode and tier used (cheap, llm).", ["mode", "tier"]
+)
+LLM_GENERATED_TOKENS = Histogram(
+    "llm_generated_tokens", "New tokens per HF chat call, by why generation stopped (json, eos, length).", ["stop"],
+    buckets=(16, 32, 64, 128, 192, 256, 384, 512, 768, 1024),
+)
+
+# Bump when _simple_skill_extract's vocabulary or matching changes, so stored
+# job artifacts (see JobArtifacts) are recomputed.
+SKILL_RULES_VERSION = "1"
+# Bump when the prompt, the score rules (_apply_threshold_boost) or the verdict
+# thresholds change, so memoized screening results (see scorer_version) are recomputed.
+SCORING_RULES_VERSION = "1"
+
+_hf_failed = False
 
 
 def _call_openai_chat(prompt: str, max_tokens: int = 512, temperature: float = 0.1) -> str:
@@ -31,8 +61,7 @@ def _call_openai_chat(prompt: str, max_tokens: int = 512, temperature: float = 0
     openai.api_key = OPENAI_KEY
     if not openai.api_key:
         raise RuntimeError("OPENAI_API_KEY environment variable not set.")
-    # Keep a simple model selection for now
-    model = "gpt-4o-mini"
+    model = OPENAI_CHAT_MODEL
     resp = openai.ChatCompletion.create(
         model=model,
         messages=[{"role": "user", "content": prompt}],
@@ -42,8 +71,76 @@ def _call_openai_chat(prompt: str, max_tokens: int = 512, temperature: float = 0
     return resp["choices"][0]["message"]["content"]
 
 
+class _JsonScan:
+    """Finds the first balanced top-level JSON object in text that may arrive in pieces.
+
+    ``feed`` is given the whole text so far and only scans what is new; it returns
+    True once the object has closed, and ``text[start:end]`` is then the object.
+    Braces inside JSON strings are ignored.
+    """
+
+    def __init__(self):
+        self.start = -1
+        self.end = -1
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        if self.end >= 0:
+            return True
+        for i in range(self.pos, len(text)):
+            ch = text[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == "{":
+                if not self.depth:
+                    self.start = i
+                self.depth += 1
+            elif not self.depth:
+                continue  # prose before the object, quotes there don't count
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "}":
+                self.depth -= 1
+                if not self.depth:
+                    self.end = self.pos = i + 1
+                    return True
+        self.pos = len(text)
+        return False
+
+
+class _StopAfterJson:
+    """generate() stopping criterion: stop once the new tokens hold a complete JSON object
+    (all _safe_parse_json_like reads), instead of running on to max_new_tokens."""
+
+    def __init__(self, tokenizer, prompt_len: int):
+        self.tokenizer = tokenizer
+        self.prompt_len = prompt_len
+        self.scan = _JsonScan()
+        self.done = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+
+        if not self.done:
+            text = self.tokenizer.decode(input_ids[0, self.prompt_len:], skip_special_tokens=True)
+            if len(text) < self.scan.pos:  # detokenization rewrote the tail; scan again
+                self.scan = _JsonScan()
+            self.done = self.scan.feed(text)
+        return torch.full((input_ids.shape[0],), self.done, dtype=torch.bool, device=input_ids.device)
+
+
 class _HFChatWrapper:
     def __init__(self, model_name: str = HF_CHAT_MODEL):
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
         self.model_name = model_name
         # NOTE: Loading large Llama models requires sufficient RAM/GPU
         self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
@@ -53,22 +150,77 @@ class _HFChatWrapper:
             torch_dtype="auto",
             offload_folder="offload",
         )
-        self.pipe = pipeline("text-generation", model=self.model, tokenizer=self.tokenizer, device_map="auto")
 
     def chat(self, prompt: str, max_new_tokens: int = 512, temperature: float = 0.1) -> str:
-        out = self.pipe(prompt, max_new_tokens=max_new_tokens, do_sample=False, temperature=temperature)
-        return out[0]["generated_text"]
+        """The model's answer to ``prompt`` (new text only, not the echoed prompt), cut off
+        once it has produced a complete JSON object. Decoding is greedy, so ``temperature``
+        has no effect."""
+        from transformers import StoppingCriteriaList
+
+        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+        prompt_len = inputs["input_ids"].shape[1]
+        stop = _StopAfterJson(self.tokenizer, prompt_len)
+        output = self.model.generate(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            do_sample=False,
+            stopping_criteria=StoppingCriteriaList([stop]),
+            pad_token_id=(self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None
+                          else self.tokenizer.eos_token_id),
+        )
+        new_tokens = output[0, prompt_len:]
+        if stop.done:
+            reason = "json"
+        elif len(new_tokens) >= max_new_tokens:
+            reason = "length"
+        else:
+            reason = "eos"
+        LLM_GENERATED_TOKENS.labels(reason).observe(len(new_tokens))
+        return self.tokenizer.decode(new_tokens, skip_special_tokens=True)
+
+
+def hf_chat_key() -> str:
+    """Name of the HF chat model in the model manager."""
+    return f"hf_chat:{HF_CHAT_MODEL}"
+
+
+def _get_hf_chat() -> Optional[_HFChatWrapper]:
+    """The HF chat model from the model manager (loaded on demand, evicted under memory
+    pressure or when idle); a failed load is remembered so it is not retried per request."""
+    global _hf_failed
+    if not HF_AVAILABLE or _hf_failed:
+        return None
+    key = hf_chat_key()
+    record_cache("hf_chat_model", MODELS.is_loaded(key))
+    try:
+        return MODELS.get(key, lambda: _HFChatWrapper(HF_CHAT_MODEL))
+    except Exception:
+        _hf_failed = True
+        return None
+
+
+def warmup(load_llm: bool = False) -> None:
+    """Load models eagerly, e.g. before a worker starts accepting traffic."""
+    from embeddings import get_embedder
+    get_embedder()
+    if load_llm:
+        _get_hf_chat()
 
 
 def _read_pdf_text(path: Path) -> str:
-    text_parts = []
-    with open(path, "rb") as f:
-        reader = PyPDF2.PdfReader(f)
-        for p in reader.pages:
-            page_text = p.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-    return "\n".join(text_parts)
+    return extract_resume_text(path)
+
+
+def extract_resume_text(path: Path) -> str:
+    """Text of a stored PDF/DOC/DOCX resume, extracted in the sandbox (see extraction_sandbox)."""
+    from extraction_sandbox import extract_text
+    return extract_text(path)
+
+
+def extract_resume_bytes(data: bytes, filename: str) -> str:
+    """Text of an in-memory resume (e.g. a ZIP member), without writing it to disk."""
+    from extraction_sandbox import extract_text
+    return extract_text(data, filename)
 
 
 def _build_prompt(job_text: str, resume_text: str) -> str:
@@ -97,6 +249,12 @@ Output strictly as JSON with keys:
 
 
 def _safe_parse_json_like(text: str) -> Dict[str, Any]:
+    scan = _JsonScan()
+    if scan.feed(text):
+        try:
+            return json.loads(text[scan.start:scan.end])
+        except Exception:
+            pass
     try:
         start = text.index("{")
         end = text.rindex("}") + 1
@@ -114,52 +272,43 @@ def _ensure_verdict(score: int) -> str:
     return "Not a Good Fit"
 
 
-def _simple_skill_extract(text: str) -> Set[str]:
+_COMMON_SKILLS: Tuple[str, ...] = (
+    # Programming languages
+    "python", "java", "javascript", "typescript", "c++", "c#", "go", "ruby", "php", "sql",
+    # Frameworks / libs
+    "django", "flask", "fastapi", "react", "angular", "vue", "nextjs", "node", "spring", "dotnet",
+    # Data / ML
+    "pandas", "numpy", "scikit-learn", "sklearn", "pytorch", "tensorflow", "nlp", "spacy",
+    # Cloud / DevOps
+    "aws", "azure", "gcp", "docker", "kubernetes", "k8s", "ci/cd",
+    # Other
+    "rest", "graphql", "microservices", "git", "linux"
+)
+
+
+def _simple_skill_extract(text: Union[str, ProcessedText]) -> Set[str]:
     """Heuristic skill extractor used in fallback mode when LLM is unavailable.
-    It normalizes text and matches against a pragmatic list of common tech skills.
-    """
-    common_skills: List[str] = [
-        # Programming languages
-        "python", "java", "javascript", "typescript", "c++", "c#", "go", "ruby", "php", "sql",
-        # Frameworks / libs
-        "django", "flask", "fastapi", "react", "angular", "vue", "nextjs", "node", "spring", "dotnet",
-        # Data / ML
-        "pandas", "numpy", "scikit-learn", "sklearn", "pytorch", "tensorflow", "nlp", "spacy",
-        # Cloud / DevOps
-        "aws", "azure", "gcp", "docker", "kubernetes", "k8s", "ci/cd",
-        # Other
-        "rest", "graphql", "microservices", "git", "linux"
-    ]
-    lower = text.lower()
-    found = set()
-    for skill in common_skills:
-        token = f" {skill} "
-        if skill in lower:
-            found.add(skill)
-    return found
-
-
-def _simple_summary(text: str, max_chars: int = 600) -> str:
-    """Very lightweight summary: take the first few sentences up to a char budget.
-    This avoids blank UI fields when LLM inference is not available locally.
+    It matches the lowercased text against a pragmatic list of common tech skills.
     """
-    if not text:
-        return ""
-    # Normalize whitespace
-    import re
-    t = re.sub(r"\s+", " ", text).strip()
-    # Truncate at sentence boundary if possible
-    sentences = re.split(r"(?<=[.!?])\s+", t)
-    out = []
-    total = 0
-    for s in sentences:
-        if total + len(s) > max_chars and out:
-            break
-        out.append(s)
-        total += len(s) + 1
-        if total >= max_chars:
-            break
-    return " ".join(out)[:max_chars]
+    lower = process(text).lower
+    return {skill for skill in _COMMON_SKILLS if skill in lower}
+
+
+def extract_skills(text: Union[str, ProcessedText]) -> Set[str]:
+    """Skills mentioned in ``text``: the exact keyword list by default, or exact +
+    embedding-based matches when ``SKILL_MATCHER=semantic`` (see skill_matcher)."""
+    import skill_matcher
+    doc = process(text)
+    if skill_matcher.SKILL_MATCHER == "semantic":
+        return skill_matcher.get_skill_matcher().match(doc)
+    return _simple_skill_extract(doc)
+
+
+def _simple_summary(text: Union[str, ProcessedText], max_chars: int = 600) -> str:
+    """Very lightweight summary: take the first few sentences up to a char budget
+    (the ``SUMMARIZER=lead`` fallback of summarizer.summarize)."""
+    import summarizer
+    return summarizer.lead(text, max_chars)
 
 
 def _apply_threshold_boost(score: int, cosine: float, match_fraction: float) -> int:
@@ -184,66 +333,230 @@ def _apply_threshold_boost(score: int, cosine: float, match_fraction: float) ->
     return score
 
 
-def process_ats(job_text: str, resume_pdf_path: Path) -> Dict[str, Any]:
-    # 1) Read resume PDF
-    if not resume_pdf_path.exists():
-        raise FileNotFoundError(f"Resume PDF not found: {resume_pdf_path}")
-    resume_text = _read_pdf_text(resume_pdf_path)
-    if not resume_text.strip():
-        raise ValueError("Could not extract text from PDF. Try a different PDF or enable OCR externally.")
+def job_artifacts_version() -> str:
+    """Identifies how JobArtifacts were computed; stored artifacts with a different
+    version are stale and must be recomputed."""
+    import skill_matcher
+    from embeddings import current_version
+    version = f"{current_version()}|skills-{SKILL_RULES_VERSION}"
+    if skill_matcher.SKILL_MATCHER == "semantic":
+        version += f"|semantic-{skill_matcher.vocabulary_version()}@{skill_matcher.SKILL_MATCH_THRESHOLD:g}"
+    return version
+
 
-    # 2) Validate job text
-    job_text = job_text or ""
-    if not job_text.strip():
+def llm_backend(mode: Optional[str] = None) -> str:
+    """The LLM(s) that would be asked in ``mode``; "none" in fast mode or when none is usable."""
+    mode = mode or ATS_SCORING_MODE
+    backends = []
+    if mode != "fast":
+        if HF_AVAILABLE and not _hf_failed:
+            backends.append(f"hf:{HF_CHAT_MODEL}")
+        if OPENAI_KEY or USE_OPENAI:
+            backends.append(f"openai:{OPENAI_CHAT_MODEL}")
+    return "+".join(backends) or "none"
+
+
+def scorer_version(mode: Optional[str] = None) -> str:
+    """Everything besides the JD and resume that a screening result depends on: embedding
+    model, skill rules, LLM backend, score rules, summarizer and mode. Part of the result memo key."""
+    import summarizer
+    mode = mode or ATS_SCORING_MODE
+    return (f"{job_artifacts_version()}|llm-{llm_backend(mode)}|rules-{SCORING_RULES_VERSION}"
+            f"|summary-{summarizer.version()}|{mode}")
+
+
+class JobArtifacts:
+    """Everything the scorer needs from a job description, computed once per JD.
+
+    Jobs persist these fields (see ``to_fields``) so screening against a stored
+    job only has to process the resume side.
+    """
+
+    def __init__(self, text: str, normalized_text: str, embedding: np.ndarray, skills: Set[str], version: str):
+        self.text = text
+        self.normalized_text = normalized_text
+        self.embedding = embedding
+        self.skills = skills
+        self.version = version
+
+    @cached_property
+    def doc(self) -> ProcessedText:
+        """The JD text, preprocessed once (see text_processing)."""
+        return process(self.text)
+
+    @property
+    def is_stale(self) -> bool:
+        return self.version != job_artifacts_version()
+
+    def to_fields(self) -> Dict[str, Any]:
+        import numpy as np
+        return {
+            "description_norm": self.normalized_text,
+            "jd_embedding": np.asarray(self.embedding, dtype=np.float32).tobytes(),
+            "jd_skills": sorted(self.skills),
+            "artifacts_version": self.version,
+        }
+
+    @classmethod
+    def from_fields(cls, text: str, normalized_text: str, embedding: bytes, skills: List[str], version: str) -> "JobArtifacts":
+        import numpy as np
+        return cls(text, normalized_text or "", np.frombuffer(embedding or b"", dtype=np.float32), set(skills or []), version or "")
+
+
+def prepare_job(job_text: str, timer: Optional[StageTimer] = None) -> JobArtifacts:
+    """Normalize, embed and skill-extract a job description."""
+    timer = timer or StageTimer()
+    doc = process(job_text)
+    if not doc:
         raise ValueError("No job description provided.")
+    with timer.stage("model_load"):
+        from embeddings import get_embedder
+        embedder = get_embedder()
+    with timer.stage("encode"):
+        embedding = embedder.encode_one(doc.normalized)
+    with timer.stage("skill_extract"):
+        skills = extract_skills(doc)
+    job = JobArtifacts(doc.raw, doc.normalized, embedding, skills, job_artifacts_version())
+    job.doc = doc
+    return job
+
+
+def process_ats(job_text: str, resume_pdf_path: Path, debug: bool = False,
+                job: Optional[JobArtifacts] = None, mode: Optional[str] = None) -> Dict[str, Any]:
+    """Score a resume PDF against a job description.
+
+    Pass ``job`` (precomputed JobArtifacts, e.g. from a stored Job) to skip
+    re-encoding and re-extracting the JD; ``job_text`` is then ignored.
+    ``mode`` overrides ATS_SCORING_MODE for this request (see SCORING_MODES).
+
+    Every stage is timed into the ``ats_stage_seconds`` histogram; with
+    ``debug=True`` the per-stage breakdown (ms) is returned under ``"timings_ms"``.
+    """
+    timer = StageTimer()
+    with timer.stage("total"):
+        # 1) Read resume PDF
+        if not resume_pdf_path.exists():
+            raise FileNotFoundError(f"Resume PDF not found: {resume_pdf_path}")
+        with timer.stage("pdf_read"):
+            resume_text = _read_pdf_text(resume_pdf_path)
+        if not resume_text.strip():
+            raise ValueError("Could not extract text from PDF. Try a different PDF or enable OCR externally.")
+
+        # 2) Validate job text / reuse precomputed JD artifacts
+        record_cache("job_artifacts", job is not None and not job.is_stale)
+        if job is None or job.is_stale:
+            job = prepare_job(job.text if job is not None else job_text, timer)
+
+        result = score_resume_text(job, resume_text, timer, mode=mode)
+    if debug:
+        result["timings_ms"] = timer.timings
+    return result
+
+
+def encode_resume(resume_text: Union[str, ProcessedText], timer: Optional[StageTimer] = None) -> np.ndarray:
+    """Unit-norm embedding of the normalized resume text (stored at ingest for candidate reranking)."""
+    timer = timer or StageTimer()
+    # (backend selected by EMBED_BACKEND, see embeddings.py)
+    with timer.stage("model_load"):
+        from embeddings import get_embedder
+        embedder = get_embedder()
+    with timer.stage("encode"):
+        return embedder.encode_one(process(resume_text).normalized)
+
+
+def needs_llm(mode: str, provisional_score: int) -> bool:
+    """Whether a resume with this cheap score should be escalated to the LLM."""
+    if mode not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode {mode!r}; expected one of {SCORING_MODES}")
+    if mode == "tiered":
+        return ATS_UNCERTAIN_LOW <= provisional_score < ATS_UNCERTAIN_HIGH
+    return mode == "full"
+
+
+def score_resume_text(job: JobArtifacts, resume_text: Union[str, ProcessedText], timer: Optional[StageTimer] = None,
+                      resume_embedding: Optional[np.ndarray] = None, mode: Optional[str] = None) -> Dict[str, Any]:
+    """Score already-extracted resume text against prepared JD artifacts.
+
+    ``resume_text`` may be a ProcessedText shared with other steps (see text_processing).
+    Pass ``resume_embedding`` (from ``encode_resume``) to skip encoding the resume again.
+    ``mode`` overrides ATS_SCORING_MODE; the tier actually used is returned as
+    ``"scoring_tier"`` ("cheap" or "llm").
+    """
+    import summarizer
+    timer = timer or StageTimer()
+    mode = mode or ATS_SCORING_MODE
+    job_text = job.text
+    resume = process(resume_text)
+    resume_text = resume.raw
 
     # 3) Embedding-based heuristic
-    embed_model = SentenceTransformer(EMBED_MODEL_NAME)
-    emb_job = embed_model.encode(job_text, convert_to_tensor=True)
-    emb_resume = embed_model.encode(resume_text, convert_to_tensor=True)
-    cosine = float(util.cos_sim(emb_job, emb_resume).item())
+    emb_resume = resume_embedding if resume_embedding is not None else encode_resume(resume, timer)
+    cosine = float(job.embedding @ emb_resume)
     base_score = max(0, min(100, int((cosine * 100) * 1.05)))
 
     # Pre-compute simple skills and match fraction for consistent logic across branches
-    jd_skills = _simple_skill_extract(job_text)
-    cv_skills = _simple_skill_extract(resume_text)
+    with timer.stage("skill_extract"):
+        jd_skills = job.skills
+        cv_skills = extract_skills(resume)
     matched_list = sorted(list(jd_skills.intersection(cv_skills)))
     missing_list = sorted(list(jd_skills.difference(cv_skills)))
     denom = max(1, len(jd_skills))
     match_fraction = len(matched_list) / denom
 
-    # 4) LLM prompt
-    prompt = _build_prompt(job_text, resume_text)
+    # 4) Tier gate: the threshold rules already settle clear cases, so only an
+    # uncertain provisional score is worth an LLM call in tiered mode
+    provisional_score = _apply_threshold_boost(base_score, cosine, match_fraction)
+    escalate = needs_llm(mode, provisional_score)
 
     model_output: Optional[str] = None
-    if HF_AVAILABLE:
-        try:
-            hf = _HFChatWrapper(HF_CHAT_MODEL)
-            model_output = hf.chat(prompt, max_new_tokens=600, temperature=0.1)
-        except Exception:
-            model_output = None
-
-    if (model_output is None) and (OPENAI_KEY or USE_OPENAI):
-        model_output = _call_openai_chat(prompt, max_tokens=700, temperature=0.1)
+    if escalate:
+        # 5) LLM prompt
+        with timer.stage("prompt_build"):
+            prompt = _build_prompt(job_text, resume_text)
+
+        with timer.stage("model_load"):
+            hf = _get_hf_chat()
+        if hf is not None:
+            try:
+                with timer.stage("llm_generate"):
+                    model_output = hf.chat(prompt, max_new_tokens=600, temperature=0.1)
+            except Exception:
+                model_output = None
+
+        if (model_output is None) and (OPENAI_KEY or USE_OPENAI):
+            with timer.stage("llm_generate"):
+                model_output = _call_openai_chat(prompt, max_tokens=700, temperature=0.1)
+
+    tier = "llm" if model_output is not None else "cheap"
+    SCORING_TIERS.labels(mode, tier).inc()
 
     if model_output is None:
         # Robust fallback: provide summaries and skills even without LLM
-        final_score = base_score
-        final_score = _apply_threshold_boost(final_score, cosine, match_fraction)
+        final_score = provisional_score
         verdict = _ensure_verdict(final_score)
+        with timer.stage("summary"):
+            job_summary = summarizer.summarize(job.doc)
+            resume_summary = summarizer.summarize(resume)
+        if escalate:
+            feedback = "Fallback mode: Generated without LLM. Score based on semantic similarity and simple skill overlap."
+        else:
+            feedback = (f"Scored without LLM ({mode} mode). Score based on semantic similarity and simple "
+                        f"skill overlap.")
         return {
-            "Job Summary": _simple_summary(job_text),
-            "Resume Summary": _simple_summary(resume_text),
+            "Job Summary": job_summary,
+            "Resume Summary": resume_summary,
             "ATS Score": final_score,
             "Fit Verdict": verdict,
             "Matched Skills": matched_list,
             "Missing Skills": missing_list,
-            "Feedback": "Fallback mode: Generated without LLM. Score based on semantic similarity and simple skill overlap.",
+            "Feedback": feedback,
             "raw_model_output": "",
             "embedding_cosine": cosine,
+            "scoring_tier": tier,
         }
 
-    parsed = _safe_parse_json_like(model_output)
+    with timer.stage("json_parse"):
+        parsed = _safe_parse_json_like(model_output)
 
     parsed_score: Optional[int] = None
     if isinstance(parsed, dict) and "ATS Score" in parsed:
@@ -270,6 +583,7 @@ def process_ats(job_text: str, resume_pdf_path: Path) -> Dict[str, Any]:
         "Feedback": model_output,
         "raw_model_output": model_output,
         "embedding_cosine": cosine,
+        "scoring_tier": tier,
     }
     if isinstance(parsed, dict):
         result["Job Summary"] = parsed.get("Job Summary", "") or ""
@@ -280,10 +594,11 @@ def process_ats(job_text: str, resume_pdf_path: Path) -> Dict[str, Any]:
             result["Feedback"] = parsed.get("Feedback")
 
     # If LLM returned empty summaries, backfill minimal summaries to avoid N/A in UI
-    if not result["Job Summary"]:
-        result["Job Summary"] = _simple_summary(job_text)
-    if not result["Resume Summary"]:
-        result["Resume Summary"] = _simple_summary(resume_text)
+    with timer.stage("summary"):
+        if not result["Job Summary"]:
+            result["Job Summary"] = summarizer.summarize(job.doc)
+        if not result["Resume Summary"]:
+            result["Resume Summary"] = summarizer.summarize(resume)
     if not result["Matched Skills"] and not result["Missing Skills"]:
         result["Matched Skills"] = matched_list
         result["Missing Skills"] = missing_list
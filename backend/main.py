@@ -1,13 +1,26 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
+import sys
 import tempfile
+import time
 from pathlib import Path
 
+# Shared scoring modules (embeddings, ...) live in the repository root; also make
+# `services` importable when started as `uvicorn backend.main:app` from the root.
+BACKEND_DIR = Path(__file__).resolve().parent
+for _path in (BACKEND_DIR.parent, BACKEND_DIR):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
 from services.resume_screener import ResumeScreener
 from services.document_processor import DocumentProcessor
+import metrics
+from extraction_sandbox import ExtractionFailed
+from screening_memo import SqliteMemo, content_hash, job_hash
 
 app = FastAPI(title="AI Resume Screener API")
 
@@ -20,9 +33,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    metrics.HTTP_IN_FLIGHT.labels("fastapi").inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.HTTP_IN_FLIGHT.labels("fastapi").dec()
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        metrics.HTTP_REQUESTS.labels("fastapi", request.method, path, status).inc()
+        metrics.HTTP_LATENCY.labels("fastapi", path).observe(time.perf_counter() - started)
+
+# Initialize services (cheap: models are loaded lazily on first request)
 resume_screener = ResumeScreener()
 document_processor = DocumentProcessor()
+# Results memoized by (JD hash, resume hash, screener version); see screening_memo.py
+screening_results = SqliteMemo()
+
+
+@app.on_event("startup")
+async def warmup_models():
+    # Opt-in eager load so the first request does not pay for the model download/load
+    if os.getenv("ATS_WARMUP", "") == "1":
+        resume_screener.warmup()
 
 class ScreeningRequest(BaseModel):
     job_description: str
@@ -32,31 +71,49 @@ class ScreeningResponse(BaseModel):
     match_score: float
     skill_matches: List[Dict[str, Any]]
     summary: str
+    result_id: Optional[int] = None
+    cached: Optional[bool] = None
+    timings_ms: Optional[Dict[str, float]] = None
 
-@app.post("/api/screen-resume", response_model=ScreeningResponse)
+@app.post("/api/screen-resume", response_model=ScreeningResponse, response_model_exclude_none=True)
 async def screen_resume(
     job_description: str,
-    resume_file: UploadFile = File(...)
+    resume_file: UploadFile = File(...),
+    debug: bool = False
 ):
+    timer = metrics.StageTimer()
     try:
         # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(resume_file.filename).suffix) as temp_file:
+        with timer.stage("upload_read"):
             content = await resume_file.read()
+        # debug=1 times every stage, so it always screens afresh
+        key = (job_hash(job_description), content_hash(content), resume_screener.version())
+        memo = None if debug else await run_in_threadpool(screening_results.get, key)
+        if memo is not None:
+            result_id, result = memo
+            return {**result, "result_id": result_id, "cached": True}
+        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(resume_file.filename).suffix) as temp_file:
             temp_file.write(content)
             temp_file_path = temp_file.name
         
         try:
             # Extract text from the uploaded file
-            resume_text = document_processor.extract_text(temp_file_path)
-            
-            # Get screening results
-            result = resume_screener.screen_resume(job_description, resume_text)
+            with timer.stage("text_extract"):
+                # Blocks on the sandbox worker; keep the event loop free for other requests
+                resume_text = await run_in_threadpool(document_processor.extract_text, temp_file_path)
             
-            return {
+            # Get screening results (encode / skill_match / summary are timed inside); the first
+            # call also loads the model, so both run off the event loop
+            result = await run_in_threadpool(resume_screener.screen_resume, job_description, resume_text,
+                                             timer=timer)
+            result = {
                 "match_score": result["match_score"],
                 "skill_matches": result["skill_matches"],
-                "summary": result["summary"]
+                "summary": result["summary"],
             }
+            result_id = await run_in_threadpool(screening_results.put, key, result)
+            return {**result, "result_id": result_id, "cached": False,
+                    "timings_ms": timer.timings if debug else None}
             
         finally:
             # Clean up the temporary file
@@ -65,9 +122,26 @@ async def screen_resume(
             except:
                 pass
                 
+    except ExtractionFailed as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.get("/api/screening-results/{result_id}", response_model=ScreeningResponse, response_model_exclude_none=True)
+async def get_screening_result(result_id: int):
+    result = await run_in_threadpool(screening_results.get_by_id, result_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Screening result not found")
+    return {**result, "result_id": result_id, "cached": True}
+
+@app.get("/metrics")
+async def prometheus_metrics(request: Request):
+    if not metrics.scrape_allowed(request.client.host if request.client else None,
+                                  request.headers.get("authorization")):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/")
 async def root():
     return {"message": "AI Resume Screening API is running"}
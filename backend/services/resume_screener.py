@@ -1,62 +1,98 @@
-from typing import Dict, List, Any
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+from typing import Dict, List, Any, Optional, Union
 import re
-import spacy
+
+from embeddings import EMBED_MODEL_NAME, cosine, current_version, get_embedder
+from metrics import StageTimer
+from model_manager import MODELS
+import skill_matcher
+from text_processing import ProcessedText, process
+
+# Common skills to look for (can be expanded)
+COMMON_SKILLS = [
+    'python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin',
+    'django', 'flask', 'react', 'angular', 'vue', 'node.js', 'express', 'spring',
+    'machine learning', 'deep learning', 'ai', 'data analysis', 'data science',
+    'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'aws', 'docker', 'kubernetes',
+    'git', 'rest api', 'graphql', 'agile', 'scrum', 'devops', 'ci/cd'
+]
+_SKILL_PATTERNS = [(skill, re.compile(r'\b' + re.escape(skill) + r'\b')) for skill in COMMON_SKILLS]
 
 class ResumeScreener:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    # Bump when the skill list, scoring or summary wording changes, so memoized
+    # results (see version() and screening_memo.py) are recomputed.
+    RULES_VERSION = "2"
+
+    def __init__(self, model_name: str = EMBED_MODEL_NAME, backend: str = None):
         """
         Initialize the resume screener with a pre-trained sentence transformer model.
         
+        The model is loaded on first use (or by warmup()) rather than here, so
+        constructing the screener at import time does not slow down startup.
+        
         Args:
             model_name: Name of the SentenceTransformer model to use.
                        'all-MiniLM-L6-v2' is a good balance between speed and accuracy.
+            backend: Embedding backend ('sbert', 'sbert-int8' or 'onnx');
+                     defaults to the EMBED_BACKEND environment variable.
+        """
+        self.model_name = model_name
+        self.backend = backend
+    
+    @property
+    def model(self):
+        """The shared embedder (see embeddings.py), loaded on first access.
+        
+        Not cached on the screener: the model manager may unload it when idle
+        or over the memory budget, and reloads it here on the next use.
         """
-        self.model = SentenceTransformer(model_name)
-        self.nlp = spacy.load("en_core_web_sm")
+        return get_embedder(self.backend, self.model_name)
+    
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded through the model manager only if something needs it."""
+        def load():
+            import spacy
+            return spacy.load("en_core_web_sm")
+        return MODELS.get("spacy:en_core_web_sm", load)
+    
+    def version(self) -> str:
+        """Identifies how screen_resume() results are computed (embedder, skill matcher, rules)."""
+        version = f"{current_version(self.backend, self.model_name)}|screener-{self.RULES_VERSION}"
+        if skill_matcher.SKILL_MATCHER == "semantic":
+            version += f"|semantic-{skill_matcher.vocabulary_version()}@{skill_matcher.SKILL_MATCH_THRESHOLD:g}"
+        return version
+
+    def warmup(self) -> None:
+        """Load the embedding model eagerly (e.g. at application startup)."""
+        _ = self.model
         
-    def extract_skills(self, text: str) -> List[str]:
+    def extract_skills(self, text: Union[str, ProcessedText]) -> List[str]:
         """
         Extract skills from text using NLP.
         This is a basic implementation that can be enhanced with a custom NER model.
+        With SKILL_MATCHER=semantic the canonical skills found by the
+        embedding-based matcher (see skill_matcher.py) are used instead.
         """
-        # Common skills to look for (can be expanded)
-        common_skills = [
-            'python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin',
-            'django', 'flask', 'react', 'angular', 'vue', 'node.js', 'express', 'spring',
-            'machine learning', 'deep learning', 'ai', 'data analysis', 'data science',
-            'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'aws', 'docker', 'kubernetes',
-            'git', 'rest api', 'graphql', 'agile', 'scrum', 'devops', 'ci/cd'
-        ]
-        
-        # Convert to lowercase for case-insensitive matching
-        text_lower = text.lower()
-        
-        # Find skills in the text
-        found_skills = []
-        for skill in common_skills:
-            if re.search(r'\b' + re.escape(skill) + r'\b', text_lower):
-                found_skills.append(skill)
-                
-        return found_skills
+        doc = process(text)
+        if skill_matcher.SKILL_MATCHER == "semantic":
+            return sorted(skill_matcher.get_skill_matcher().match(doc))
+
+        # Case-insensitive: match against the lowercased, whitespace-normalized text
+        return [skill for skill, pattern in _SKILL_PATTERNS if pattern.search(doc.lower)]
     
-    def calculate_similarity(self, text1: str, text2: str) -> float:
+    def calculate_similarity(self, text1: Union[str, ProcessedText], text2: Union[str, ProcessedText]) -> float:
         """Calculate cosine similarity between two texts."""
-        # Encode the texts to get their embeddings
-        embeddings = self.model.encode([text1, text2])
+        # Encode the normalized texts to get their embeddings
+        embeddings = self.model.encode([process(text1).normalized, process(text2).normalized])
         
         # Calculate cosine similarity
-        similarity = cosine_similarity(
-            embeddings[0].reshape(1, -1),
-            embeddings[1].reshape(1, -1)
-        )[0][0]
+        similarity = cosine(embeddings[0], embeddings[1])
         
         # Convert to percentage (0-100)
         return float(similarity * 100)
     
-    def analyze_skill_match(self, job_description: str, resume_text: str) -> List[Dict[str, Any]]:
+    def analyze_skill_match(self, job_description: Union[str, ProcessedText],
+                            resume_text: Union[str, ProcessedText]) -> Dict[str, Any]:
         """Analyze skill matches between job description and resume."""
         # Extract skills from both texts
         job_skills = set(self.extract_skills(job_description))
@@ -95,9 +131,11 @@ class ResumeScreener:
             'matched_skills': len(matching_skills)
         }
     
-    def generate_summary(self, job_description: str, resume_text: str, match_score: float) -> str:
-        """Generate a human-readable summary of the match."""
-        skill_analysis = self.analyze_skill_match(job_description, resume_text)
+    def generate_summary(self, job_description: Union[str, ProcessedText], resume_text: Union[str, ProcessedText],
+                         match_score: float, skill_analysis: Optional[Dict[str, Any]] = None) -> str:
+        """Generate a human-readable summary of the match (pass ``skill_analysis`` if already computed)."""
+        if skill_analysis is None:
+            skill_analysis = self.analyze_skill_match(job_description, resume_text)
         
         if match_score >= 80:
             strength = "an excellent"
@@ -116,25 +154,35 @@ class ResumeScreener:
         
         return summary
     
-    def screen_resume(self, job_description: str, resume_text: str) -> Dict[str, Any]:
+    def screen_resume(self, job_description: str, resume_text: str, timer: StageTimer = None) -> Dict[str, Any]:
         """
         Screen a resume against a job description.
         
         Args:
             job_description: The job description text
             resume_text: The resume text to screen
+            timer: Optional StageTimer that records per-stage latency
             
         Returns:
             Dict containing match score, skill matches, and summary
         """
+        timer = timer or StageTimer()
+        # Normalize both texts once; every step below reads from these
+        job_description, resume_text = process(job_description), process(resume_text)
+        
         # Calculate overall similarity
-        match_score = self.calculate_similarity(job_description, resume_text)
+        with timer.stage("model_load"):
+            _ = self.model
+        with timer.stage("encode"):
+            match_score = self.calculate_similarity(job_description, resume_text)
         
         # Analyze skill matches
-        skill_analysis = self.analyze_skill_match(job_description, resume_text)
+        with timer.stage("skill_extract"):
+            skill_analysis = self.analyze_skill_match(job_description, resume_text)
         
         # Generate summary
-        summary = self.generate_summary(job_description, resume_text, match_score)
+        with timer.stage("summary"):
+            summary = self.generate_summary(job_description, resume_text, match_score, skill_analysis)
         
         return {
             'match_score': round(match_score, 2),
@@ -0,0 +1,235 @@
+"""Offline batch screening: score a directory (or glob) of resumes against one JD.
+
+Runs outside the web tier, e.g. for nightly re-ranking:
+
+    python batch_screen.py jd.txt resumes/ -o ranking.csv
+    python batch_screen.py jd.txt "incoming/**/*.pdf" -o ranking.parquet --workers 8
+    flask --app app screen-batch jd.txt resumes/ -o ranking.csv
+
+Each worker process loads the models and prepares the JD artifacts once, then
+extracts (PDF/DOCX via DocumentProcessor) and scores one resume per task.
+Results are appended as they complete: CSV rows are flushed one by one, and a
+``.parquet`` output is a directory of part files written every
+``--flush-every`` rows. Re-running with the same output skips resumes already
+screened against the same JD, so an interrupted run resumes where it stopped.
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+RESUME_SUFFIXES = (".pdf", ".doc", ".docx")
+FIELDS = ["file", "status", "score", "verdict", "matched_skills", "missing_skills",
+          "embedding_cosine", "scoring_tier", "elapsed_ms", "error", "job_key", "screened_at"]
+
+_job = None  # per-worker JobArtifacts and scoring mode, set by _init_worker
+_mode = None
+
+
+def job_key(job_text: str, mode: Optional[str] = None) -> str:
+    """Identifies the JD and scorer version (models, LLM backend, rules, summarizer, mode) of a row."""
+    from ats_service import scorer_version
+    digest = hashlib.sha1(job_text.encode("utf-8")).hexdigest()[:12]
+    return f"{digest}|{scorer_version(mode)}"
+
+
+def find_resumes(source: str) -> List[str]:
+    """Resume paths under a directory (recursive) or matching a glob, sorted."""
+    if os.path.isdir(source):
+        paths = (str(p) for p in Path(source).rglob("*"))
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(os.path.abspath(p) for p in paths
+                  if p.lower().endswith(RESUME_SUFFIXES) and os.path.isfile(p))
+
+
+def _init_worker(job_text: str, mode: Optional[str] = None) -> None:
+    global _job, _mode
+    from ats_service import prepare_job, warmup
+    warmup()
+    _job = prepare_job(job_text)
+    _mode = mode
+
+
+def _screen_file(path: str) -> Dict[str, Any]:
+    from ats_service import extract_resume_text, score_resume_text
+
+    started = time.perf_counter()
+    row: Dict[str, Any] = {"file": path}
+    try:
+        text = extract_resume_text(Path(path))
+        if not text.strip():
+            raise ValueError("no extractable text (scanned PDF?)")
+        result = score_resume_text(_job, text, mode=_mode)
+    except Exception as exc:
+        row.update(status="error", error=str(exc))
+    else:
+        row.update(
+            status="ok",
+            score=int(result["ATS Score"]),
+            verdict=result["Fit Verdict"],
+            matched_skills="; ".join(result["Matched Skills"]),
+            missing_skills="; ".join(result["Missing Skills"]),
+            embedding_cosine=round(float(result["embedding_cosine"]), 4),
+            scoring_tier=result["scoring_tier"],
+        )
+    row["elapsed_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+    return row
+
+
+class CsvSink:
+    """Appends rows to a CSV file, flushing after each one."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def done(self, key: str) -> Set[str]:
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return {row["file"] for row in csv.DictReader(f) if row.get("job_key") == key}
+
+    def __enter__(self) -> "CsvSink":
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction="ignore")
+        if new:
+            self._writer.writeheader()
+        return self
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def __exit__(self, *exc) -> None:
+        self._file.close()
+
+
+class ParquetSink:
+    """Writes rows as part files in a Parquet dataset directory (needs pyarrow)."""
+
+    def __init__(self, path: str, flush_every: int = 200):
+        import pyarrow  # noqa: F401  (fail early with a clear ImportError)
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self._rows: List[Dict[str, Any]] = []
+
+    def done(self, key: str) -> Set[str]:
+        import pyarrow.parquet as pq
+        if not os.path.isdir(self.path) or not glob.glob(os.path.join(self.path, "*.parquet")):
+            return set()
+        table = pq.read_table(self.path, columns=["file", "job_key"])
+        return {f for f, k in zip(table.column("file").to_pylist(), table.column("job_key").to_pylist()) if k == key}
+
+    def __enter__(self) -> "ParquetSink":
+        os.makedirs(self.path, exist_ok=True)
+        return self
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= self.flush_every:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        columns = {name: [row.get(name) for row in self._rows] for name in FIELDS}
+        schema = pa.schema([(name, pa.int64() if name == "score" else
+                             pa.float64() if name in ("embedding_cosine", "elapsed_ms") else pa.string())
+                            for name in FIELDS])
+        name = f"part-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = os.path.join(self.path, "." + name)  # dot-files are ignored by Parquet readers
+        pq.write_table(pa.table(columns, schema=schema), tmp)
+        os.replace(tmp, os.path.join(self.path, name))
+        self._rows = []
+
+    def __exit__(self, *exc) -> None:
+        self._flush()
+
+
+def _open_sink(output: str, flush_every: int):
+    if output.lower().endswith(".parquet"):
+        return ParquetSink(output, flush_every)
+    return CsvSink(output)
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m" if seconds >= 3600 else f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+def _results(job_text: str, paths: List[str], workers: int, mode: Optional[str]) -> Iterator[Dict[str, Any]]:
+    if workers <= 1:
+        _init_worker(job_text, mode)
+        for path in paths:
+            yield _screen_file(path)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(job_text, mode)) as pool:
+        yield from pool.imap_unordered(_screen_file, paths, chunksize=1)
+
+
+def run(job_path: str, source: str, output: str, workers: Optional[int] = None,
+        flush_every: int = 200, progress_every: float = 2.0, out=sys.stderr,
+        mode: Optional[str] = None) -> Dict[str, Any]:
+    """Screen every resume under ``source`` not already in ``output``; returns run stats."""
+    with open(job_path, encoding="utf-8") as f:
+        job_text = f.read()
+    if not job_text.strip():
+        raise ValueError(f"{job_path} is empty")
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    key = job_key(job_text, mode)
+    sink = _open_sink(output, flush_every)
+    paths = find_resumes(source)
+    already = sink.done(key)
+    todo = [p for p in paths if p not in already]
+    print(f"{len(paths)} resumes found, {len(paths) - len(todo)} already in {output}, "
+          f"{len(todo)} to screen with {workers} worker(s)", file=out)
+
+    stats = {"found": len(paths), "skipped": len(paths) - len(todo), "ok": 0, "error": 0}
+    started = last_report = time.monotonic()
+    screened_at = datetime.utcnow().isoformat(timespec="seconds")
+    with sink:
+        for row in (_results(job_text, todo, workers, mode) if todo else ()):
+            row.update(job_key=key, screened_at=screened_at)
+            sink.write(row)
+            stats[row["status"]] += 1
+            now = time.monotonic()
+            done = stats["ok"] + stats["error"]
+            if now - last_report >= progress_every or done == len(todo):
+                rate = done / (now - started) if now > started else 0.0
+                eta = _format_eta((len(todo) - done) / rate) if rate else "?"
+                print(f"{done}/{len(todo)} screened ({rate:.1f}/s, ETA {eta}, {stats['error']} errors)", file=out)
+                last_report = now
+    elapsed = time.monotonic() - started
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["resumes_per_s"] = round((stats["ok"] + stats["error"]) / elapsed, 2) if elapsed else None
+    return stats
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("job", help="text file with the job description")
+    parser.add_argument("resumes", help="directory (searched recursively) or glob of PDF/DOCX resumes")
+    parser.add_argument("-o", "--output", required=True, help="results .csv, or .parquet dataset directory")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count; 1 = in-process)")
+    parser.add_argument("--flush-every", type=int, default=200, help="rows per Parquet part file")
+    parser.add_argument("--mode", choices=["fast", "full", "tiered"], help="scoring mode (default: ATS_SCORING_MODE)")
+    args = parser.parse_args(argv)
+    stats = run(args.job, args.resumes, args.output, args.workers, args.flush_every, mode=args.mode)
+    print(f"Done: {stats['ok']} scored, {stats['error']} failed, {stats['skipped']} skipped "
+          f"in {stats['elapsed_s']}s ({stats['resumes_per_s']}/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
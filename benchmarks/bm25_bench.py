@@ -0,0 +1,143 @@
+"""Latency and recall of BM25 shortlist + embedding rerank vs brute-force embedding scoring.
+
+For each corpus size, every resume is embedded once (this is the brute-force
+"encode everything" cost), stored as a float32 blob in a SQLite table shaped like
+``application`` and indexed with BM25. Each JD is then ranked two ways, both timed
+from the database like ``/hr/jobs/<id>/matches``:
+
+- brute force: read every stored vector, join the blobs, cosine against all of them;
+- hybrid: BM25 top ``--shortlist`` candidates (default: ``BM25Index.shortlist_size``
+  for the corpus), read only their vectors, rerank by cosine.
+
+Recall@k is the share of the brute-force top-k that the hybrid top-k also returns.
+
+    python benchmarks/bm25_bench.py                       # stub embedder, offline
+    python benchmarks/bm25_bench.py --docs 2000 --backend sbert --k 20 50
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+for _path in (ROOT, BENCH_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import bm25_index  # noqa: E402
+import embeddings  # noqa: E402
+import stubs  # noqa: E402
+import synthetic  # noqa: E402
+
+
+def _pct(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def bench(n_docs: int, n_queries: int, shortlist: Optional[int], ks: List[int]) -> Dict[str, float]:
+    sizes = list(synthetic.SIZES)
+    texts = [synthetic.make_resume(sizes[i % 2], i) for i in range(n_docs)]  # small/medium mix
+    queries = [synthetic.make_jd("medium", 10_000 + q) for q in range(n_queries)]
+    embedder = embeddings.get_embedder()
+
+    started = time.perf_counter()
+    matrix = embedder.encode(texts)
+    encode_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = bm25_index.build(enumerate(texts))
+    index_s = time.perf_counter() - started
+
+    workdir = tempfile.TemporaryDirectory(prefix="bm25-bench-")
+    conn = sqlite3.connect(os.path.join(workdir.name, "bench.db"))
+    conn.execute("CREATE TABLE application (id INTEGER PRIMARY KEY, resume_embedding BLOB, "
+                 "resume_embedding_version TEXT)")
+    conn.executemany("INSERT INTO application VALUES (?, ?, ?)",
+                     ((i, np.asarray(matrix[i], dtype=np.float32).tobytes(), "v") for i in range(n_docs)))
+    conn.commit()
+
+    brute_ms, bm25_ms, hybrid_ms = [], [], []
+    recalls: Dict[int, List[float]] = {k: [] for k in ks}
+    for query in queries:
+        q_vec = embedder.encode_one(query)
+
+        t0 = time.perf_counter()
+        stored = conn.execute("SELECT id, resume_embedding FROM application "
+                              "WHERE resume_embedding IS NOT NULL AND resume_embedding_version = ?", ("v",)).fetchall()
+        ids = np.fromiter((doc_id for doc_id, _ in stored), dtype=np.int64, count=len(stored))
+        all_vectors = np.frombuffer(b"".join(blob for _, blob in stored), dtype=np.float32).reshape(len(stored), -1)
+        cosines = all_vectors @ q_vec
+        brute_top = ids[np.argsort(-cosines, kind="stable")[:max(ks)]]
+        brute_ms.append((time.perf_counter() - t0) * 1000.0)
+
+        t0 = time.perf_counter()
+        candidates = index.search(query, k=shortlist)
+        bm25_ms.append((time.perf_counter() - t0) * 1000.0)
+        wanted = [doc_id for doc_id, _ in candidates]
+        vectors = {}
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            for doc_id, blob in conn.execute(
+                f"SELECT id, resume_embedding FROM application WHERE id IN ({','.join('?' * len(chunk))}) "
+                "AND resume_embedding IS NOT NULL AND resume_embedding_version = ?", (*chunk, "v")):
+                vectors[doc_id] = np.frombuffer(blob, dtype=np.float32)
+        ranked = bm25_index.rerank(q_vec, candidates, vectors)
+        hybrid_ms.append((time.perf_counter() - t0) * 1000.0)
+
+        for k in ks:
+            truth = set(brute_top[:k].tolist())
+            got = {doc_id for doc_id, _, _ in ranked[:k]}
+            recalls[k].append(len(truth & got) / len(truth) if truth else 1.0)
+
+    conn.close()
+    workdir.cleanup()
+    result = {
+        "docs": n_docs,
+        "shortlist": shortlist or index.shortlist_size(n_docs),
+        "encode_all_s": encode_s,
+        "index_build_s": index_s,
+        "brute_p50_ms": statistics.median(brute_ms),
+        "bm25_p50_ms": statistics.median(bm25_ms),
+        "bm25_p95_ms": _pct(bm25_ms, 0.95),
+        "hybrid_p50_ms": statistics.median(hybrid_ms),
+        "hybrid_p95_ms": _pct(hybrid_ms, 0.95),
+    }
+    for k in ks:
+        result[f"recall@{k}"] = statistics.fmean(recalls[k])
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--shortlist", type=int, default=None, help="default: scaled to the corpus size")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--backend", default="stub", help="embedding backend ('stub' runs offline)")
+    args = parser.parse_args()
+
+    if args.backend == "stub":
+        stubs.install(llm=False)
+    else:
+        embeddings.EMBED_BACKEND = args.backend
+
+    for n in args.docs:
+        r = bench(n, args.queries, args.shortlist, args.k)
+        recall = "  ".join(f"recall@{k} {r[f'recall@{k}']:.3f}" for k in args.k)
+        print(f"{n:>7} docs (shortlist {r['shortlist']}): encode all {r['encode_all_s']:7.2f} s  index {r['index_build_s']:6.2f} s  "
+              f"brute (from db) p50 {r['brute_p50_ms']:7.2f} ms  "
+              f"bm25 p50 {r['bm25_p50_ms']:6.2f} ms  hybrid p50 {r['hybrid_p50_ms']:6.2f} / p95 {r['hybrid_p95_ms']:6.2f} ms  "
+              f"{recall}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
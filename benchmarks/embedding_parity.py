@@ -0,0 +1,83 @@
+"""Parity and throughput check for the quantized embedding backends.
+
+Encodes a fixed corpus of JD/resume pairs with the fp32 SentenceTransformer and
+with each candidate backend, then compares the JD-resume cosine scores. Exits
+with status 1 if any score drifts more than ``--tolerance`` from fp32.
+
+    python benchmarks/embedding_parity.py --backends sbert-int8 onnx
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from embeddings import EMBED_MODEL_NAME, get_embedder  # noqa: E402
+
+ROLES = [
+    ("Backend Engineer", "Python, Django, PostgreSQL, REST APIs and Docker"),
+    ("Frontend Developer", "React, TypeScript, GraphQL and CSS performance tuning"),
+    ("Data Scientist", "pandas, scikit-learn, PyTorch, experiment design and SQL"),
+    ("DevOps Engineer", "Kubernetes, Terraform, AWS, CI/CD pipelines and Linux"),
+    ("Mobile Developer", "Kotlin, Swift, offline sync and app store releases"),
+    ("ML Engineer", "model serving, ONNX, feature stores and monitoring drift"),
+    ("QA Engineer", "test automation with Selenium, pytest and load testing"),
+    ("Product Analyst", "dashboards, A/B testing, stakeholder reporting and SQL"),
+]
+
+
+def corpus() -> List[Tuple[str, str]]:
+    """Deterministic JD/resume pairs covering matching and mismatching roles."""
+    pairs = []
+    for i, (role, skills) in enumerate(ROLES):
+        jd = (f"We are hiring a {role}. The ideal candidate has strong experience with {skills}. "
+              f"You will own features end to end and mentor junior engineers.")
+        for j, (other_role, other_skills) in enumerate(ROLES):
+            years = 2 + (i + j) % 7
+            resume = (f"{other_role} with {years} years of experience. Built and operated systems "
+                      f"using {other_skills}. Led a team of {1 + j % 4} and improved latency by {10 + 5 * j}%.")
+            pairs.append((jd, resume))
+    return pairs
+
+
+def pair_scores(backend: str, pairs: List[Tuple[str, str]], repeats: int) -> Tuple[List[float], float]:
+    embedder = get_embedder(backend, EMBED_MODEL_NAME)
+    texts = [t for pair in pairs for t in pair]
+    embedder.encode(texts[:8])  # warm up kernels / allocator
+    started = time.perf_counter()
+    for _ in range(repeats):
+        vectors = embedder.encode(texts)
+    elapsed = time.perf_counter() - started
+    scores = [float(vectors[2 * k] @ vectors[2 * k + 1]) for k in range(len(pairs))]
+    return scores, len(texts) * repeats / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["sbert-int8"])
+    parser.add_argument("--tolerance", type=float, default=0.03, help="max |cosine - fp32 cosine|")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    pairs = corpus()
+    reference, ref_rate = pair_scores("sbert", pairs, args.repeats)
+    print(f"sbert (fp32): {ref_rate:.1f} texts/s over {len(pairs) * 2} texts")
+
+    failed = False
+    for backend in args.backends:
+        scores, rate = pair_scores(backend, pairs, args.repeats)
+        diffs = [abs(a - b) for a, b in zip(scores, reference)]
+        worst = max(diffs)
+        ok = worst <= args.tolerance
+        failed = failed or not ok
+        print(f"{backend}: {rate:.1f} texts/s ({rate / ref_rate:.2f}x fp32), "
+              f"max |delta cosine| {worst:.4f}, mean {sum(diffs) / len(diffs):.4f} "
+              f"[{'OK' if ok else 'FAIL'} tol {args.tolerance}]")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Import-time budget check for the web entry points.
+
+Runs ``python -X importtime`` in a fresh interpreter for each entry point and
+fails (exit code 1) if the project's own import time exceeds the budget or if a
+heavy model dependency is imported eagerly.
+
+Two budgets are checked against the median of ``--runs`` interpreters:
+
+- ``--budget``: the entry point's own import time. The web frameworks (Flask +
+  SQLAlchemy, FastAPI + pydantic) are imported first as a baseline, so this tracks
+  what the project pulls in eagerly (numpy, the model modules, ...) without the
+  frameworks' machine-dependent noise;
+- ``--total-budget``: the whole cold start, frameworks included, i.e. how long a
+  fresh worker spends importing before it can serve.
+
+    python benchmarks/import_budget.py              # 0.5s own / 2.0s total, 5 runs
+    python benchmarks/import_budget.py --budget 0.3 --total-budget 1.0 --runs 9
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Sequence, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (label, module to import, working directory, third-party baseline imported first)
+ENTRY_POINTS: List[Tuple[str, str, str, Tuple[str, ...]]] = [
+    ("ats_service", "ats_service", ROOT, ()),
+    ("flask app", "app", ROOT, ("flask", "flask_sqlalchemy", "werkzeug.security", "werkzeug.utils", "click")),
+    ("fastapi backend", "main", os.path.join(ROOT, "backend"),
+     ("fastapi", "fastapi.middleware.cors", "starlette.concurrency", "pydantic")),
+]
+
+# Packages that must only be imported on first use / warmup, never at import time
+FORBIDDEN = ("torch", "sentence_transformers", "transformers", "spacy", "sklearn")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str, cwd: str, baseline: Sequence[str] = ()) -> Tuple[float, float, float, Dict[str, int]]:
+    """Return (own seconds, baseline seconds, total seconds, {top-level package: cumulative us})
+    for importing ``module`` after ``baseline`` in a fresh interpreter."""
+    code = (f"import {', '.join(baseline)}; " if baseline else "") + f"import {module}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        errors = [ln for ln in proc.stderr.splitlines() if not ln.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed: {errors[-1] if errors else proc.returncode}")
+    packages: Dict[str, int] = {}
+    own_us = baseline_us = total_us = 0
+    baseline_tops = {name.split(".")[0] for name in baseline}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        cumulative, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        top = name.split(".")[0]
+        packages[top] = max(packages.get(top, 0), cumulative)
+        if indent != 1:
+            continue  # only direct children of the interpreter are summed
+        total_us += cumulative  # includes site/encodings imported at interpreter start
+        if name == module:
+            own_us = cumulative  # everything the entry point imports beyond the baseline
+        elif top in baseline_tops:
+            baseline_us += cumulative
+    return own_us / 1e6, baseline_us / 1e6, total_us / 1e6, packages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=0.5,
+                        help="seconds per entry point, on top of its framework baseline")
+    parser.add_argument("--total-budget", type=float, default=2.0,
+                        help="seconds per entry point for the whole cold start, frameworks included")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point (median is used)")
+    parser.add_argument("--top", type=int, default=5, help="show the N slowest packages")
+    args = parser.parse_args()
+
+    failed = False
+    for label, module, cwd, baseline in ENTRY_POINTS:
+        try:
+            runs = [measure(module, cwd, baseline) for _ in range(max(args.runs, 1))]
+        except RuntimeError as e:
+            print(f"[FAIL] {label}: {e}")
+            failed = True
+            continue
+        seconds = statistics.median(run[0] for run in runs)
+        framework = statistics.median(run[1] for run in runs)
+        total = statistics.median(run[2] for run in runs)
+        packages = runs[-1][3]
+        heavy = sorted(p for p in packages if p in FORBIDDEN)
+        ok = seconds <= args.budget and total <= args.total_budget and not heavy
+        failed = failed or not ok
+        print(f"[{'OK' if ok else 'FAIL'}] {label}: {seconds:.3f}s own (budget {args.budget:.2f}s), "
+              f"{total:.3f}s total (budget {args.total_budget:.2f}s, {framework:.3f}s frameworks), "
+              f"median of {len(runs)}")
+        for name, us in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+            print(f"    {us / 1e3:8.1f} ms  {name}")
+        if heavy:
+            print(f"    eagerly imported: {', '.join(heavy)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,452 @@
+"""Load test: replay a mix of concurrent users against app.py or backend/main.py.
+
+Starts the chosen app in a child process on a free local port, with the stub
+embedder/LLM (see stubs.py), a temporary SQLite database, upload folder and
+caches (result memo, BM25 index, skill and ONNX caches), and seeds it with HR accounts and jobs. Virtual users
+then run closed loops (request, optional think time, repeat) over a weighted
+mix of operations, at each concurrency level in ``--users`` for ``--duration``
+seconds after a ``--warmup``:
+
+- flask: ``login`` (POST /login/hr), ``dashboard`` (GET /hr), ``jobs``
+  (GET /jobs), ``apply`` (POST /apply/<job> with a PDF) and ``screening``
+  (POST /hr/screening with a stored job and a PDF);
+- fastapi: ``screen`` (POST /api/screen-resume) and ``root`` (GET /).
+
+Flask virtual users log in as one of the seeded HR accounts first. Uploads are made unique (so the result
+memo misses) except for a ``--repeat-ratio`` share that resends a file as is.
+
+Reports throughput, p50/p95/p99 latency and error rate per route and level.
+A response is an error if its status is not the one the route returns on
+success (e.g. a 302 to the login page, a 503 from the screening queue) or the
+request fails. The saturation point is the first level whose error rate is
+over ``--max-error-rate`` or whose throughput is less than
+``--saturation-gain`` above the best lower level; the level before it is the
+capacity of one server process. The driver runs on the same machine, so its
+own CPU use is reported per level; if it is high, the server is sharing
+cores with it. Runs offline, Linux only.
+
+    python benchmarks/loadtest.py --app flask
+    python benchmarks/loadtest.py --app flask --users 1 4 16 --mix login=1 dashboard=4 screening=2
+    python benchmarks/loadtest.py --app fastapi --users 1 2 4 8 --duration 20 --output fastapi.json
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+for _path in (ROOT, os.path.join(ROOT, "backend"), BENCH_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import synthetic  # noqa: E402
+
+APPS = ("flask", "fastapi")
+DEFAULT_MIX = {
+    "flask": {"login": 1, "dashboard": 4, "jobs": 2, "apply": 1, "screening": 2},
+    "fastapi": {"screen": 1},
+}
+PASSWORD = "loadtest"
+# Every on-disk cache the apps write (default under .cache/ in the working directory),
+# pointed into the temporary workdir so a run never touches the real ones
+_CACHE_PATHS = {
+    "SCREENING_MEMO_PATH": "screening_memo.sqlite3",
+    "SKILL_CACHE_DIR": "skills",
+    "BM25_INDEX_DIR": "bm25",
+    "EMBED_ONNX_DIR": "onnx",
+}
+_STARTUP_TIMEOUT_S = 120.0
+
+
+# -------------------- Server (child process) --------------------
+def _serve_flask(port: int, workdir: str, jobs: int, hr_users: int, jd_size: str) -> None:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(workdir, "app.db")
+    os.environ["UPLOAD_FOLDER"] = os.path.join(workdir, "uploads")
+    import logging
+
+    from werkzeug.security import generate_password_hash
+    from werkzeug.serving import make_server
+
+    import app as webapp
+
+    password_hash = generate_password_hash(PASSWORD)  # hashed once, shared by all seeded users
+    with webapp.app.app_context():
+        webapp.ensure_schema()
+        for i in range(hr_users):
+            webapp.db.session.add(webapp.HR(username=f"hr{i}", password_hash=password_hash))
+        for i in range(jobs):
+            job = webapp.Job(title=f"Job {i}", company="Load Test", description=synthetic.make_jd(jd_size, i))
+            job.refresh_artifacts()
+            webapp.db.session.add(job)
+        webapp.db.session.commit()
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    make_server("127.0.0.1", port, webapp.app, threaded=True).serve_forever()
+
+
+def _serve_fastapi(port: int) -> None:
+    import uvicorn
+
+    import main
+
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def serve(app_name: str, port: int, workdir: str, jobs: int, hr_users: int, jd_size: str,
+          llm_latency_ms: float) -> None:
+    """Body of the server process: isolate state in ``workdir``, stub the models, serve."""
+    for name, relpath in _CACHE_PATHS.items():
+        os.environ[name] = os.path.join(workdir, relpath)
+    import stubs
+
+    stubs.install(llm=True, llm_latency_ms=llm_latency_ms)
+    # SIGTERM from the driver: unwind normally so atexit hooks stop helper processes
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    if app_name == "flask":
+        _serve_flask(port, workdir, jobs, hr_users, jd_size)
+    else:
+        _serve_fastapi(port)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace, workdir: str) -> Tuple[subprocess.Popen, str]:
+    """Start the app in its own process group; returns it and its base URL once it accepts connections."""
+    port = _free_port()
+    cmd = [sys.executable, os.path.abspath(__file__), "--serve", "--app", args.app, "--port", str(port),
+           "--workdir", workdir, "--jobs", str(args.jobs), "--hr-users", str(args.hr_users),
+           "--jd-size", args.jd_size, "--llm-latency-ms", str(args.llm_latency_ms)]
+    log = open(os.path.join(workdir, "server.log"), "wb")
+    # cwd=workdir too, so any relative path not covered by _CACHE_PATHS also stays in the workdir
+    process = subprocess.Popen(cmd, cwd=workdir, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    log.close()
+    deadline = time.monotonic() + _STARTUP_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    with open(os.path.join(workdir, "server.log"), "rb") as f:
+        tail = f.read()[-2000:].decode("utf-8", "replace")
+    raise RuntimeError(f"{args.app} server did not start:\n{tail}")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+# -------------------- Virtual users --------------------
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None  # the 302 itself is the response being measured
+
+
+def _multipart(fields: Dict[str, str], files: Dict[str, Tuple[str, bytes]]) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, data) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/pdf\r\n\r\n'.encode() + data + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class Corpus:
+    """Resume PDFs and job descriptions shared by all virtual users."""
+
+    def __init__(self, size: int, resume_size: str, jobs: int, jd_size: str, repeat_ratio: float):
+        self.pdfs = [synthetic.make_pdf(synthetic.make_resume(resume_size, i)) for i in range(size)]
+        self.jds = [synthetic.make_jd(jd_size, i) for i in range(jobs)]
+        self.repeat_ratio = repeat_ratio
+
+    def resume(self, rng: random.Random) -> bytes:
+        data = rng.choice(self.pdfs)
+        if rng.random() < self.repeat_ratio:
+            return data
+        # Bytes after %%EOF are ignored by PDF readers but change the file hash (a memo miss)
+        return data + f"\n% {rng.getrandbits(64):016x}\n".encode()
+
+
+class VirtualUser:
+    """One simulated user: its own cookie session, a seeded RNG and recorded samples."""
+
+    def __init__(self, index: int, base_url: str, corpus: Corpus, args: argparse.Namespace):
+        self.index = index
+        self.base_url = base_url
+        self.corpus = corpus
+        self.timeout = args.timeout
+        self.hr_user = f"hr{index % args.hr_users}"
+        self.mode = args.mode
+        self.rng = random.Random(args.seed * 100003 + index)
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+        # (started, finished, route, ok)
+        self.samples: List[Tuple[float, float, str, bool]] = []
+
+    def call(self, route: str, method: str, path: str, expect: int, fields: Optional[Dict[str, str]] = None,
+             files: Optional[Dict[str, Tuple[str, bytes]]] = None, headers: Optional[Dict[str, str]] = None) -> None:
+        headers = dict(headers or {})
+        data = None
+        if files:
+            data, headers["Content-Type"] = _multipart(fields or {}, files)
+        elif fields is not None:
+            data = urllib.parse.urlencode(fields).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except OSError:
+            status = 0
+        self.samples.append((started, time.perf_counter(), route, status == expect))
+
+    # Flask operations
+    def login(self) -> None:
+        self.call("POST /login/hr", "POST", "/login/hr", 302,
+                  fields={"username": self.hr_user, "password": PASSWORD})
+
+    def dashboard(self) -> None:
+        self.call("GET /hr", "GET", "/hr", 200)
+
+    def jobs(self) -> None:
+        self.call("GET /jobs", "GET", "/jobs", 200)
+
+    def apply(self) -> None:
+        job_id = self.rng.randrange(len(self.corpus.jds)) + 1
+        email = f"candidate{self.rng.getrandbits(32):08x}@example.com"
+        self.call("POST /apply/<job>", "POST", f"/apply/{job_id}", 302,
+                  fields={"name": "Load Test", "email": email, "phone": "555-0100"},
+                  files={"resume": ("resume.pdf", self.corpus.resume(self.rng))})
+
+    def screening(self) -> None:
+        fields = {"job_id": str(self.rng.randrange(len(self.corpus.jds)) + 1)}
+        if self.mode:
+            fields["mode"] = self.mode
+        self.call("POST /hr/screening", "POST", "/hr/screening", 200, fields=fields,
+                  files={"resume": ("resume.pdf", self.corpus.resume(self.rng))},
+                  headers={"Accept": "application/json"})
+
+    # FastAPI operations
+    def screen(self) -> None:
+        query = urllib.parse.urlencode({"job_description": self.rng.choice(self.corpus.jds)})
+        self.call("POST /api/screen-resume", "POST", f"/api/screen-resume?{query}", 200,
+                  files={"resume_file": ("resume.pdf", self.corpus.resume(self.rng))})
+
+    def root(self) -> None:
+        self.call("GET /", "GET", "/", 200)
+
+
+def _user_loop(user: VirtualUser, app_name: str, mix: Dict[str, float], think_s: float,
+               ready: threading.Barrier, window: Dict[str, float], go: threading.Event) -> None:
+    ops = list(mix)
+    weights = [mix[op] for op in ops]
+    if app_name == "flask":
+        user.login()  # session setup, before the clock starts
+    ready.wait()
+    go.wait()
+    while time.perf_counter() < window["stop_at"]:
+        getattr(user, user.rng.choices(ops, weights)[0])()
+        if think_s:
+            time.sleep(user.rng.expovariate(1.0 / think_s))
+
+
+# -------------------- Reporting --------------------
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def _stats(samples: List[Tuple[float, float, str, bool]], duration: float) -> Dict[str, float]:
+    latencies = sorted((finished - started) * 1000.0 for started, finished, _, _ in samples)
+    errors = sum(1 for sample in samples if not sample[3])
+    return {
+        "requests": len(samples),
+        "rps": len(samples) / duration,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+    }
+
+
+def run_level(args: argparse.Namespace, base_url: str, corpus: Corpus, users: int, mix: Dict[str, float]) -> Dict:
+    """Log ``users`` virtual users in, then run them for warmup + duration; stats over the measured window."""
+    ready = threading.Barrier(users + 1)
+    go = threading.Event()
+    window: Dict[str, float] = {}
+    vusers = [VirtualUser(i, base_url, corpus, args) for i in range(users)]
+    threads = [threading.Thread(target=_user_loop, args=(user, args.app, mix, args.think_ms / 1000.0, ready, window, go),
+                                daemon=True) for user in vusers]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    window["measure_from"] = time.perf_counter() + args.warmup
+    window["stop_at"] = window["measure_from"] + args.duration
+    cpu_started = time.process_time()
+    go.set()
+    for thread in threads:
+        thread.join()
+    # The driver shares the box with the server; a busy driver skews the numbers
+    driver_cpu = (time.process_time() - cpu_started) / (args.warmup + args.duration)
+    measured = [s for user in vusers for s in user.samples
+                if s[0] >= window["measure_from"] and s[1] <= window["stop_at"]]
+    routes: Dict[str, List] = {}
+    for sample in measured:
+        routes.setdefault(sample[2], []).append(sample)
+    return {
+        "users": users,
+        "driver_cpu": driver_cpu,
+        "total": _stats(measured, args.duration),
+        "routes": {route: _stats(samples, args.duration) for route, samples in sorted(routes.items())},
+    }
+
+
+def find_saturation(levels: List[Dict], gain: float, max_error_rate: float) -> Optional[Dict]:
+    """The first level that errors too often or adds less than ``gain`` throughput over the best before it."""
+    best = None
+    for level in levels:
+        total = level["total"]
+        if total["error_rate"] > max_error_rate:
+            return {"users": level["users"], "reason": f"error rate {total['error_rate']:.1%}",
+                    "capacity": best}
+        if best is not None and total["rps"] < best["rps"] * (1.0 + gain):
+            return {"users": level["users"],
+                    "reason": f"throughput {total['rps']:.1f} req/s vs {best['rps']:.1f} at {best['users']} users",
+                    "capacity": best}
+        if best is None or total["rps"] > best["rps"]:
+            best = {"users": level["users"], "rps": total["rps"], "p95_ms": total["p95_ms"]}
+    return None
+
+
+def _print_level(level: Dict) -> None:
+    total = level["total"]
+    print(f"\n{level['users']} user(s): {total['rps']:.1f} req/s, errors {total['error_rate']:.1%}, "
+          f"p50 {total['p50_ms']:.1f} / p95 {total['p95_ms']:.1f} / p99 {total['p99_ms']:.1f} ms, "
+          f"driver CPU {level['driver_cpu']:.0%}")
+    for route, stats in level["routes"].items():
+        print(f"  {route:<26} {stats['requests']:6d} req {stats['rps']:8.1f} req/s  err {stats['error_rate']:6.1%}  "
+              f"p50 {stats['p50_ms']:8.1f}  p95 {stats['p95_ms']:8.1f}  p99 {stats['p99_ms']:8.1f} ms")
+
+
+def _parse_mix(items: Optional[List[str]], app_name: str) -> Dict[str, float]:
+    if not items:
+        return dict(DEFAULT_MIX[app_name])
+    mix = {}
+    for item in items:
+        op, _, weight = item.partition("=")
+        if op not in DEFAULT_MIX[app_name]:
+            raise SystemExit(f"unknown {app_name} operation {op!r}; choose from {', '.join(DEFAULT_MIX[app_name])}")
+        mix[op] = float(weight or 1)
+    return mix
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", choices=APPS, default="flask")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32],
+                        help="concurrency levels, run in order")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each level")
+    parser.add_argument("--mix", nargs="+", metavar="OP=WEIGHT",
+                        help="operation weights (default: " + "; ".join(
+                            f"{app}: " + " ".join(f"{op}={w}" for op, w in mix.items())
+                            for app, mix in DEFAULT_MIX.items()) + ")")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean think time between a user's requests")
+    parser.add_argument("--mode", choices=("fast", "full", "tiered"), help="scoring mode sent with flask screenings")
+    parser.add_argument("--corpus-size", type=int, default=20, help="distinct resumes")
+    parser.add_argument("--resume-size", choices=list(synthetic.SIZES), default="medium")
+    parser.add_argument("--jobs", type=int, default=5, help="seeded jobs / distinct job descriptions")
+    parser.add_argument("--jd-size", choices=list(synthetic.SIZES), default="small")
+    parser.add_argument("--hr-users", type=int, default=8, help="seeded HR accounts the virtual users share")
+    parser.add_argument("--repeat-ratio", type=float, default=0.2,
+                        help="share of uploads resent unchanged (result memo hits)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated stub LLM latency")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--saturation-gain", type=float, default=0.10)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:  # child: the app under test
+        serve(args.app, args.port, args.workdir, args.jobs, args.hr_users, args.jd_size, args.llm_latency_ms)
+        return 0
+
+    mix = _parse_mix(args.mix, args.app)
+    corpus = Corpus(args.corpus_size, args.resume_size, args.jobs, args.jd_size, args.repeat_ratio)
+    print(f"{args.app}: mix {' '.join(f'{op}={w:g}' for op, w in mix.items())}, "
+          f"{args.duration:g}s per level after {args.warmup:g}s warmup")
+    levels = []
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        process, base_url = start_server(args, workdir)
+        try:
+            for users in args.users:
+                level = run_level(args, base_url, corpus, users, mix)
+                levels.append(level)
+                _print_level(level)
+                if process.poll() is not None:
+                    print("\nserver exited")
+                    break
+        finally:
+            stop_server(process)
+
+    saturation = find_saturation(levels, args.saturation_gain, args.max_error_rate)
+    if saturation is None:
+        print("\nNo saturation up to the highest level; add higher --users levels to find it.")
+    else:
+        capacity = saturation["capacity"]
+        print(f"\nSaturated at {saturation['users']} users ({saturation['reason']}).")
+        if capacity:
+            print(f"Capacity: about {capacity['rps']:.1f} req/s at {capacity['users']} users "
+                  f"(p95 {capacity['p95_ms']:.1f} ms).")
+    if args.output:
+        report = {"app": args.app, "mix": mix, "args": {k: v for k, v in vars(args).items()
+                                                       if k not in ("serve", "port", "workdir")},
+                  "levels": levels, "saturation": saturation}
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""Offline benchmark suite for the screening hot paths.
+
+Generates a synthetic corpus (see synthetic.py), swaps in the deterministic
+stub embedder/LLM (see stubs.py) and times each stage at several input sizes.
+Results are written as JSON so runs can be compared between commits:
+
+    python benchmarks/run.py                               # -> benchmarks/results/<commit>.json
+    python benchmarks/run.py --sizes small --iterations 20 --stages pdf_read skill_extract
+    python benchmarks/run.py --compare results/old.json results/new.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+for _path in (ROOT, os.path.join(ROOT, "backend"), BENCH_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import ats_service  # noqa: E402
+import embeddings  # noqa: E402
+import skill_matcher  # noqa: E402
+import stubs  # noqa: E402
+import summarizer  # noqa: E402
+import synthetic  # noqa: E402
+import text_processing  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+class Case:
+    """Inputs for one size bucket, materialized once before timing."""
+
+    def __init__(self, size: str, count: int, workdir: str):
+        self.size = size
+        self.pairs = synthetic.corpus(size, count)
+        self.pdf_paths: List[Path] = []
+        for i, pair in enumerate(self.pairs):
+            path = Path(workdir) / f"{size}-{i}.pdf"
+            path.write_bytes(synthetic.make_pdf(pair["resume"]))
+            self.pdf_paths.append(path)
+
+
+@lru_cache(maxsize=1)
+def _screener():
+    from services.resume_screener import ResumeScreener
+    return ResumeScreener()
+
+
+def _extractive_summary(text: str) -> str:
+    summarizer._cache.clear()  # time the encode + selection, not the summary cache
+    return summarizer.summarize(text)
+
+
+# Each stage takes (case, i) and processes the i-th item of the case
+STAGES: Dict[str, Callable] = {
+    "pdf_read": lambda case, i: ats_service._read_pdf_text(case.pdf_paths[i]),
+    "text_process": lambda case, i: text_processing.process(case.pairs[i]["resume"]).tokens,
+    "skill_extract": lambda case, i: ats_service._simple_skill_extract(case.pairs[i]["resume"]),
+    "skill_match_semantic": lambda case, i: skill_matcher.get_skill_matcher().match(case.pairs[i]["resume"]),
+    "summary": lambda case, i: ats_service._simple_summary(case.pairs[i]["resume"]),
+    "summary_extractive": lambda case, i: _extractive_summary(case.pairs[i]["resume"]),
+    "embed": lambda case, i: embeddings.get_embedder().encode([case.pairs[i]["jd"], case.pairs[i]["resume"]]),
+    "prompt_build": lambda case, i: ats_service._build_prompt(case.pairs[i]["jd"], case.pairs[i]["resume"]),
+    "process_ats": lambda case, i: ats_service.process_ats(case.pairs[i]["jd"], case.pdf_paths[i]),
+    "process_ats_tiered": lambda case, i: ats_service.process_ats(case.pairs[i]["jd"], case.pdf_paths[i], mode="tiered"),
+    "process_ats_fast": lambda case, i: ats_service.process_ats(case.pairs[i]["jd"], case.pdf_paths[i], mode="fast"),
+    "screen_resume": lambda case, i: _screener().screen_resume(case.pairs[i]["jd"], case.pairs[i]["resume"]),
+}
+
+
+def time_stage(fn: Callable, case: Case, iterations: int, warmup: int = 2) -> Dict[str, float]:
+    n = len(case.pairs)
+    for i in range(min(warmup, n)):
+        fn(case, i)
+    samples = []
+    started = time.perf_counter()
+    for k in range(iterations):
+        t0 = time.perf_counter()
+        fn(case, k % n)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    wall = time.perf_counter() - started
+    samples.sort()
+    return {
+        "n": iterations,
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "max_ms": samples[-1],
+        "ops_per_s": iterations / wall if wall else 0.0,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run(sizes: List[str], stages: List[str], iterations: int, corpus_size: int, llm_latency_ms: float) -> Dict:
+    stubs.install(llm=True, llm_latency_ms=llm_latency_ms)
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            case = Case(size, corpus_size, workdir)
+            for stage in stages:
+                stats = time_stage(STAGES[stage], case, iterations)
+                results.setdefault(stage, {})[size] = stats
+                print(f"{stage:>14} {size:>6}: p50 {stats['p50_ms']:8.2f} ms  "
+                      f"p95 {stats['p95_ms']:8.2f} ms  {stats['ops_per_s']:9.1f} ops/s")
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "corpus_size": corpus_size,
+            "llm_latency_ms": llm_latency_ms,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    """Print p50 ratios new/old; exit 1 if any stage regressed by more than threshold."""
+    with open(old_path) as f:
+        old = json.load(f)["results"]
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    regressed = False
+    for stage in sorted(set(old) & set(new)):
+        for size in sorted(set(old[stage]) & set(new[stage])):
+            a, b = old[stage][size]["p50_ms"], new[stage][size]["p50_ms"]
+            ratio = b / a if a else float("inf")
+            flag = ""
+            if ratio > 1 + threshold:
+                flag, regressed = "  REGRESSION", True
+            elif ratio < 1 - threshold:
+                flag = "  faster"
+            print(f"{stage:>14} {size:>6}: {a:8.2f} -> {b:8.2f} ms  x{ratio:.2f}{flag}")
+    return 1 if regressed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=list(synthetic.SIZES), choices=list(synthetic.SIZES))
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--corpus-size", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated stub LLM latency")
+    parser.add_argument("--output", help="result JSON path (default: results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold for --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(args.compare[0], args.compare[1], args.threshold)
+
+    report = run(args.sizes, args.stages, args.iterations, args.corpus_size, args.llm_latency_ms)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Deterministic offline stand-ins for the embedding model and the chat LLM.
+
+``install()`` swaps them into ``embeddings`` and ``ats_service`` so benchmarks
+(and the load-test harness) exercise the real scoring code without network
+access, model downloads or GPU. The stubs are cheap but not free: the hash
+embedder does real tokenization and vector math so relative costs stay sane.
+"""
+import hashlib
+import json
+import re
+import time
+from typing import Sequence
+
+import numpy as np
+
+import ats_service
+import embeddings
+from model_manager import MODELS
+
+_TOKEN = re.compile(r"[a-z0-9+#/.]+")
+
+
+class HashEmbedder(embeddings.Embedder):
+    """Feature-hashing bag-of-words embedder: same text -> same unit vector."""
+
+    backend = "stub"
+
+    def __init__(self, model_name: str = "hash-384", dim: int = 384):
+        super().__init__(model_name)
+        self.dim = dim
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN.findall(text.lower()):
+                digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                out[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.clip(norms, 1e-12, None)
+
+
+class StubLLM:
+    """Returns a well-formed ATS JSON answer after an optional simulated delay."""
+
+    model_name = "stub-llm"
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+
+    def chat(self, prompt: str, max_new_tokens: int = 512, temperature: float = 0.1) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        score = int(hashlib.sha256(prompt.encode()).hexdigest()[:4], 16) % 101
+        answer = {
+            "Job Summary": "Stub job summary.",
+            "Resume Summary": "Stub resume summary.",
+            "ATS Score": score,
+            "Fit Verdict": ats_service._ensure_verdict(score),
+            "Matched Skills": [],
+            "Missing Skills": [],
+            "Feedback": "Generated by the benchmark stub LLM.",
+        }
+        return json.dumps(answer)
+
+
+def install(llm: bool = True, llm_latency_ms: float = 0.0) -> None:
+    """Route embeddings (and optionally LLM calls) to the stubs for this process."""
+    embeddings.BACKENDS[HashEmbedder.backend] = HashEmbedder
+    embeddings.EMBED_BACKEND = HashEmbedder.backend
+    if llm:
+        ats_service.HF_AVAILABLE = True
+        ats_service._hf_failed = False
+        MODELS.put(ats_service.hf_chat_key(), StubLLM(llm_latency_ms))
+    else:
+        ats_service.HF_AVAILABLE = False
+        MODELS.unload(ats_service.hf_chat_key())
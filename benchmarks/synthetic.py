@@ -0,0 +1,179 @@
+"""Deterministic synthetic resumes, job descriptions, PDFs and DOCX files for benchmarks.
+
+Everything is generated from a seed with the standard library only, so the
+same corpus is produced on every machine and benchmark runs can be compared
+between commits.
+"""
+import io
+import random
+import textwrap
+import zipfile
+from xml.sax.saxutils import escape
+from typing import Dict, List
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "go", "sql", "django", "flask", "fastapi",
+    "react", "angular", "vue", "node", "spring", "pandas", "numpy", "pytorch", "tensorflow",
+    "scikit-learn", "nlp", "aws", "azure", "gcp", "docker", "kubernetes", "ci/cd", "graphql",
+    "microservices", "git", "linux", "postgresql", "redis", "kafka", "terraform", "spark",
+]
+
+ROLES = [
+    "Backend Engineer", "Frontend Developer", "Data Scientist", "DevOps Engineer",
+    "Machine Learning Engineer", "Full Stack Developer", "Platform Engineer", "Data Engineer",
+]
+
+FILLER = [
+    "Collaborated with product and design to ship customer-facing features on a weekly cadence.",
+    "Reduced p95 latency of the public API by profiling hot paths and adding caching.",
+    "Mentored junior engineers through code review, pairing and internal tech talks.",
+    "Owned the on-call rotation and wrote runbooks that cut incident resolution time.",
+    "Migrated legacy services to containers and automated deployments end to end.",
+    "Designed data models and wrote migrations for a multi-tenant relational database.",
+    "Built dashboards and alerts that surfaced regressions before customers noticed.",
+    "Led the evaluation of third-party vendors and negotiated integration requirements.",
+]
+
+# Approximate number of body sentences per size bucket
+SIZES: Dict[str, int] = {"small": 8, "medium": 40, "large": 200}
+
+
+def make_resume(size: str = "medium", seed: int = 0) -> str:
+    rng = random.Random(f"resume-{size}-{seed}")
+    role = rng.choice(ROLES)
+    skills = rng.sample(SKILLS, k=min(len(SKILLS), 6 + SIZES[size] // 10))
+    lines = [
+        f"Candidate {seed}",
+        f"candidate{seed}@example.com | +1 555 {seed:04d} | linkedin.com/in/candidate{seed}",
+        f"{role} with {rng.randint(1, 15)} years of experience.",
+        "Skills: " + ", ".join(skills),
+        "Experience",
+    ]
+    for i in range(SIZES[size]):
+        if i % 5 == 0:
+            lines.append(f"{rng.choice(ROLES)} at Company {rng.randint(1, 500)} ({2010 + i % 14})")
+        sentence = rng.choice(FILLER)
+        if rng.random() < 0.4:
+            sentence += f" Used {rng.choice(skills)} and {rng.choice(skills)} daily."
+        lines.append(sentence)
+    lines.append("Education: B.Sc. Computer Science")
+    return "\n".join(lines)
+
+
+def make_jd(size: str = "medium", seed: int = 0) -> str:
+    rng = random.Random(f"jd-{size}-{seed}")
+    role = rng.choice(ROLES)
+    required = rng.sample(SKILLS, k=6)
+    parts = [
+        f"We are hiring a {role} to join our platform team.",
+        "Required skills: " + ", ".join(required) + ".",
+        f"You have {rng.randint(2, 8)}+ years of professional experience.",
+    ]
+    parts.extend(rng.choice(FILLER) for _ in range(max(2, SIZES[size] // 4)))
+    return " ".join(parts)
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text: str, lines_per_page: int = 60, width: int = 95) -> bytes:
+    """Minimal multi-page text PDF (Helvetica, one Tj per line) that PyPDF2 can read back."""
+    lines: List[str] = []
+    for paragraph in text.splitlines():
+        lines.extend(textwrap.wrap(paragraph, width) or [""])
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects: List[bytes] = []  # object n is objects[n - 1]
+    font_id = 3
+    page_ids = []
+    objects.append(b"")  # 1: catalog, filled below
+    objects.append(b"")  # 2: pages tree, filled below
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for page_lines in pages:
+        body = "BT /F1 10 Tf 12 TL 50 800 Td\n" + "".join(
+            f"({_pdf_escape(line)}) Tj T*\n" for line in page_lines
+        ) + "ET"
+        stream = body.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append((
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode())
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+_DOCX_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/header1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+    'officeDocument" Target="word/document.xml"/></Relationships>'
+)
+_DOCX_DOC_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+    'header" Target="header1.xml"/></Relationships>'
+)
+
+
+def _docx_paragraph(text: str) -> str:
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def make_docx(text: str, table_every: int = 10) -> bytes:
+    """Minimal DOCX that python-docx can open: the first line goes in a page header,
+    and every ``table_every``-th line becomes a two-cell table row (0: no tables)."""
+    lines = text.splitlines() or [""]
+    body = []
+    for i, line in enumerate(lines[1:], start=1):
+        if table_every and i % table_every == 0:
+            left, _, right = line.partition(" ")
+            body.append(f"<w:tbl><w:tr><w:tc>{_docx_paragraph(left)}</w:tc>"
+                        f"<w:tc>{_docx_paragraph(right)}</w:tc></w:tr></w:tbl>")
+        else:
+            body.append(_docx_paragraph(line))
+    document = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {_DOCX_NS}><w:body>'
+                + "".join(body) + "<w:sectPr/></w:body></w:document>")
+    header = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:hdr {_DOCX_NS}>{_docx_paragraph(lines[0])}</w:hdr>'
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        z.writestr("_rels/.rels", _DOCX_RELS)
+        z.writestr("word/_rels/document.xml.rels", _DOCX_DOC_RELS)
+        z.writestr("word/document.xml", document)
+        z.writestr("word/header1.xml", header)
+    return buf.getvalue()
+
+
+def corpus(size: str, count: int) -> List[Dict[str, str]]:
+    """``count`` (jd, resume) pairs of the given size bucket."""
+    return [{"jd": make_jd(size, i), "resume": make_resume(size, i)} for i in range(count)]
@@ -0,0 +1,195 @@
+"""Per-worker memory of forked web workers, with and without model preloading.
+
+Mimics a pre-forking server: a master process imports the scoring code, forks
+``--workers`` workers and each worker serves a few screenings' worth of
+encodes. In ``lazy`` mode every worker loads the embedding model itself; in
+``preload`` mode the master loads it first (preload.preload()) and the workers
+inherit it. Once all workers are warm the master reads /proc/<pid>/smaps_rollup
+and reports per worker:
+
+- USS (unique set size): private pages only this worker holds,
+- PSS: RSS with shared pages divided among the processes sharing them,
+- RSS.
+
+The sum of PSS over master and workers is the real memory cost of the
+deployment. Exits 1 if a preloaded worker's mean USS is not below
+``--max-uss-ratio`` of a lazy worker's, so this doubles as a regression check.
+
+Uses the configured embedding model when sentence-transformers is installed,
+otherwise (or with ``--ballast-mb``) a stand-in embedder holding that many MB
+of float32 weights that every encode reads. Linux only.
+
+    python benchmarks/worker_rss.py
+    python benchmarks/worker_rss.py --workers 8 --ballast-mb 400 --modes preload
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+for _path in (ROOT, BENCH_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+MODES = ("lazy", "preload")
+_MB = 1024 * 1024
+
+
+def smaps(pid: int) -> Dict[str, float]:
+    """RSS, PSS and USS of ``pid`` in MB."""
+    fields: Dict[str, int] = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {"rss_mb": fields.get("Rss", 0) / 1024.0, "pss_mb": fields.get("Pss", 0) / 1024.0,
+            "uss_mb": uss / 1024.0}
+
+
+def _install_ballast(mb: float) -> None:
+    import numpy as np
+
+    import embeddings
+    import stubs
+
+    class BallastEmbedder(stubs.HashEmbedder):
+        """Hash embedder projected through ``mb`` MB of weights, like a real model's read pattern."""
+
+        backend = "ballast"
+
+        def __init__(self, model_name: str = "ballast"):
+            super().__init__(model_name)
+            rows = max(1, int(mb * _MB) // (4 * self.dim))
+            self.weights = np.random.default_rng(0).standard_normal((rows, self.dim), dtype=np.float32)
+
+        def encode(self, texts, batch_size: int = 32):
+            hashed = super().encode(texts, batch_size)
+            out = (hashed @ self.weights.T) @ self.weights
+            return out / np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+
+    embeddings.BACKENDS[BallastEmbedder.backend] = BallastEmbedder
+    embeddings.EMBED_BACKEND = BallastEmbedder.backend
+    embeddings.EMBED_MODEL_NAME = f"ballast-{mb:g}mb"
+
+
+def _serve(workers: int, requests: int, ready_w: int, release_r: int) -> None:
+    """Body of one forked worker: warm up like a request would, report ready, wait."""
+    import preload
+    import synthetic
+    from embeddings import get_embedder
+
+    preload.after_fork(workers)
+    embedder = get_embedder()
+    for i in range(requests):
+        embedder.encode([synthetic.make_resume("medium", i), synthetic.make_jd("medium", i)])
+    gc.collect()  # a worker's GC passes are what dirty unfrozen shared objects
+    os.write(ready_w, b".")
+    os.read(release_r, 1)  # returns when the master closes the pipe
+
+
+def run_mode(mode: str, workers: int, requests: int) -> Dict[str, object]:
+    """Fork ``workers`` workers from this process and measure them (run in a fresh interpreter)."""
+    import ats_service  # noqa: F401  (what a web master has imported before it forks)
+    import preload
+
+    if mode == "preload":
+        preload.preload(load_llm=False)
+    ready_r, ready_w = os.pipe()
+    release_r, release_w = os.pipe()
+    pids: List[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(release_w)
+            try:
+                _serve(workers, requests, ready_w, release_r)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    os.close(ready_w)
+    os.close(release_r)
+    ready = 0
+    while ready < workers:
+        chunk = os.read(ready_r, workers)
+        if not chunk:
+            break  # a worker died
+        ready += len(chunk)
+    try:
+        return {"mode": mode, "master": smaps(os.getpid()), "workers": [smaps(pid) for pid in pids],
+                "ready": ready}
+    finally:
+        os.close(release_w)
+        for pid in pids:
+            os.waitpid(pid, 0)
+
+
+def _report(result: Dict[str, object]) -> float:
+    rows = result["workers"]
+    print(f"\n{result['mode']}: {len(rows)} worker(s)")
+    print(f"  {'':>8} {'RSS MB':>9} {'PSS MB':>9} {'USS MB':>9}")
+    for i, row in enumerate([result["master"]] + rows):
+        label = "master" if i == 0 else f"worker {i}"
+        print(f"  {label:>8} {row['rss_mb']:9.1f} {row['pss_mb']:9.1f} {row['uss_mb']:9.1f}")
+    mean_uss = statistics.mean(r["uss_mb"] for r in rows)
+    total_pss = result["master"]["pss_mb"] + sum(r["pss_mb"] for r in rows)
+    print(f"  mean worker USS {mean_uss:.1f} MB, total PSS {total_pss:.1f} MB")
+    return mean_uss
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=5, help="encodes per worker before measuring")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--ballast-mb", type=float, default=None,
+                        help="stand-in model size (default: the real model if installed, else 200)")
+    parser.add_argument("--max-uss-ratio", type=float, default=0.5,
+                        help="fail unless preload USS < ratio * lazy USS (both modes only)")
+    parser.add_argument("--single", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.ballast_mb is None:
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError:
+            args.ballast_mb = 200.0
+    if args.single:  # child: one mode in a fresh interpreter, JSON on stdout
+        if args.ballast_mb:
+            _install_ballast(args.ballast_mb)
+        print(json.dumps(run_mode(args.single, args.workers, args.requests)))
+        return 0
+
+    model = f"ballast {args.ballast_mb:g} MB" if args.ballast_mb else "configured embedding model"
+    print(f"{args.workers} forked worker(s), {model}, {args.requests} encode(s) each")
+    uss: Dict[str, float] = {}
+    for mode in args.modes:
+        cmd = [sys.executable, os.path.abspath(__file__), "--single", mode, "--workers", str(args.workers),
+               "--requests", str(args.requests)]
+        if args.ballast_mb:
+            cmd += ["--ballast-mb", str(args.ballast_mb)]
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        if result["ready"] < args.workers:
+            print(f"{mode}: only {result['ready']} of {args.workers} workers came up")
+            return 1
+        uss[mode] = _report(result)
+    if len(uss) == len(MODES):
+        ratio = uss["preload"] / uss["lazy"] if uss["lazy"] else 0.0
+        ok = ratio < args.max_uss_ratio
+        print(f"\n[{'OK' if ok else 'FAIL'}] preloaded worker USS is {ratio:.0%} of lazy "
+              f"(limit {args.max_uss_ratio:.0%})")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Content-addressed file store for uploads.
+
+Files are named by the SHA-256 of their content and sharded into two levels of
+subdirectories (``ab/cd/abcd...pdf``), so identical uploads are stored once,
+uploads with the same original name never overwrite each other and no single
+directory grows without bound. The store only knows blob keys; callers keep
+their own index from user-facing names to keys (see ``StoredFile`` in app.py)
+and pass the set of still-referenced keys to ``sweep``.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Set, Union
+
+from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_RETENTION_HOURS = float(os.getenv("UPLOAD_RETENTION_HOURS", "168"))
+UPLOAD_SWEEP_INTERVAL_S = float(os.getenv("UPLOAD_SWEEP_INTERVAL_S", "3600"))
+
+BLOB_PUTS = Counter("blob_puts_total", "Blobs written by result (new, duplicate).", ["result"])
+BLOB_SWEPT = Counter("blob_swept_total", "Unreferenced blobs deleted by the retention sweeper.")
+
+_CHUNK = 1024 * 1024
+
+
+def _normalize_suffix(suffix: str) -> str:
+    suffix = (suffix or "").lower()
+    if suffix and not suffix.startswith("."):
+        suffix = "." + suffix
+    return suffix if suffix[1:].isalnum() else ""
+
+
+class BlobStore:
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self._tmp = self.root / "tmp"
+        self._sweeper: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        """Location of blob ``key`` (``<sha256><suffix>``)."""
+        if len(key) < 64 or "/" in key or "\\" in key or key.startswith("."):
+            raise ValueError(f"Not a blob key: {key!r}")
+        return self.root / key[:2] / key[2:4] / key
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def put(self, source: Union[bytes, BinaryIO], suffix: str = "") -> str:
+        """Store ``source`` (bytes or a readable binary stream) and return its key.
+
+        The content is hashed while it is copied to a temp file, which is then
+        renamed into place; if the blob already exists the copy is dropped.
+        ``suffix`` (e.g. ".pdf") is kept on the key so extractors can tell file types apart.
+        """
+        self._tmp.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                if isinstance(source, (bytes, bytearray, memoryview)):
+                    digest.update(source)
+                    out.write(source)
+                else:
+                    for chunk in iter(lambda: source.read(_CHUNK), b""):
+                        digest.update(chunk)
+                        out.write(chunk)
+            key = digest.hexdigest() + _normalize_suffix(suffix)
+            target = self.path(key)
+            if target.exists():
+                os.utime(target)  # a fresh reference: restart its retention clock
+                BLOB_PUTS.labels("duplicate").inc()
+                return key
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp, target)
+            tmp = None
+            BLOB_PUTS.labels("new").inc()
+            return key
+        finally:
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except FileNotFoundError:
+                    pass
+
+    def put_file(self, path: Union[str, Path]) -> str:
+        with open(path, "rb") as f:
+            return self.put(f, Path(path).suffix)
+
+    def keys(self) -> Iterator[str]:
+        for shard in sorted(self.root.glob("[0-9a-f][0-9a-f]/[0-9a-f][0-9a-f]")):
+            for entry in os.scandir(shard):
+                if entry.is_file():
+                    yield entry.name
+
+    def sweep(self, referenced: Iterable[str], older_than: float) -> int:
+        """Delete blobs not in ``referenced`` whose mtime is before ``older_than``
+        (epoch seconds), plus stale temp files. Returns the number of blobs deleted."""
+        live: Set[str] = set(referenced)
+        deleted = 0
+        for key in list(self.keys()):
+            if key in live:
+                continue
+            path = self.path(key)
+            try:
+                if path.stat().st_mtime < older_than:
+                    path.unlink()
+                    deleted += 1
+            except FileNotFoundError:
+                pass
+        if self._tmp.exists():
+            for entry in os.scandir(self._tmp):  # left behind by writers that crashed
+                if entry.is_file() and entry.stat().st_mtime < older_than:
+                    os.unlink(entry.path)
+        BLOB_SWEPT.inc(deleted)
+        return deleted
+
+    def start_sweeper(self, sweep: Callable[[], int], interval: float = UPLOAD_SWEEP_INTERVAL_S) -> None:
+        """Run ``sweep()`` every ``interval`` seconds on a daemon thread (idempotent)."""
+        if interval <= 0 or self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_loop, args=(sweep, interval),
+                                                 name="upload-sweeper", daemon=True)
+                self._sweeper.start()
+
+    @staticmethod
+    def _sweep_loop(sweep: Callable[[], int], interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                deleted = sweep()
+                if deleted:
+                    logger.info("Upload sweeper deleted %d blob(s)", deleted)
+            except Exception:
+                logger.exception("Upload sweep failed")
+
+
+def retention_cutoff(hours: float = UPLOAD_RETENTION_HOURS) -> float:
+    """Epoch seconds before which unreferenced uploads may be deleted."""
+    return time.time() - hours * 3600.0
@@ -0,0 +1,257 @@
+"""BM25 inverted index over resume text: a shortlist stage for candidate ranking.
+
+``BM25Index.search`` returns the top lexical matches for a JD; ``rerank`` orders
+them by embedding cosine, the same similarity ``ResumeScreener.calculate_similarity``
+uses. ``/hr/jobs/<id>/matches`` then only has to read the shortlisted resumes'
+stored vectors instead of every one (see benchmarks/bm25_bench.py).
+
+The index lives in memory and is persisted as an append-only journal
+(``BM25_INDEX_DIR/journal.jsonl``) of add/remove operations, so ingest updates
+it incrementally. Every process replays the journal on load and picks up lines
+appended by other processes before each search. ``compact()`` rewrites the
+journal with only the live documents.
+"""
+import json
+import math
+import os
+import threading
+from array import array
+from collections import Counter as TermCounter
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from metrics import Histogram
+from text_processing import TOKEN, ProcessedText
+
+BM25_INDEX_DIR = os.getenv("BM25_INDEX_DIR", os.path.join(".cache", "bm25"))
+BM25_SHORTLIST = int(os.getenv("BM25_SHORTLIST", "300"))            # minimum shortlist size
+BM25_SHORTLIST_FRACTION = float(os.getenv("BM25_SHORTLIST_FRACTION", "0.05"))  # of the corpus, if larger
+BM25_QUERY_TERMS = int(os.getenv("BM25_QUERY_TERMS", "32"))         # JD terms kept, by tf * idf
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+BM25_SEARCH_SECONDS = Histogram("bm25_search_seconds", "BM25 shortlist latency per query.")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that the their this to was we "
+    "were will with you your".split()
+)
+
+
+def tokenize(text: Union[str, ProcessedText]) -> List[str]:
+    """Lowercased terms; keeps tech tokens like c++, c#, node.js and ci/cd parts."""
+    terms = text.tokens if isinstance(text, ProcessedText) else TOKEN.findall(text.lower())
+    return [t for t in terms if t not in _STOPWORDS and (len(t) > 1 or t in "cr")]
+
+
+class BM25Index:
+    def __init__(self, path: Optional[str] = BM25_INDEX_DIR, k1: float = BM25_K1, b: float = BM25_B):
+        """``path=None`` keeps the index in memory only (benchmarks, tests)."""
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._reset()
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._catch_up()
+
+    def _reset(self) -> None:
+        self._ids: List[Hashable] = []            # internal doc number -> external id
+        self._doc_no: Dict[Hashable, int] = {}     # external id -> live doc number
+        self._lengths = array("f")                 # 0.0 for removed docs
+        self._alive = bytearray()
+        self._doc_terms: List[Optional[Tuple[str, ...]]] = []  # needed to undo a doc on re-index/remove
+        self._postings: Dict[str, Tuple[array, array]] = {}  # term -> (doc numbers, term freqs)
+        self._df: Dict[str, int] = {}
+        self._total_length = 0.0
+        self._offset = 0
+        self._inode = None
+
+    @property
+    def journal_path(self) -> Optional[str]:
+        return os.path.join(self.path, "journal.jsonl") if self.path else None
+
+    def __len__(self) -> int:
+        return len(self._doc_no)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        self._catch_up()
+        return doc_id in self._doc_no
+
+    # -------------------- Updates --------------------
+    def add(self, doc_id: Hashable, text: Union[str, ProcessedText]) -> None:
+        """Index (or re-index) one document."""
+        self._write({"op": "add", "id": doc_id, "tf": dict(TermCounter(tokenize(text)))})
+
+    def remove(self, doc_id: Hashable) -> None:
+        self._write({"op": "remove", "id": doc_id})
+
+    def _write(self, entry: dict) -> None:
+        if not self.path:
+            with self._lock:
+                self._apply(entry)
+            return
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(line)  # one write per line keeps concurrent appenders line-atomic
+            self._catch_up()
+
+    def _apply(self, entry: dict) -> None:
+        doc_id = entry["id"]
+        old = self._doc_no.pop(doc_id, None)
+        if old is not None:
+            self._alive[old] = 0
+            self._total_length -= self._lengths[old]
+            self._lengths[old] = 0.0
+            for term in self._doc_terms[old]:
+                self._df[term] -= 1
+            self._doc_terms[old] = None
+        if entry["op"] != "add":
+            return
+        number = len(self._ids)
+        self._ids.append(doc_id)
+        self._doc_no[doc_id] = number
+        length = float(sum(entry["tf"].values()))
+        self._lengths.append(length)
+        self._alive.append(1)
+        self._doc_terms.append(tuple(entry["tf"]))
+        self._total_length += length
+        for term, tf in entry["tf"].items():
+            docs, tfs = self._postings.setdefault(term, (array("i"), array("f")))
+            docs.append(number)
+            tfs.append(tf)
+            self._df[term] = self._df.get(term, 0) + 1
+
+    def _catch_up(self) -> None:
+        """Apply journal lines appended since the last read (by any process)."""
+        if not self.path:
+            return
+        with self._lock:
+            try:
+                stat = os.stat(self.journal_path)
+            except FileNotFoundError:
+                return
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._reset()  # journal was compacted (replaced) by another process
+                self._inode = stat.st_ino
+            if stat.st_size == self._offset:
+                return
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1  # leave a partially written last line for next time
+            for raw in data[:end].splitlines():
+                if raw.strip():
+                    self._apply(json.loads(raw))
+            self._offset += end
+
+    def compact(self) -> None:
+        """Rewrite the journal with one add per live document and drop removed postings."""
+        with self._lock:
+            self._catch_up()
+            live = sorted(self._doc_no.items(), key=lambda item: item[1])
+            per_doc: Dict[int, Dict[str, float]] = {number: {} for _, number in live}
+            for term, (docs, tfs) in self._postings.items():
+                for number, tf in zip(docs, tfs):
+                    if number in per_doc:
+                        per_doc[number][term] = int(tf)
+            entries = [{"op": "add", "id": doc_id, "tf": per_doc[number]} for doc_id, number in live]
+            if self.path:
+                tmp = self.journal_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    for entry in entries:
+                        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                os.replace(tmp, self.journal_path)
+            self._reset()
+            if self.path:
+                self._catch_up()
+            else:
+                for entry in entries:
+                    self._apply(entry)
+
+    # -------------------- Queries --------------------
+    @staticmethod
+    def shortlist_size(n_docs: int) -> int:
+        """``BM25_SHORTLIST``, or ``BM25_SHORTLIST_FRACTION`` of the corpus once that is larger."""
+        return max(BM25_SHORTLIST, int(n_docs * BM25_SHORTLIST_FRACTION))
+
+    def _query_terms(self, query: str, n_docs: int) -> List[Tuple[str, float]]:
+        """(term, weight) for the ``BM25_QUERY_TERMS`` most distinctive query terms.
+
+        A JD repeats its key skills and is padded with boilerplate; weighting each
+        term by its query frequency times idf and dropping the tail keeps the score
+        on the skills instead of on words every resume contains.
+        """
+        weighted = []
+        for term, qtf in TermCounter(tokenize(query)).items():
+            df = self._df.get(term, 0)
+            if df > 0:
+                weighted.append((term, qtf * math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))))
+        weighted.sort(key=lambda item: item[1], reverse=True)
+        return weighted[:BM25_QUERY_TERMS]
+
+    def search(self, query: str, k: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """Top-``k`` (doc_id, bm25) pairs for ``query``, best first (default: ``shortlist_size``)."""
+        with BM25_SEARCH_SECONDS.time():
+            self._catch_up()
+            with self._lock:
+                n_docs = len(self._doc_no)
+                if k is None:
+                    k = self.shortlist_size(n_docs)
+                if not n_docs or k <= 0:
+                    return []
+                lengths = np.frombuffer(self._lengths, dtype=np.float32)
+                avgdl = self._total_length / n_docs or 1.0
+                norm = self.k1 * (1.0 - self.b + self.b * lengths / avgdl)
+                scores = np.zeros(len(self._ids), dtype=np.float32)
+                for term, weight in self._query_terms(query, n_docs):
+                    docs = np.frombuffer(self._postings[term][0], dtype=np.int32)
+                    tfs = np.frombuffer(self._postings[term][1], dtype=np.float32)
+                    scores[docs] += weight * tfs * (self.k1 + 1.0) / (tfs + norm[docs])
+                scores *= np.frombuffer(self._alive, dtype=np.uint8)
+                k = min(k, len(scores))
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top], kind="stable")]
+                return [(self._ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def rerank(query_embedding: np.ndarray, shortlist: Sequence[Tuple[Hashable, float]],
+           vectors: Mapping[Hashable, np.ndarray], k: Optional[int] = None) -> List[Tuple[Hashable, float, float]]:
+    """Order a BM25 shortlist by embedding cosine: (doc_id, cosine, bm25), best first.
+
+    Candidates without a stored vector keep their BM25 order after the embedded ones.
+    """
+    embedded = [(doc_id, bm25) for doc_id, bm25 in shortlist if vectors.get(doc_id) is not None]
+    ranked: List[Tuple[Hashable, float, float]] = []
+    if embedded:
+        matrix = np.stack([vectors[doc_id] for doc_id, _ in embedded]).astype(np.float32)
+        cosines = matrix @ np.asarray(query_embedding, dtype=np.float32)
+        order = np.argsort(-cosines, kind="stable")
+        ranked = [(embedded[i][0], float(cosines[i]), embedded[i][1]) for i in order]
+    ranked += [(doc_id, float("nan"), bm25) for doc_id, bm25 in shortlist if vectors.get(doc_id) is None]
+    return ranked[:k] if k is not None else ranked
+
+
+_index: Optional[BM25Index] = None
+_index_lock = threading.Lock()
+
+
+def get_resume_index() -> BM25Index:
+    """Process-wide resume index at BM25_INDEX_DIR, loaded on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = BM25Index(BM25_INDEX_DIR)
+    return _index
+
+
+def build(docs: Iterable[Tuple[Hashable, str]], path: Optional[str] = None) -> BM25Index:
+    """Index ``(doc_id, text)`` pairs from scratch (path=None: in memory)."""
+    index = BM25Index(path)
+    for doc_id, text in docs:
+        index.add(doc_id, text)
+    return index
@@ -0,0 +1,208 @@
+"""Bulk screening of a ZIP archive of resumes against one job description.
+
+Members are read one at a time straight from the archive (no extraction to
+disk) and scored on a small thread pool against JD artifacts prepared once.
+At most ``workers * 2`` members are held in memory at any time, so memory use
+depends on the member size cap, not on the archive size. Results are yielded
+as each resume finishes, followed by one summary row.
+
+Pass ``slot`` to admit the archive through a scheduler: the whole archive is
+screened inside one ``slot()``, so its members never queue behind each other.
+The web app uses the HR user's ``FairScheduler`` slot, so an archive counts
+against that user's cap like one interactive screening instead of bypassing it.
+"""
+import csv
+import heapq
+import io
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, IO, Iterable, Iterator, List, Optional
+
+from metrics import Counter, Histogram
+
+BULK_WORKERS = int(os.getenv("BULK_WORKERS", "4"))
+BULK_MAX_MEMBER_BYTES = int(os.getenv("BULK_MAX_MEMBER_BYTES", str(10 * 1024 * 1024)))
+BULK_MAX_MEMBERS = int(os.getenv("BULK_MAX_MEMBERS", "5000"))
+SUPPORTED_SUFFIXES = (".pdf", ".docx")
+SUMMARY_TOP_N = 10
+
+BULK_RESUMES = Counter("bulk_resumes_total", "Bulk-screened archive members by status.", ["status"])
+BULK_RESUME_SECONDS = Histogram("bulk_resume_seconds", "Extract + score time per archive member.")
+
+CSV_FIELDS = ["file", "status", "score", "verdict", "matched_skills", "missing_skills",
+              "embedding_cosine", "scoring_tier", "elapsed_ms", "error"]
+
+
+class ArchiveError(ValueError):
+    """The upload is not a readable ZIP archive."""
+
+
+def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> bytes:
+    # file_size comes from the archive header and can lie; cap the bytes actually inflated
+    with archive.open(info) as f:
+        data = f.read(limit + 1)
+    if len(data) > limit:
+        raise ValueError(f"member exceeds {limit} bytes")
+    return data
+
+
+def _screen_member(name: str, data: bytes, job, mode: Optional[str] = None) -> Dict[str, Any]:
+    from ats_service import extract_resume_bytes, score_resume_text
+
+    started = time.perf_counter()
+    try:
+        text = extract_resume_bytes(data, name)
+        if not text.strip():
+            raise ValueError("no extractable text (scanned PDF?)")
+        result = score_resume_text(job, text, mode=mode)
+    except Exception as exc:
+        row = {"file": name, "status": "error", "error": str(exc)}
+    else:
+        row = {
+            "file": name,
+            "status": "ok",
+            "score": int(result["ATS Score"]),
+            "verdict": result["Fit Verdict"],
+            "matched_skills": result["Matched Skills"],
+            "missing_skills": result["Missing Skills"],
+            "embedding_cosine": round(float(result["embedding_cosine"]), 4),
+            "scoring_tier": result["scoring_tier"],
+        }
+    elapsed = time.perf_counter() - started
+    BULK_RESUME_SECONDS.observe(elapsed)
+    row["elapsed_ms"] = round(elapsed * 1000.0, 1)
+    return row
+
+
+def _skipped(name: str, reason: str) -> Dict[str, Any]:
+    return {"file": name, "status": "skipped", "error": reason}
+
+
+def screen_archive(
+    fileobj: IO[bytes],
+    job,
+    workers: int = BULK_WORKERS,
+    max_member_bytes: int = BULK_MAX_MEMBER_BYTES,
+    max_members: int = BULK_MAX_MEMBERS,
+    mode: Optional[str] = None,
+    slot: Callable[[], ContextManager] = nullcontext,
+) -> Iterator[Dict[str, Any]]:
+    """Yield one row per archive member as it completes, then a summary row.
+
+    ``fileobj`` must be seekable (Flask/werkzeug spools uploads to a temp file);
+    ``job`` is an ``ats_service.JobArtifacts`` shared by every member; ``mode``
+    is the scoring mode (see ``ats_service.SCORING_MODES``). ``slot()`` is
+    entered once before the first row and held until the last one; an error it
+    raises (e.g. ``QueueTimeout``) propagates from the first ``next()``.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as exc:
+        raise ArchiveError(f"Not a valid ZIP archive: {exc}") from exc
+
+    started = time.perf_counter()
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    llm_calls = 0
+    score_total = 0
+    top: List[tuple] = []  # min-heap of (score, file) for the summary
+
+    def account(row: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal score_total, llm_calls
+        counts[row["status"]] += 1
+        BULK_RESUMES.labels(row["status"]).inc()
+        if row["status"] == "ok":
+            score_total += row["score"]
+            llm_calls += row["scoring_tier"] == "llm"
+            heapq.heappush(top, (row["score"], row["file"]))
+            if len(top) > SUMMARY_TOP_N:
+                heapq.heappop(top)
+        return row
+
+    max_in_flight = max(1, workers) * 2
+    seen = 0
+    with archive, slot(), \
+            ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="bulk-screen") as pool:
+        pending = set()
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+                continue
+            seen += 1
+            if seen > max_members:
+                yield account(_skipped(name, f"archive has more than {max_members} resumes"))
+                continue
+            if not name.lower().endswith(SUPPORTED_SUFFIXES):
+                yield account(_skipped(name, "unsupported file type"))
+                continue
+            if info.file_size > max_member_bytes:
+                yield account(_skipped(name, f"member exceeds {max_member_bytes} bytes"))
+                continue
+            try:
+                data = _read_member(archive, info, max_member_bytes)
+            except Exception as exc:
+                yield account(_skipped(name, str(exc)))
+                continue
+            pending.add(pool.submit(_screen_member, name, data, job, mode))
+            del data
+            # Bound memory: wait for a slot before reading the next member
+            while len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield account(fut.result())
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield account(fut.result())
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    yield {
+        "summary": True,
+        "total": total,
+        **counts,
+        "mean_score": round(score_total / counts["ok"], 1) if counts["ok"] else None,
+        "llm_calls": llm_calls,
+        "top": [{"file": f, "score": s} for s, f in sorted(top, reverse=True)],
+        "elapsed_s": round(elapsed, 2),
+        "resumes_per_s": round(total / elapsed, 2) if elapsed else None,
+    }
+
+
+def to_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def to_csv(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """CSV lines; the summary becomes a final row with status "summary"."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_FIELDS, extrasaction="ignore")
+
+    def flush() -> str:
+        value = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return value
+
+    writer.writeheader()
+    yield flush()
+    for row in rows:
+        if row.get("summary"):
+            row = {
+                "file": "(summary)",
+                "status": "summary",
+                "score": row["mean_score"],
+                "verdict": f"{row['ok']} ok / {row['error']} errors / {row['skipped']} skipped",
+                "elapsed_ms": round(row["elapsed_s"] * 1000.0, 1),
+            }
+        else:
+            row = dict(row)
+            for key in ("matched_skills", "missing_skills"):
+                if key in row:
+                    row[key] = "; ".join(row[key])
+        writer.writerow(row)
+        yield flush()
@@ -0,0 +1,99 @@
+"""Near-duplicate resume detection with MinHash signatures and LSH banding.
+
+A resume's text is reduced to word shingles and a fixed-size MinHash
+signature (``NUM_PERM`` 32-bit values). Signatures are split into ``BANDS``
+bands; two resumes share a band key with high probability only when their
+Jaccard similarity is high, so looking up the band keys of a new resume in an
+index returns a handful of candidates regardless of corpus size. Candidates
+are then confirmed with the signature-estimated Jaccard similarity.
+
+Both apps persist band keys in an indexed table/collection (see
+``ResumeLshBucket`` in app.py and mongo_models.py).
+"""
+import hashlib
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from metrics import Counter
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: candidate threshold ~ (1/16) ** (1/8) = 0.71 Jaccard
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "5"))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+DEDUP_LOOKUPS = Counter(
+    "dedup_lookups_total", "Near-duplicate lookups by outcome (unique, reused, flagged).", ["outcome"]
+)
+
+# Bump when signatures change; it prefixes the band keys, so signatures stored
+# under another version are never looked up (and never compared) again.
+SIGNATURE_VERSION = "2"
+
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(1)  # fixed seed: signatures must be stable across processes
+# Odd multipliers only: x -> (a * x + b) mod 2^32 is a permutation only when a is odd
+_A = (_rng.randint(1, 2 ** 31 - 1, size=NUM_PERM, dtype=np.int64) | 1).astype(np.uint64)
+_B = _rng.randint(0, 2 ** 31 - 1, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """32-bit hashes of the distinct k-word shingles of ``text``."""
+    words = _WORD.findall(text.lower())
+    if len(words) < k:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little") for g in grams),
+        dtype=np.uint64, count=len(grams),
+    )
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32) of ``text``; identical texts give identical signatures."""
+    hashes = shingles(text)
+    if not hashes.size:
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+    # (a * x + b) mod 2^32 for every permutation/shingle pair, min over shingles
+    with np.errstate(over="ignore"):
+        permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) & _MAX_HASH
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def to_bytes(sig: np.ndarray) -> bytes:
+    return np.asarray(sig, dtype=np.uint32).tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.uint32)
+
+
+def band_keys(sig: np.ndarray) -> List[str]:
+    """One short key per band; equal keys mean the band's rows are identical (same signature version)."""
+    keys = []
+    for band in range(BANDS):
+        chunk = np.asarray(sig[band * ROWS:(band + 1) * ROWS], dtype=np.uint32).tobytes()
+        keys.append(f"v{SIGNATURE_VERSION}:{band}:{hashlib.blake2b(chunk, digest_size=8).hexdigest()}")
+    return keys
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.mean(np.asarray(a) == np.asarray(b)))
+
+
+def best_match(sig: np.ndarray, candidates: Iterable[Tuple[object, np.ndarray]],
+               threshold: float = DEDUP_THRESHOLD) -> Optional[Tuple[object, float]]:
+    """(id, similarity) of the most similar candidate at or above ``threshold``."""
+    best = None
+    for cand_id, cand_sig in candidates:
+        score = similarity(sig, cand_sig)
+        if score >= threshold and (best is None or score > best[1]):
+            best = (cand_id, score)
+    return best
+
@@ -0,0 +1,131 @@
+"""Streaming DOCX text extraction.
+
+Reads ``word/document.xml`` (and the header/footer parts) straight from the
+ZIP container with a pull parser instead of building python-docx's object
+model. Text comes out in document order, one line per paragraph, with table
+rows as tab-separated cells; text boxes are included once (the VML fallback
+copy is skipped) and tracked deletions are left out.
+
+Each element is cleared and removed from its parent as soon as it has been
+consumed, so the tree only ever holds the open ancestors plus the elements of
+one ``_CHUNK`` of XML. The parser's memory is therefore flat in the document
+size. The returned text is not, of course. On a tiny file the fixed zlib/expat
+buffers dominate, so there is no saving over python-docx; the gap opens as
+documents grow (see benchmarks/docx_bench.py).
+"""
+import re
+import zipfile
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import Element, XMLPullParser
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_T, _TAB, _BR, _CR, _P = _W + "t", _W + "tab", _W + "br", _W + "cr", _W + "p"
+_TC, _TR, _DEL = _W + "tc", _W + "tr", _W + "del"
+# XML bytes fed to the parser at a time; every element parsed from one chunk is
+# queued (and alive) until the loop below consumes it, so this caps the tree in memory
+_CHUNK = 4096
+_HEADER = re.compile(r"word/header\d*\.xml$")
+_FOOTER = re.compile(r"word/footer\d*\.xml$")
+
+
+def _part_order(names: List[str]) -> List[str]:
+    """Headers, then the body, then footers (python-docx ignores the first and last)."""
+    key = lambda name: int(re.sub(r"\D", "", name.rsplit("/", 1)[1]) or 0)
+    headers = sorted((n for n in names if _HEADER.match(n)), key=key)
+    footers = sorted((n for n in names if _FOOTER.match(n)), key=key)
+    return headers + ["word/document.xml"] + footers
+
+
+def _events(stream: BinaryIO) -> Iterator[Tuple[str, Element]]:
+    """(event, element) pairs like iterparse, parsed ``_CHUNK`` bytes at a time (iterparse reads 16 KB)."""
+    parser = XMLPullParser(events=("start", "end"))
+    while True:
+        data = stream.read(_CHUNK)
+        if not data:
+            break
+        parser.feed(data)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def iter_part_lines(stream: BinaryIO) -> Iterator[str]:
+    """Lines of one WordprocessingML part: paragraphs, and table rows as tab-joined cells."""
+    paragraphs: List[List[str]] = []  # open paragraphs (text boxes nest inside runs) -> text pieces
+    rows: List[List[List[str]]] = []  # open table rows (nested tables stack) -> cells -> paragraphs
+    skip = 0                          # inside mc:Fallback or w:del
+    stack = []
+    for event, elem in _events(stream):
+        tag = elem.tag
+        if event == "start":
+            if tag == _MC_FALLBACK or tag == _DEL:
+                skip += 1
+            elif tag == _TR:
+                rows.append([])
+            elif tag == _TC and rows:
+                rows[-1].append([])
+            elif tag == _P:
+                paragraphs.append([])
+            stack.append(elem)
+            continue
+        stack.pop()
+        if tag == _MC_FALLBACK or tag == _DEL:
+            skip -= 1
+        elif tag == _P:
+            text = "".join(paragraphs.pop())
+            if text and not skip:
+                if rows and rows[-1]:  # paragraph inside a table cell
+                    rows[-1][-1].append(text)
+                else:
+                    yield text
+        elif tag == _TC and rows and rows[-1]:
+            rows[-1][-1] = [" ".join(rows[-1][-1])]
+        elif tag == _TR and rows:
+            cells = [" ".join(cell) for cell in rows.pop()]
+            line = "\t".join(c for c in cells if c)
+            if line and not skip:
+                if rows and rows[-1]:  # nested table: the row belongs to the enclosing cell
+                    rows[-1][-1].append(line)
+                else:
+                    yield line
+        elif skip or not paragraphs:
+            pass
+        elif tag == _T:
+            paragraphs[-1].append(elem.text or "")
+        elif tag == _TAB:
+            paragraphs[-1].append("\t")
+        elif tag == _BR or tag == _CR:
+            paragraphs[-1].append("\n")
+        # Done with this element: free it (and its now-empty slot in the parent)
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+def iter_docx_lines(source: Union[str, BinaryIO]) -> Iterator[str]:
+    """Lines of a .docx given as a path or a seekable binary file object."""
+    try:
+        archive = zipfile.ZipFile(source)
+    except zipfile.BadZipFile as exc:
+        raise ValueError(f"Not a DOCX file: {exc}") from exc
+    with archive:
+        names = archive.namelist()
+        if "word/document.xml" not in names:
+            raise ValueError("Not a DOCX file: word/document.xml is missing")
+        for name in _part_order(names):
+            with archive.open(name) as part:
+                yield from iter_part_lines(part)
+
+
+def extract_docx_text(source: Union[str, BinaryIO], max_chars: Optional[int] = None) -> str:
+    """Plain text of a .docx, one line per paragraph/table row; stops after ``max_chars``."""
+    out: List[str] = []
+    total = 0
+    for line in iter_docx_lines(source):
+        out.append(line)
+        total += len(line) + 1
+        if max_chars is not None and total >= max_chars:
+            break
+    text = "\n".join(out)
+    return text[:max_chars] if max_chars is not None else text
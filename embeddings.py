@@ -0,0 +1,200 @@
+"""Sentence embedding backends shared by ats_service and the FastAPI backend.
+
+The backend is chosen with ``EMBED_BACKEND``:
+
+- ``sbert`` (default): full-precision SentenceTransformer.
+- ``sbert-int8``: the same model with its Linear layers dynamically quantized
+  to int8 by torch; no extra dependencies, ~2x faster on CPU.
+- ``onnx``: the transformer exported to ONNX, int8-quantized and run with
+  onnxruntime (``pip install onnxruntime``). The export is cached under
+  ``EMBED_ONNX_DIR`` and reused on the next start.
+
+All backends return L2-normalized float32 rows, so cosine similarity is a dot
+product. ``benchmarks/embedding_parity.py`` checks the quantized backends
+against the fp32 path.
+"""
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from metrics import record_cache
+from model_manager import MODELS
+
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "sbert")
+EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "all-MiniLM-L6-v2")
+EMBED_ONNX_DIR = os.getenv("EMBED_ONNX_DIR", os.path.join(".cache", "onnx"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+
+
+class Embedder:
+    """Common interface: encode() -> (n, dim) float32 array of unit vectors."""
+
+    backend = "base"
+
+    def __init__(self, model_name: str = EMBED_MODEL_NAME):
+        self.model_name = model_name
+
+    @property
+    def version(self) -> str:
+        """Identifies the vectors this embedder produces (stored next to cached embeddings)."""
+        return f"{self.backend}:{self.model_name}"
+
+    def encode(self, texts: Sequence[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+        raise NotImplementedError
+
+    def encode_one(self, text: str) -> np.ndarray:
+        return self.encode([text])[0]
+
+
+class SentenceTransformerEmbedder(Embedder):
+    backend = "sbert"
+
+    def __init__(self, model_name: str = EMBED_MODEL_NAME):
+        super().__init__(model_name)
+        self.model = self._load()
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(self.model_name, device="cpu")
+
+    def encode(self, texts: Sequence[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+        vectors = self.model.encode(
+            list(texts), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class QuantizedTorchEmbedder(SentenceTransformerEmbedder):
+    """SentenceTransformer with int8 dynamic quantization of every nn.Linear."""
+
+    backend = "sbert-int8"
+
+    def _load(self):
+        import torch
+        model = super()._load()
+        model.eval()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxEmbedder(Embedder):
+    """int8 ONNX export of the transformer, mean-pooled like SentenceTransformer."""
+
+    backend = "onnx"
+
+    def __init__(self, model_name: str = EMBED_MODEL_NAME, onnx_dir: Optional[str] = None):
+        super().__init__(model_name)
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.onnx_dir = onnx_dir or os.path.join(EMBED_ONNX_DIR, model_name.replace("/", "__"))
+        model_path = os.path.join(self.onnx_dir, "model.int8.onnx")
+        if not os.path.exists(model_path):
+            export_onnx(model_name, self.onnx_dir)
+        with open(os.path.join(self.onnx_dir, "max_seq_length")) as f:
+            self.max_seq_length = int(f.read().strip())
+        self.tokenizer = AutoTokenizer.from_pretrained(self.onnx_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: Sequence[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Sort by length so each batch pads to a similar size, then restore order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out: List[Optional[np.ndarray]] = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            pooled = self._encode_batch([texts[i] for i in idx])
+            for i, vec in zip(idx, pooled):
+                out[i] = vec
+        return np.stack(out).astype(np.float32)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        enc = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors="np"
+        )
+        feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self.input_names}
+        hidden = self.session.run(None, feeds)[0]
+        mask = enc["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return _normalize(pooled)
+
+
+def export_onnx(model_name: str, out_dir: str) -> str:
+    """Export the SentenceTransformer's transformer to ONNX and quantize it to int8."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(out_dir, exist_ok=True)
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+    dummy = tokenizer(["warmup text"], return_tensors="pt")
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    input_names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in dummy]
+    dynamic = {name: {0: "batch", 1: "seq"} for name in input_names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "seq"}
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(dummy[k] for k in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic,
+            opset_version=14,
+        )
+    int8_path = os.path.join(out_dir, "model.int8.onnx")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, "max_seq_length"), "w") as f:
+        f.write(str(st.max_seq_length))
+    return int8_path
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.clip(norms, 1e-12, None)
+
+
+BACKENDS = {
+    SentenceTransformerEmbedder.backend: SentenceTransformerEmbedder,
+    QuantizedTorchEmbedder.backend: QuantizedTorchEmbedder,
+    OnnxEmbedder.backend: OnnxEmbedder,
+}
+
+
+def embedder_key(backend: Optional[str] = None, model_name: Optional[str] = None) -> str:
+    """Name of an embedder in the model manager."""
+    return f"embed:{backend or EMBED_BACKEND}:{model_name or EMBED_MODEL_NAME}"
+
+
+def get_embedder(backend: Optional[str] = None, model_name: Optional[str] = None) -> Embedder:
+    """Return the process-wide embedder for (backend, model), loading it on first use.
+
+    Embedders live in the model manager and may be evicted or unloaded when idle,
+    so fetch them per use rather than holding on to the returned object.
+    """
+    backend = backend or EMBED_BACKEND
+    model_name = model_name or EMBED_MODEL_NAME
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBED_BACKEND {backend!r}; expected one of {sorted(BACKENDS)}")
+    key = embedder_key(backend, model_name)
+    record_cache("embed_model", MODELS.is_loaded(key))
+    return MODELS.get(key, lambda: BACKENDS[backend](model_name))
+
+
+def current_version(backend: Optional[str] = None, model_name: Optional[str] = None) -> str:
+    """Version string of the configured embedder, without loading the model."""
+    return f"{backend or EMBED_BACKEND}:{model_name or EMBED_MODEL_NAME}"
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine similarity of two vectors (a plain dot product for an Embedder's unit vectors)."""
+    denom = float(np.linalg.norm(a) * np.linalg.norm(b)) or 1.0
+    return float(np.dot(a, b)) / denom
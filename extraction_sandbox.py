@@ -0,0 +1,289 @@
+"""Resume text extraction in a pool of sandboxed worker processes.
+
+A malformed or adversarial PDF can make PyPDF2 spin or allocate without
+bound. With ``EXTRACT_SANDBOX=1`` (the default) every extraction runs in one
+of ``EXTRACT_WORKERS`` reusable subprocesses instead of the web worker:
+
+- a wall-clock limit (``EXTRACT_TIMEOUT_S``) per file,
+- an RSS limit (``EXTRACT_MAX_RSS_MB``) polled by the parent, backed by an
+  address-space rlimit in the worker so a single huge allocation fails fast,
+- at most ``EXTRACT_MAX_PAGES`` PDF pages are read.
+
+A worker that times out, exceeds its memory limit or dies is killed and
+replaced, and the caller gets ``ExtractionFailed`` ("extraction failed:
+timeout"). Workers are also recycled after ``EXTRACT_MAX_TASKS`` files.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple, Union
+
+from metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_SANDBOX = os.getenv("EXTRACT_SANDBOX", "1") == "1"
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "2"))
+EXTRACT_TIMEOUT_S = float(os.getenv("EXTRACT_TIMEOUT_S", "20"))
+EXTRACT_MAX_RSS_MB = float(os.getenv("EXTRACT_MAX_RSS_MB", "512"))
+EXTRACT_MAX_PAGES = int(os.getenv("EXTRACT_MAX_PAGES", "50"))
+EXTRACT_MAX_TASKS = int(os.getenv("EXTRACT_MAX_TASKS", "200"))
+
+EXTRACT_SECONDS = Histogram("extract_seconds", "Text extraction time per file.", ["format"])
+EXTRACT_FAILURES = Counter("extract_failures_total", "Failed extractions by reason (timeout, oom, crash, error).",
+                           ["reason"])
+EXTRACT_RESTARTS = Counter("extract_worker_restarts_total", "Sandbox workers replaced, by reason.", ["reason"])
+
+SUPPORTED_SUFFIXES = (".pdf", ".docx", ".doc")
+_POLL_S = 0.02
+_STARTUP_TIMEOUT_S = 60.0
+
+
+def _suffix(source: Union[str, Path, bytes], filename: Optional[str]) -> str:
+    name = filename or ("" if isinstance(source, bytes) else str(source))
+    suffix = Path(name).suffix.lower()
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise ValueError(f"Unsupported resume format: {suffix or name or 'no file name'}")
+    return suffix
+
+
+class ExtractionFailed(ValueError):
+    """Extraction was aborted (``reason``: timeout, oom, crash) or the document is unreadable (error)."""
+
+    def __init__(self, reason: str, detail: str = ""):
+        self.reason = reason
+        super().__init__(f"extraction failed: {reason}" + (f" ({detail})" if detail else ""))
+
+
+# -------------------- Extraction proper (runs inside the worker) --------------------
+def _read_pdf(stream: BinaryIO, max_pages: int) -> str:
+    import PyPDF2
+
+    text_parts = []
+    reader = PyPDF2.PdfReader(stream)
+    for i, page in enumerate(reader.pages):
+        if max_pages and i >= max_pages:
+            break
+        page_text = page.extract_text()
+        if page_text:
+            text_parts.append(page_text)
+    return "\n".join(text_parts)
+
+
+def _extract(source: Union[str, bytes], suffix: str, max_pages: int) -> str:
+    stream = io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+    with stream:
+        if suffix == ".pdf":
+            return _read_pdf(stream, max_pages)
+        from docx_text import extract_docx_text  # .doc is tried as DOCX, as before
+        return extract_docx_text(stream)
+
+
+def _limit_address_space(max_rss_bytes: int) -> None:
+    # Virtual size runs well above RSS (interpreter, allocator arenas), so leave headroom;
+    # the parent enforces the RSS limit itself.
+    try:
+        import resource
+        limit = max_rss_bytes * 4
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _worker_main(conn, max_rss_bytes: int, max_pages: int) -> None:
+    import PyPDF2  # noqa: F401  (import cost is paid at startup, not against the first file's timeout)
+    import docx_text  # noqa: F401
+    if max_rss_bytes > 0:
+        _limit_address_space(max_rss_bytes)
+    conn.send(("ready", ""))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        source, suffix = task
+        try:
+            conn.send(("ok", _extract(source, suffix, max_pages)))
+        except MemoryError:
+            conn.send(("oom", ""))
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+# -------------------- Pool (runs in the web/batch process) --------------------
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _Worker:
+    """One worker: a fresh interpreter running this file, talking over an inherited pipe.
+
+    Started with subprocess rather than multiprocessing so it neither forks the
+    web worker (threads, loaded models) nor re-imports its ``__main__``, and so
+    daemonic processes (batch_screen's pool workers) can start it too.
+    """
+
+    def __init__(self, max_rss_bytes: int, max_pages: int):
+        self.conn, child = multiprocessing.Pipe()
+        fd = child.fileno()
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), str(fd), str(max_rss_bytes), str(max_pages)],
+            pass_fds=(fd,), stdin=subprocess.DEVNULL,
+        )
+        child.close()
+        self.tasks = 0
+        try:
+            if not self.conn.poll(_STARTUP_TIMEOUT_S):
+                raise EOFError
+            self.conn.recv()  # ("ready", "")
+        except (EOFError, OSError) as exc:
+            self.stop(kill=True)
+            raise ExtractionFailed("crash", "worker did not start") from exc
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                self.process.kill()
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.conn.close()
+
+
+class ExtractionPool:
+    def __init__(self, workers: int = EXTRACT_WORKERS, timeout: float = EXTRACT_TIMEOUT_S,
+                 max_rss_mb: float = EXTRACT_MAX_RSS_MB, max_pages: int = EXTRACT_MAX_PAGES,
+                 max_tasks: int = EXTRACT_MAX_TASKS):
+        self.size = max(1, workers)
+        self.timeout = timeout
+        self.max_rss_bytes = int(max_rss_mb * 1024 * 1024)
+        self.max_pages = max_pages
+        self.max_tasks = max_tasks
+        self._idle: "queue.LifoQueue[Optional[_Worker]]" = queue.LifoQueue()
+        for _ in range(self.size):
+            self._idle.put(None)  # started on first use
+
+    def extract(self, source: Union[str, Path, bytes], filename: Optional[str] = None) -> str:
+        """Text of a file path, or of ``bytes`` named ``filename`` (for its extension)."""
+        suffix = _suffix(source, filename)
+        payload = source if isinstance(source, bytes) else str(source)
+        worker = self._idle.get()
+        started = time.perf_counter()
+        try:
+            if worker is None:
+                worker = _Worker(self.max_rss_bytes, self.max_pages)
+            status, value = self._run(worker, (payload, suffix))
+            if status == "oom":  # MemoryError under the rlimit: don't trust this worker again
+                raise ExtractionFailed("oom", "allocation failed")
+        except ExtractionFailed as exc:
+            EXTRACT_RESTARTS.labels(exc.reason).inc()
+            if worker is not None:
+                logger.warning("Extraction worker %s: %s", worker.pid, exc)
+                worker.stop(kill=True)
+                worker = None
+            raise
+        finally:
+            if worker is not None and worker.tasks >= self.max_tasks > 0:
+                EXTRACT_RESTARTS.labels("recycle").inc()
+                worker.stop()
+                worker = None
+            self._idle.put(worker)
+            EXTRACT_SECONDS.labels(suffix.lstrip(".")).observe(time.perf_counter() - started)
+        if status != "ok":
+            raise ExtractionFailed("error", value)
+        return value
+
+    def _run(self, worker: _Worker, task: Tuple[str, str]) -> Tuple[str, str]:
+        try:
+            worker.conn.send(task)
+        except (OSError, ValueError) as exc:
+            raise ExtractionFailed("crash", str(exc)) from exc
+        worker.tasks += 1
+        deadline = time.monotonic() + self.timeout if self.timeout > 0 else None
+        while True:
+            if worker.conn.poll(_POLL_S):
+                try:
+                    return worker.conn.recv()
+                except (EOFError, OSError) as exc:
+                    raise ExtractionFailed("crash", f"exit code {worker.process.poll()}") from exc
+            if not worker.is_alive():
+                raise ExtractionFailed("crash", f"exit code {worker.process.returncode}")
+            if deadline is not None and time.monotonic() > deadline:
+                raise ExtractionFailed("timeout", f"over {self.timeout:g}s")
+            if self.max_rss_bytes > 0 and _rss_bytes(worker.pid) > self.max_rss_bytes:
+                raise ExtractionFailed("oom", f"over {self.max_rss_bytes // (1024 * 1024)} MB")
+
+    def close(self) -> None:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.stop()
+
+
+_pool: Optional[ExtractionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ExtractionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ExtractionPool()
+    return _pool
+
+
+def extract_text(source: Union[str, Path, bytes], filename: Optional[str] = None) -> str:
+    """Text of a PDF/DOCX given as a path, or as bytes plus its ``filename``.
+
+    Sandboxed unless EXTRACT_SANDBOX=0. Raises ValueError for an unsupported
+    extension and ExtractionFailed on timeout, oom, crash or an unreadable document.
+    """
+    try:
+        if EXTRACT_SANDBOX:
+            return get_pool().extract(source, filename)
+        payload = source if isinstance(source, bytes) else str(source)
+        try:
+            return _extract(payload, _suffix(source, filename), EXTRACT_MAX_PAGES)
+        except MemoryError as exc:
+            raise ExtractionFailed("oom") from exc
+        except Exception as exc:
+            raise ExtractionFailed("error", f"{type(exc).__name__}: {exc}") from exc
+    except ExtractionFailed as exc:
+        EXTRACT_FAILURES.labels(exc.reason).inc()
+        raise
+
+
+if __name__ == "__main__":  # sandbox worker, started by _Worker
+    from multiprocessing.connection import Connection
+
+    _worker_main(Connection(int(sys.argv[1])), int(sys.argv[2]), int(sys.argv[3]))
@@ -0,0 +1,145 @@
+"""Fair-share admission for expensive per-request work (HR screening).
+
+Each user (an HR account) gets a FIFO queue. At most ``max_concurrent`` jobs run
+at once and at most ``per_user_limit`` of them for the same user; when a slot
+frees up, users with waiting jobs are served round-robin, so one recruiter
+submitting dozens of uploads only delays their own queue, not everyone else's.
+
+Request threads block in ``slot()`` until admitted. The scheduler is
+per-process: with several web workers each one enforces its own limits.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Hashable, Iterator, Optional
+
+from metrics import Counter, Gauge, Histogram
+
+SCREENING_MAX_CONCURRENT = int(os.getenv("SCREENING_MAX_CONCURRENT", "4"))
+SCREENING_PER_USER_LIMIT = int(os.getenv("SCREENING_PER_USER_LIMIT", "2"))
+SCREENING_QUEUE_TIMEOUT_S = float(os.getenv("SCREENING_QUEUE_TIMEOUT_S", "120"))
+
+QUEUE_WAIT = Histogram("fair_queue_wait_seconds", "Time from submit to admission, per queue and user.",
+                       ["queue", "user"])
+QUEUE_WAITING = Gauge("fair_queue_waiting", "Jobs waiting for a slot.", ["queue"])
+QUEUE_RUNNING = Gauge("fair_queue_running", "Jobs holding a slot.", ["queue"])
+QUEUE_TIMEOUTS = Counter("fair_queue_timeouts_total", "Jobs that gave up waiting for a slot.", ["queue"])
+
+
+class QueueTimeout(RuntimeError):
+    """No slot became free within the queue timeout."""
+
+
+class Ticket:
+    __slots__ = ("user", "enqueued", "position", "wait_s", "_admitted")
+
+    def __init__(self, user: Hashable, position: int):
+        self.user = user
+        self.enqueued = time.monotonic()
+        self.position = position  # jobs expected to be admitted ahead of this one, at submit time
+        self.wait_s = 0.0
+        self._admitted = threading.Event()
+
+
+class FairScheduler:
+    def __init__(self, name: str, max_concurrent: int = SCREENING_MAX_CONCURRENT,
+                 per_user_limit: int = SCREENING_PER_USER_LIMIT, timeout: float = SCREENING_QUEUE_TIMEOUT_S):
+        """``max_concurrent <= 0`` admits everything immediately (no scheduling)."""
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.per_user_limit = max(1, per_user_limit)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._queues: "OrderedDict[Hashable, Deque[Ticket]]" = OrderedDict()  # users with waiting jobs, in turn order
+        self._running: Dict[Hashable, int] = {}
+        self._total_running = 0
+
+    @contextmanager
+    def slot(self, user: Hashable) -> Iterator[Ticket]:
+        """Wait for a slot for ``user`` and hold it for the duration of the block.
+
+        Raises QueueTimeout if none is granted within ``timeout`` seconds.
+        """
+        ticket = self._submit(user)
+        if not ticket._admitted.wait(self.timeout if self.timeout > 0 else None):
+            with self._lock:
+                if not ticket._admitted.is_set():  # not granted in the meantime
+                    self._forget(ticket)
+                    QUEUE_TIMEOUTS.labels(self.name).inc()
+                    raise QueueTimeout(f"No screening slot free after {self.timeout:g}s; try again shortly.")
+        ticket.wait_s = time.monotonic() - ticket.enqueued
+        QUEUE_WAIT.labels(self.name, str(user)).observe(ticket.wait_s)
+        try:
+            yield ticket
+        finally:
+            self._release(user)
+
+    def position(self, user: Hashable) -> Optional[int]:
+        """Jobs expected ahead of ``user``'s oldest waiting job (None if nothing is waiting)."""
+        with self._lock:
+            return self._ahead(user, 0) if self._queues.get(user) else None
+
+    def stats(self, user: Optional[Hashable] = None) -> Dict[str, object]:
+        with self._lock:
+            if user is not None:
+                queue = self._queues.get(user)
+                return {"running": self._running.get(user, 0), "waiting": len(queue) if queue else 0,
+                        "position": self._ahead(user, 0) if queue else None}
+            return {"running": self._total_running,
+                    "waiting": sum(len(q) for q in self._queues.values()),
+                    "users_waiting": len(self._queues)}
+
+    # -------------------- Internals (called with the lock held unless noted) --------------------
+    def _submit(self, user: Hashable) -> Ticket:
+        with self._lock:
+            queue = self._queues.get(user)
+            ticket = Ticket(user, self._ahead(user, len(queue) if queue else 0))
+            if queue is None:
+                queue = self._queues[user] = deque()  # joins the end of the rotation
+            queue.append(ticket)
+            QUEUE_WAITING.labels(self.name).inc()
+            self._dispatch()
+        return ticket
+
+    def _ahead(self, user: Hashable, index: int) -> int:
+        """Waiting jobs admitted before the one at ``index`` in ``user``'s queue:
+        round-robin gives every other waiting user up to one turn per turn of ours."""
+        return index + sum(min(len(queue), index + 1) for other, queue in self._queues.items() if other != user)
+
+    def _dispatch(self) -> None:
+        """Admit waiting jobs round-robin across users while slots are free."""
+        while self._queues and (self.max_concurrent <= 0 or self._total_running < self.max_concurrent):
+            user = next((u for u in self._queues if self._running.get(u, 0) < self.per_user_limit), None)
+            if user is None:
+                return  # every waiting user is at their own cap
+            queue = self._queues[user]
+            ticket = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user)  # next turn goes to the other users first
+            else:
+                del self._queues[user]
+            self._running[user] = self._running.get(user, 0) + 1
+            self._total_running += 1
+            QUEUE_WAITING.labels(self.name).dec()
+            QUEUE_RUNNING.labels(self.name).inc()
+            ticket._admitted.set()
+
+    def _forget(self, ticket: Ticket) -> None:
+        queue = self._queues.get(ticket.user)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            QUEUE_WAITING.labels(self.name).dec()
+            if not queue:
+                del self._queues[ticket.user]
+
+    def _release(self, user: Hashable) -> None:
+        """Lock not held: give the slot back and admit the next job."""
+        with self._lock:
+            self._running[user] -= 1
+            if not self._running[user]:
+                del self._running[user]
+            self._total_running -= 1
+            QUEUE_RUNNING.labels(self.name).dec()
+            self._dispatch()
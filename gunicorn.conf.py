@@ -0,0 +1,51 @@
+"""Gunicorn settings for app.py and backend/main.py (Linux).
+
+    gunicorn -c gunicorn.conf.py app:app
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker backend.main:app
+
+With PRELOAD_MODELS=1 the app and its models are loaded once in the master and
+the workers share the model weights copy-on-write (see preload.py).
+
+Metrics run in prometheus_client multiprocess mode: unless PROMETHEUS_MULTIPROC_DIR
+is already set (then it must be emptied before each start), every master start
+gets a fresh empty directory, and /metrics on any worker aggregates all of them.
+"""
+import os
+import sys
+import tempfile
+
+# Must be set before prometheus_client is imported (by the app or by preload below)
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="ats-metrics-")
+
+import preload  # noqa: E402
+
+bind = os.getenv("BIND", "127.0.0.1:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+timeout = int(os.getenv("WEB_TIMEOUT_S", "120"))
+preload_app = preload.PRELOAD_MODELS
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before any worker is forked
+    if preload.PRELOAD_MODELS:
+        preload.preload()
+
+
+def post_fork(server, worker):
+    preload.after_fork(server.cfg.workers)
+
+
+def post_worker_init(worker):
+    # worker.age counts spawns per master, so only the first worker ever re-enqueues
+    # interrupted scoring (not every worker, and not again when a worker is replaced)
+    flask_app = sys.modules.get("app") or sys.modules.get("app_mongodb")
+    if worker.age == 1 and hasattr(flask_app, "requeue_pending"):
+        count = flask_app.requeue_pending()
+        worker.log.info("Re-enqueued %d pending application(s)", count)
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges (in-flight requests, queue lengths) from the totals
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
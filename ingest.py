@@ -0,0 +1,135 @@
+"""Background ingest pipeline: score applications after they are committed.
+
+The web request only enqueues an id; worker threads call the handler (which
+extracts text and scores the resume) off the request path. Failed items are
+retried with exponential backoff and reported through ``on_failure`` once the
+retries are exhausted. Pending work lives in memory, so apps should re-enqueue
+unscored rows on startup (see ``requeue``).
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "3"))
+INGEST_RETRY_BACKOFF = float(os.getenv("INGEST_RETRY_BACKOFF", "2.0"))
+INGEST_ENABLED = os.getenv("INGEST_ENABLED", "1") == "1"
+
+INGEST_BACKLOG = Gauge("ingest_backlog", "Items queued or waiting for a retry.", ["pipeline"])
+INGEST_IN_PROGRESS = Gauge("ingest_in_progress", "Items currently being processed.", ["pipeline"])
+INGEST_ITEMS = Counter("ingest_items_total", "Processed items by outcome (ok, retry, failed).", ["pipeline", "outcome"])
+INGEST_SECONDS = Histogram("ingest_item_seconds", "Handler time per attempt.", ["pipeline"])
+INGEST_QUEUE_WAIT = Histogram("ingest_queue_wait_seconds", "Time from enqueue to first attempt.", ["pipeline"])
+
+
+class IngestPipeline:
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], None],
+        on_failure: Optional[Callable[[Any, BaseException], None]] = None,
+        workers: int = INGEST_WORKERS,
+        max_retries: int = INGEST_MAX_RETRIES,
+        backoff: float = INGEST_RETRY_BACKOFF,
+    ):
+        self.name = name
+        self.handler = handler
+        self.on_failure = on_failure
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Condition(self._lock)
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent; also done on first submit)."""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"{self.name}-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, item: Any) -> None:
+        self.start()
+        with self._lock:
+            self._pending += 1
+            INGEST_BACKLOG.labels(self.name).inc()
+        self._queue.put((item, 0, time.monotonic()))
+
+    def requeue(self, items: Iterable[Any]) -> int:
+        """Enqueue work left over from a previous process (e.g. rows still pending)."""
+        count = 0
+        for item in items:
+            self.submit(item)
+            count += 1
+        return count
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted item finished (ok or failed). Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    @property
+    def backlog(self) -> int:
+        return self._pending
+
+    def _run(self) -> None:
+        while True:
+            item, attempt, enqueued = self._queue.get()
+            if attempt == 0:
+                INGEST_QUEUE_WAIT.labels(self.name).observe(time.monotonic() - enqueued)
+            INGEST_IN_PROGRESS.labels(self.name).inc()
+            try:
+                with INGEST_SECONDS.labels(self.name).time():
+                    self.handler(item)
+            except Exception as exc:
+                self._handle_error(item, attempt, exc)
+            else:
+                INGEST_ITEMS.labels(self.name, "ok").inc()
+                self._finish()
+            finally:
+                INGEST_IN_PROGRESS.labels(self.name).dec()
+
+    def _handle_error(self, item: Any, attempt: int, exc: Exception) -> None:
+        if attempt < self.max_retries:
+            delay = self.backoff * (2 ** attempt)
+            logger.warning("%s: item %r failed (attempt %d), retrying in %.1fs: %s",
+                           self.name, item, attempt + 1, delay, exc)
+            INGEST_ITEMS.labels(self.name, "retry").inc()
+            timer = threading.Timer(delay, self._queue.put, args=((item, attempt + 1, time.monotonic()),))
+            timer.daemon = True
+            timer.start()
+            return
+        logger.error("%s: item %r failed after %d attempts: %s", self.name, item, attempt + 1, exc)
+        INGEST_ITEMS.labels(self.name, "failed").inc()
+        if self.on_failure is not None:
+            try:
+                self.on_failure(item, exc)
+            except Exception:
+                logger.exception("%s: on_failure hook raised for %r", self.name, item)
+        self._finish()
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            INGEST_BACKLOG.labels(self.name).dec()
+            if not self._pending:
+                self._idle.notify_all()
@@ -0,0 +1,130 @@
+"""Prometheus metrics (counters, gauges, histograms) on top of ``prometheus_client``.
+
+Both web apps expose ``render()`` on ``/metrics``, restricted by ``scrape_allowed``.
+Under a multi-worker server set ``PROMETHEUS_MULTIPROC_DIR`` (gunicorn.conf.py does)
+so every worker writes its samples there and a scrape of any worker returns the
+sum over all of them; otherwise values are per process.
+"""
+import hmac
+import ipaddress
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import prometheus_client
+from prometheus_client import CONTENT_TYPE_LATEST as CONTENT_TYPE, Counter  # noqa: F401 (re-exported)
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+# Bearer token required on /metrics; without one only loopback clients may scrape
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Seconds; covers fast lexical stages up to multi-second LLM generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Gauge(prometheus_client.Gauge):
+    """A gauge that, in multiprocess mode, reports the sum over live workers by default
+    (in-flight requests, queue lengths, resident bytes) rather than one series per pid."""
+
+    def __init__(self, name, documentation, labelnames=(), multiprocess_mode="livesum", **kwargs):
+        super().__init__(name, documentation, labelnames, multiprocess_mode=multiprocess_mode, **kwargs)
+
+
+class Histogram(prometheus_client.Histogram):
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(name, documentation, labelnames, buckets=buckets, **kwargs)
+
+
+def render() -> bytes:
+    """Prometheus text exposition: of every worker in multiprocess mode, else of this process."""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return prometheus_client.generate_latest(registry)
+    return prometheus_client.generate_latest()
+
+
+def scrape_allowed(remote_addr: Optional[str], authorization: Optional[str]) -> bool:
+    """``Authorization: Bearer $METRICS_TOKEN`` if a token is configured, else a loopback client."""
+    if METRICS_TOKEN:
+        return hmac.compare_digest((authorization or "").encode(), f"Bearer {METRICS_TOKEN}".encode())
+    try:
+        return ipaddress.ip_address(remote_addr or "").is_loopback
+    except ValueError:
+        return False
+
+
+# -------------------- Shared metrics --------------------
+STAGE_SECONDS = Histogram(
+    "ats_stage_seconds", "Time spent in each screening stage.", ["stage"]
+)
+CACHE_REQUESTS = Counter(
+    "ats_cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"]
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by app, method, route and status.", ["app", "method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by app and route.", ["app", "route"]
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ["app"]
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class StageTimer:
+    """Times named stages of one request into STAGE_SECONDS and keeps the
+    per-request breakdown (milliseconds) for debug output."""
+
+    def __init__(self, histogram: Histogram = STAGE_SECONDS):
+        self.histogram = histogram
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.histogram.labels(name).observe(elapsed)
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed * 1000.0, 3)
+
+
+def instrument_flask(flask_app, app_name: str, endpoint: Optional[str] = "/metrics") -> None:
+    """Record latency, status and in-flight count for every request and expose /metrics."""
+    from flask import Response, g, request
+
+    @flask_app.before_request
+    def _metrics_start():
+        g._metrics_started = time.perf_counter()
+        HTTP_IN_FLIGHT.labels(app_name).inc()
+
+    @flask_app.after_request
+    def _metrics_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @flask_app.teardown_request
+    def _metrics_finish(exc):
+        started = g.pop("_metrics_started", None)
+        if started is None:
+            return
+        HTTP_IN_FLIGHT.labels(app_name).dec()
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        status = g.pop("_metrics_status", 500)
+        HTTP_REQUESTS.labels(app_name, request.method, route, status).inc()
+        HTTP_LATENCY.labels(app_name, route).observe(time.perf_counter() - started)
+
+    if endpoint:
+        def metrics_endpoint():
+            if not scrape_allowed(request.remote_addr, request.headers.get("Authorization")):
+                return Response("Forbidden\n", status=403, content_type="text/plain")
+            return Response(render(), content_type=CONTENT_TYPE)
+        flask_app.add_url_rule(endpoint, "metrics", metrics_endpoint)
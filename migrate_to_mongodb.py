@@ -1,61 +1,254 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
 from app import app, db, HR, Candidate, Job, Application
-from mongo_models import HR as MongoHR, Candidate as MongoCandidate, Job as MongoJob, Application as MongoApplication, db as mongo_db
-from werkzeug.security import generate_password_hash
+from config import Config
+from mongo_models import HR as MongoHR, Candidate as MongoCandidate, Job as MongoJob, Application as MongoApplication, ResumeLshBucket as MongoResumeLshBucket, db as mongo_db
+from gridfs_utils import storage
+
+BATCH_SIZE = int(os.getenv("MIGRATE_BATCH_SIZE", "500"))
+FILE_WORKERS = int(os.getenv("MIGRATE_FILE_WORKERS", "8"))
+CHECKPOINT_PATH = os.getenv("MIGRATE_CHECKPOINT", "migration_checkpoint.json")
+FS_FILES = f"{Config.FS_FILES_COLLECTION}.files"
+
+
+class MigrationError(RuntimeError):
+    """Data that cannot be migrated as-is; the checkpoint stays before the failing batch."""
+
+
+class Checkpoint:
+    """Last migrated SQLite id per table, persisted after every batch so a
+    rerun continues where the previous one stopped."""
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self.state = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+
+    def last_id(self, table):
+        return self.state.get(table, 0)
+
+    def advance(self, table, last_id):
+        self.state[table] = last_id
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+    def reset(self):
+        self.state = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Throughput:
+    def __init__(self, label):
+        self.label = label
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    def add(self, rows=0, nbytes=0):
+        self.rows += rows
+        self.bytes += nbytes
+
+    def report(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        line = f"  {self.label}: {self.rows} rows in {elapsed:.1f}s ({self.rows / elapsed:.1f} rows/s"
+        if self.bytes:
+            line += f", {self.bytes / (1024 * 1024) / elapsed:.2f} MB/s"
+        print(line + ")")
+
+
+def _batches(model, last_id, batch_size):
+    """Stream rows with id > last_id in primary key order without loading the table."""
+    query = model.query.filter(model.id > last_id).order_by(model.id).yield_per(batch_size)
+    batch = []
+    for row in query:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bulk_upsert(collection, docs, key="sqlite_id"):
+    """Insert docs matched on ``key``; replaying a batch is a no-op.
 
-def migrate_data():
+    Users are matched on username so that a copy made earlier by
+    migrate_credentials.py (which has no sqlite_id) gets its sqlite_id set instead
+    of being duplicated. Any write error, e.g. a username already linked to a
+    different SQLite row, aborts the migration.
+    """
+    ops = [
+        UpdateOne(
+            {key: d[key]},
+            {"$set": {"sqlite_id": d["sqlite_id"]},
+             "$setOnInsert": {k: v for k, v in d.items() if k != "sqlite_id"}},
+            upsert=True,
+        )
+        for d in docs
+    ]
+    try:
+        mongo_db[collection].bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        errors = [f"{err.get('op', {}).get('q')}: {err.get('errmsg')}" for err in e.details.get("writeErrors", [])]
+        raise MigrationError(f"{len(errors)} {collection} document(s) failed:\n  " + "\n  ".join(errors)) from e
+
+
+def _id_map(collection, sqlite_ids):
+    cursor = mongo_db[collection].find({"sqlite_id": {"$in": list(sqlite_ids)}}, {"_id": 1, "sqlite_id": 1})
+    return {doc["sqlite_id"]: str(doc["_id"]) for doc in cursor}
+
+
+def _uploaded_files(app_ids):
+    """application id -> GridFS file id for resumes copied by an earlier (interrupted) run."""
+    cursor = mongo_db[FS_FILES].find(
+        {"metadata.sqlite_application_id": {"$in": list(app_ids)}},
+        {"_id": 1, "metadata.sqlite_application_id": 1},
+    )
+    return {doc["metadata"]["sqlite_application_id"]: str(doc["_id"]) for doc in cursor}
+
+
+def _upload_resume(app_row, upload_folder):
+    """Copy one resume into GridFS."""
+    path = os.path.join(upload_folder, app_row.resume_filename)
+    if not os.path.isfile(path):
+        return app_row.id, None, 0
+    with open(path, "rb") as f:
+        file_id = storage.save_file(
+            f,
+            filename=app_row.resume_filename,
+            metadata={"sqlite_application_id": app_row.id, "uploaded_at": app_row.created_at},
+        )
+    return app_row.id, file_id, os.path.getsize(path)
+
+
+def _migrate_table(checkpoint, table, model, collection, to_doc, batch_size, before_write=None, key="sqlite_id"):
+    stats = Throughput(table)
+    for batch in _batches(model, checkpoint.last_id(table), batch_size):
+        docs = [to_doc(row) for row in batch]
+        if before_write:
+            stats.add(nbytes=before_write(batch, docs))
+        _bulk_upsert(collection, docs, key)
+        checkpoint.advance(table, batch[-1].id)
+        stats.add(rows=len(batch))
+    stats.report()
+
+
+def migrate_data(batch_size=BATCH_SIZE, file_workers=FILE_WORKERS, checkpoint_path=CHECKPOINT_PATH, restart=False):
     print("Starting migration from SQLite to MongoDB...")
-    
+    checkpoint = Checkpoint(checkpoint_path)
+    if restart:
+        checkpoint.reset()
+    elif checkpoint.state:
+        print(f"Resuming from checkpoint {checkpoint_path}: {checkpoint.state}")
+
     # Create indexes
     print("Creating indexes...")
     mongo_db.hr_users.create_index("username", unique=True)
     mongo_db.candidates.create_index("username", unique=True)
     mongo_db.applications.create_index([("candidate_id", 1), ("job_id", 1)])
-    
-    # Migrate HR Users
+    mongo_db.applications.create_index([("score", -1), ("created_at", -1)])
+    mongo_db[FS_FILES].create_index("metadata.sqlite_application_id", sparse=True)
+    MongoResumeLshBucket.ensure_indexes()
+    for collection in (MongoHR.collection, MongoCandidate.collection, MongoJob.collection, MongoApplication.collection):
+        mongo_db[collection].create_index(
+            "sqlite_id", unique=True, partialFilterExpression={"sqlite_id": {"$exists": True}}
+        )
+
     print("Migrating HR users...")
-    for hr in HR.query.all():
-        MongoHR.create({
-            "username": hr.username,
-            "password_hash": hr.password_hash
-        })
-    
-    # Migrate Candidates
+    _migrate_table(checkpoint, "hr", HR, MongoHR.collection, lambda hr: {
+        "sqlite_id": hr.id,
+        "username": hr.username,
+        "password_hash": hr.password_hash,
+        "created_at": datetime.utcnow(),
+    }, batch_size, key="username")
+
     print("Migrating Candidates...")
-    candidate_map = {}
-    for candidate in Candidate.query.all():
-        mongo_id = MongoCandidate.create({
-            "username": candidate.username,
-            "password_hash": candidate.password_hash,
-            "name": candidate.name,
-            "email": candidate.email,
-            "phone": candidate.phone
-        })
-        candidate_map[candidate.id] = mongo_id
-    
-    # Migrate Jobs
+    _migrate_table(checkpoint, "candidate", Candidate, MongoCandidate.collection, lambda c: {
+        "sqlite_id": c.id,
+        "username": c.username,
+        "password_hash": c.password_hash,
+        "name": c.name,
+        "email": c.email,
+        "phone": c.phone,
+        "created_at": datetime.utcnow(),
+    }, batch_size, key="username")
+
     print("Migrating Jobs...")
-    job_map = {}
-    for job in Job.query.all():
-        mongo_id = MongoJob.create({
-            "title": job.title,
-            "company": job.company,
-            "tags": job.tags.split(',') if job.tags else []
-        })
-        job_map[job.id] = mongo_id
-    
-    # Migrate Applications
-    print("Migrating Applications...")
-    for app in Application.query.all():
-        MongoApplication.create({
-            "candidate_id": candidate_map[app.candidate_id],
-            "job_id": job_map[app.job_id],
-            "status": app.status,
-            "created_at": app.created_at,
-            "resume_filename": app.resume_filename
-        })
-    
+    _migrate_table(checkpoint, "job", Job, MongoJob.collection, lambda job: {
+        "sqlite_id": job.id,
+        "title": job.title,
+        "company": job.company,
+        "tags": job.tags.split(',') if job.tags else [],
+        "description": job.description or "",
+        # Precomputed JD artifacts carry over as-is; stale ones are refreshed on first use
+        "description_norm": job.description_norm,
+        "jd_embedding": job.jd_embedding,
+        "jd_skills": [s for s in (job.jd_skills or "").split(",") if s],
+        "artifacts_version": job.artifacts_version,
+        "created_at": datetime.utcnow(),
+    }, batch_size)
+
+    print("Migrating Applications and resume files...")
+    upload_folder = app.config['UPLOAD_FOLDER']
+    pool = ThreadPoolExecutor(max_workers=file_workers)
+
+    def resolve_refs(batch, docs):
+        candidates = _id_map(MongoCandidate.collection, {row.candidate_id for row in batch})
+        jobs = _id_map(MongoJob.collection, {row.job_id for row in batch})
+        unresolved = [
+            f"application {row.id}: {field} {ref} not migrated"
+            for row in batch
+            for field, ref, found in (("candidate", row.candidate_id, candidates), ("job", row.job_id, jobs))
+            if ref not in found
+        ]
+        if unresolved:
+            raise MigrationError(f"{len(unresolved)} unresolved reference(s):\n  " + "\n  ".join(unresolved))
+        for row, doc in zip(batch, docs):
+            doc["candidate_id"] = candidates[row.candidate_id]
+            doc["job_id"] = jobs[row.job_id]
+        file_ids = _uploaded_files(row.id for row in batch)
+        with_files = [row for row in batch if row.resume_filename and row.id not in file_ids]
+        uploaded = 0
+        for app_id, file_id, nbytes in pool.map(lambda row: _upload_resume(row, upload_folder), with_files):
+            file_ids[app_id] = file_id
+            uploaded += nbytes
+        for row, doc in zip(batch, docs):
+            if file_ids.get(row.id):
+                doc["resume_file_id"] = file_ids[row.id]
+        return uploaded
+
+    try:
+        _migrate_table(checkpoint, "application", Application, MongoApplication.collection, lambda a: {
+            "sqlite_id": a.id,
+            "status": a.status,
+            "created_at": a.created_at,
+            "resume_filename": a.resume_filename,
+        }, batch_size, before_write=resolve_refs)
+    finally:
+        pool.shutdown()
+
     print("Migration completed successfully!")
 
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Migrate the SQLite portal data and uploads into MongoDB/GridFS.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--file-workers", type=int, default=FILE_WORKERS)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint and start over")
+    args = parser.parse_args()
     with app.app_context():
-        migrate_data()
+        migrate_data(args.batch_size, args.file_workers, args.checkpoint, args.restart)
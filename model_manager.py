@@ -0,0 +1,243 @@
+"""Process-wide registry of loaded models with a memory budget and idle unloading.
+
+The embedding model, spaCy and the optional HF chat model are loaded through
+``MODELS.get(name, loader)``. The manager records each model's footprint
+(CPU tensor bytes of torch modules, or the RSS growth during the load for models
+without torch weights), evicts least-recently-used models when the total would exceed
+``MODEL_MEMORY_BUDGET_MB`` and unloads models that have not been used for
+``MODEL_IDLE_TIMEOUT_S`` seconds. An unloaded model is loaded again on its next
+use; callers should therefore fetch models through the manager on each use
+instead of keeping their own long-lived reference.
+
+Budget 0 (the default) disables eviction; idle timeout 0 disables unloading.
+Pinned models (see ``pin`` and preload.py) are never evicted or unloaded as idle.
+"""
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+MODEL_IDLE_TIMEOUT_S = float(os.getenv("MODEL_IDLE_TIMEOUT_S", "0"))
+
+MODEL_LOADS = Counter("model_loads_total", "Model loads by model.", ["model"])
+MODEL_UNLOADS = Counter("model_unloads_total", "Model unloads by model and reason (budget, idle, manual).",
+                        ["model", "reason"])
+MODEL_LOAD_SECONDS = Histogram("model_load_seconds", "Time to load a model.", ["model"])
+MODEL_RESIDENT_BYTES = Gauge("model_resident_bytes", "Estimated memory held by each loaded model.", ["model"])
+MODEL_BUDGET_BYTES = Gauge("model_memory_budget_bytes", "Configured model memory budget (0 = unlimited).",
+                           multiprocess_mode="livemax")  # per worker, not summed
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _tensors(module: Any) -> List[Any]:
+    """Parameters, buffers and other state_dict tensors (e.g. packed int8 weights) of a torch module."""
+    tensors = list(module.parameters()) + list(module.buffers())
+    state = getattr(module, "state_dict", None)
+    if callable(state):
+        for value in state(keep_vars=True).values():
+            tensors.extend(value if isinstance(value, (tuple, list)) else [value])
+    return tensors
+
+
+def _torch_bytes(obj: Any) -> int:
+    """CPU bytes of the tensors of torch modules on ``obj`` or its direct attributes."""
+    candidates = [obj] + (list(vars(obj).values()) if hasattr(obj, "__dict__") else [])
+    seen = set()
+    total = 0
+    for candidate in candidates:
+        if not (hasattr(candidate, "parameters") and hasattr(candidate, "buffers")):
+            continue
+        try:
+            tensors = _tensors(candidate)
+        except Exception:
+            continue
+        for t in tensors:
+            if (id(t) not in seen and hasattr(t, "numel") and getattr(t, "device", None) is not None
+                    and t.device.type == "cpu"):
+                seen.add(id(t))
+                total += t.numel() * t.element_size()
+    return total
+
+
+def estimate_bytes(model: Any, rss_delta: int = 0) -> int:
+    """Footprint of a loaded model: its CPU tensor bytes when it has torch weights, else the
+    RSS growth during its load (ONNX/spaCy models and stubs, whose weights are not tensors).
+
+    The RSS growth is process-wide, so memory other threads allocate during the load is
+    counted too; it is only the fallback.
+    """
+    return _torch_bytes(model) or max(rss_delta, 0)
+
+
+class _Entry:
+    __slots__ = ("model", "size", "last_used")
+
+    def __init__(self, model: Any, size: int):
+        self.model = model
+        self.size = size
+        self.last_used = time.monotonic()
+
+
+class ModelManager:
+    def __init__(self, budget_bytes: int = 0, idle_timeout: float = 0.0):
+        self.budget_bytes = int(budget_bytes)
+        self.idle_timeout = float(idle_timeout)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()  # least recently used first
+        self._known_sizes: Dict[str, int] = {}
+        self._pinned: Set[str] = set()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._reaper: Optional[threading.Thread] = None
+        MODEL_BUDGET_BYTES.set(self.budget_bytes)
+
+    def get(self, name: str, loader: Callable[[], Any]) -> Any:
+        """Return the loaded model ``name``, calling ``loader()`` if it is not resident."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._touch(name, entry)
+                return entry.model
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:  # one load per model; other models stay usable meanwhile
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None:
+                    self._touch(name, entry)
+                    return entry.model
+                # Make room up front when we already know how big this model is
+                self._evict_for(self._known_sizes.get(name, 0), keep=name)
+            rss_before = _rss_bytes()
+            started = time.perf_counter()
+            model = loader()
+            MODEL_LOAD_SECONDS.labels(name).observe(time.perf_counter() - started)
+            size = estimate_bytes(model, _rss_bytes() - rss_before)
+            with self._lock:
+                self._entries[name] = _Entry(model, size)
+                self._known_sizes[name] = size
+                MODEL_LOADS.labels(name).inc()
+                MODEL_RESIDENT_BYTES.labels(name).set(size)
+                self._evict_for(0, keep=name)
+            logger.info("Loaded model %s (%.1f MB)", name, size / 1e6)
+        self._ensure_reaper()
+        return model
+
+    def put(self, name: str, model: Any, size: int = 0) -> None:
+        """Register an already-built model (e.g. a stub) under ``name``."""
+        with self._lock:
+            self._entries[name] = _Entry(model, size)
+            self._entries.move_to_end(name)
+            MODEL_RESIDENT_BYTES.labels(name).set(size)
+
+    def pin(self, name: str) -> None:
+        """Exempt a loaded model from budget eviction and idle unloading.
+
+        Used for models preloaded before forking: unloading one in a worker frees
+        nothing (the pages belong to the master) and reloading it makes a private copy.
+        """
+        with self._lock:
+            self._pinned.add(name)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._entries
+
+    def unload(self, name: str, reason: str = "manual") -> bool:
+        with self._lock:
+            entry = self._entries.pop(name, None)
+        if entry is None:
+            return False
+        MODEL_UNLOADS.labels(name, reason).inc()
+        MODEL_RESIDENT_BYTES.labels(name).set(0)
+        logger.info("Unloaded model %s (%s, %.1f MB)", name, reason, entry.size / 1e6)
+        del entry
+        _release_memory()
+        return True
+
+    def unload_idle(self) -> List[str]:
+        """Unload models unused for longer than the idle timeout; returns their names."""
+        if self.idle_timeout <= 0:
+            return []
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [name for name, entry in self._entries.items()
+                    if entry.last_used < cutoff and name not in self._pinned]
+        return [name for name in idle if self.unload(name, "idle")]
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(entry.size for entry in self._entries.values())
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        now = time.monotonic()
+        with self._lock:
+            return {name: {"bytes": e.size, "idle_s": round(now - e.last_used, 1)} for name, e in self._entries.items()}
+
+    def _touch(self, name: str, entry: _Entry) -> None:
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(name)
+
+    def _evict_for(self, incoming: int, keep: str) -> None:
+        """Evict LRU models (never ``keep``) until resident + incoming fits the budget."""
+        if self.budget_bytes <= 0:
+            return
+        while self.resident_bytes + incoming > self.budget_bytes:
+            victim = next((name for name in self._entries if name != keep and name not in self._pinned), None)
+            if victim is None:
+                if keep in self._entries:
+                    logger.warning("Model %s alone (%.1f MB) exceeds the %.1f MB budget", keep,
+                                   self._entries[keep].size / 1e6, self.budget_bytes / 1e6)
+                return
+            self.unload(victim, "budget")
+
+    def _ensure_reaper(self) -> None:
+        if self.idle_timeout <= 0 or self._reaper is not None:
+            return
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap, name="model-reaper", daemon=True)
+                self._reaper.start()
+
+    def _after_fork(self) -> None:
+        # Only the forking thread survives: drop its locks' state and the reaper thread
+        self._lock = threading.RLock()
+        self._load_locks = {}
+        self._reaper = None
+
+    def _reap(self) -> None:
+        interval = max(1.0, min(60.0, self.idle_timeout / 2))
+        while True:
+            time.sleep(interval)
+            try:
+                self.unload_idle()
+            except Exception:
+                logger.exception("Idle model sweep failed")
+
+
+def _release_memory() -> None:
+    gc.collect()
+    try:
+        import sys
+        torch = sys.modules.get("torch")  # only if something already imported it
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+
+MODELS = ModelManager(int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024), MODEL_IDLE_TIMEOUT_S)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=MODELS._after_fork)
@@ -1,4 +1,4 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from datetime import datetime
 from bson import ObjectId
 from config import Config
@@ -81,10 +81,50 @@ class Candidate(MongoModel):
 class Job(MongoModel):
     collection = 'jobs'
 
+    @staticmethod
+    def _with_artifacts(data):
+        """Add precomputed JD artifacts (see ats_service.JobArtifacts) when a description is set."""
+        if data.get('description'):
+            from ats_service import prepare_job
+            data.update(prepare_job(data['description']).to_fields())
+        return data
+
+    @classmethod
+    def create(cls, data):
+        return super().create(cls._with_artifacts(data))
+
+    @classmethod
+    def update(cls, id, data):
+        if 'description' in data:
+            cls._with_artifacts(data)
+        return super().update(id, data)
+
+    @classmethod
+    def get_artifacts(cls, job):
+        """JobArtifacts for a job document, refreshed in place if the model version changed."""
+        from ats_service import JobArtifacts
+        if not job or not job.get('description'):
+            return None
+        artifacts = JobArtifacts.from_fields(
+            job['description'], job.get('description_norm'), job.get('jd_embedding'),
+            job.get('jd_skills'), job.get('artifacts_version')
+        )
+        if artifacts.is_stale or not artifacts.embedding.size:
+            fields = cls._with_artifacts({'description': job['description']})
+            cls.update(job['_id'], fields)
+            job.update(fields)
+            artifacts = cls.get_artifacts(job)
+        return artifacts
+
 
 class Application(MongoModel):
     collection = 'applications'
-    
+
+    @classmethod
+    def pending_ids(cls):
+        """Ids of applications still waiting to be scored (e.g. interrupted by a restart)."""
+        return [str(doc['_id']) for doc in db[cls.collection].find({'score_status': 'pending'}, {'_id': 1})]
+
     @classmethod
     def find_by_candidate_and_job(cls, candidate_id, job_id):
         return db[cls.collection].find_one({
@@ -143,3 +183,74 @@ class Application(MongoModel):
             return None
             
         return storage.get_file_info(application['resume_file_id'])
+
+
+class ResumeLshBucket(MongoModel):
+    """LSH band key -> application id (see dedup.py); unique on (band_key, application_id)."""
+    collection = 'resume_lsh'
+    _indexed = False
+
+    @classmethod
+    def ensure_indexes(cls):
+        """Create the unique (band_key, application_id) index; it also serves band_key lookups."""
+        db[cls.collection].create_index([("band_key", 1), ("application_id", 1)], unique=True)
+        cls._indexed = True
+
+    @classmethod
+    def candidate_ids(cls, band_keys, exclude=None):
+        cursor = db[cls.collection].find({"band_key": {"$in": list(band_keys)}}, {"application_id": 1})
+        return {doc["application_id"] for doc in cursor if doc["application_id"] != exclude}
+
+    @classmethod
+    def add(cls, application_id, band_keys):
+        """Upsert one row per band key, so a retried ingest does not write duplicates."""
+        if not cls._indexed:
+            cls.ensure_indexes()
+        ops = [
+            UpdateOne({"band_key": k, "application_id": application_id},
+                      {"$setOnInsert": {"created_at": datetime.utcnow()}}, upsert=True)
+            for k in band_keys
+        ]
+        if ops:
+            db[cls.collection].bulk_write(ops, ordered=False)
+
+
+class ScreeningResult(MongoModel):
+    """Memoized screening result keyed by (job_hash, resume_hash, scorer_version); see screening_memo.py."""
+    collection = 'screening_results'
+
+    @classmethod
+    def _ensure_index(cls):
+        db[cls.collection].create_index(
+            [("job_hash", 1), ("resume_hash", 1), ("scorer_version", 1)], unique=True
+        )
+
+    @classmethod
+    def lookup(cls, key):
+        """The stored result document for ``key``, or None (one indexed lookup)."""
+        from metrics import record_cache
+        job_hash, resume_hash, version = key
+        doc = db[cls.collection].find_one(
+            {"job_hash": job_hash, "resume_hash": resume_hash, "scorer_version": version}
+        )
+        record_cache("screening_result", doc is not None)
+        return doc
+
+    @classmethod
+    def save(cls, key, result):
+        """Upsert ``result`` under ``key``; returns the document id."""
+        import json
+        from screening_memo import dumps
+        cls._ensure_index()
+        job_hash, resume_hash, version = key
+        doc = db[cls.collection].find_one_and_update(
+            {"job_hash": job_hash, "resume_hash": resume_hash, "scorer_version": version},
+            {"$set": {"result": json.loads(dumps(result))}, "$setOnInsert": {"created_at": datetime.utcnow()}},
+            upsert=True, return_document=True, projection={"_id": 1},
+        )
+        return str(doc["_id"])
+
+    @classmethod
+    def prune(cls, keep_versions):
+        """Delete results computed with a scorer version not in ``keep_versions``."""
+        return db[cls.collection].delete_many({"scorer_version": {"$nin": list(keep_versions)}}).deleted_count
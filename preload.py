@@ -0,0 +1,68 @@
+"""Load models once in a pre-forking server's master so workers share the weights.
+
+Each worker of a multi-worker server otherwise loads its own copy of the
+embedding model (and of the HF chat model), so RAM grows linearly with the
+worker count. With ``PRELOAD_MODELS=1`` the master loads them before it forks
+(see gunicorn.conf.py); the forked workers then share the weight pages
+copy-on-write, and since inference only reads them they stay shared.
+
+``preload()`` also pins the models in the model manager (unloading a shared
+model in a worker frees nothing, reloading it makes a private copy) and calls
+``gc.freeze()`` so the workers' cyclic GC never writes to the headers of the
+preloaded objects, which would copy their pages one by one.
+
+The master must not run inference itself: OpenMP thread pools (torch) do not
+survive a fork, so a forked worker could hang on its first parallel op.
+``after_fork()`` gives each worker its own torch thread count
+(``TORCH_THREADS_PER_WORKER``, default: CPU count / number of workers) so the
+workers together do not oversubscribe the CPUs.
+
+    PRELOAD_MODELS=1 gunicorn -c gunicorn.conf.py app:app
+    python benchmarks/worker_rss.py --workers 4
+"""
+import gc
+import logging
+import os
+import sys
+import time
+from typing import List
+
+from model_manager import MODELS
+
+logger = logging.getLogger(__name__)
+
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "") == "1"
+PRELOAD_LLM = os.getenv("PRELOAD_LLM", os.getenv("ATS_WARMUP_LLM", "")) == "1"
+TORCH_THREADS_PER_WORKER = int(os.getenv("TORCH_THREADS_PER_WORKER", "0"))
+
+
+def preload(load_llm: bool = PRELOAD_LLM) -> List[str]:
+    """Load, pin and freeze the serving models in this (master) process; returns their names."""
+    import ats_service
+    import skill_matcher
+    from embeddings import embedder_key
+
+    started = time.perf_counter()
+    ats_service.warmup(load_llm=load_llm)
+    names = [embedder_key()]
+    if load_llm and MODELS.is_loaded(ats_service.hf_chat_key()):
+        names.append(ats_service.hf_chat_key())
+    if skill_matcher.SKILL_MATCHER == "semantic" and not skill_matcher.get_skill_matcher().load_cached():
+        # Encoding it here would run inference in the master; the first worker request writes the cache
+        logger.info("No cached skill matrix under %s; each worker encodes its own until the next start",
+                    skill_matcher.SKILL_CACHE_DIR)
+    for name in names:
+        MODELS.pin(name)
+    gc.collect()
+    gc.freeze()
+    logger.info("Preloaded %s in %.1fs (%.1f MB)", ", ".join(names), time.perf_counter() - started,
+                MODELS.resident_bytes / 1e6)
+    return names
+
+
+def after_fork(workers: int = 1) -> None:
+    """Per-worker setup after the fork (call from the server's post-fork hook)."""
+    threads = TORCH_THREADS_PER_WORKER or max(1, (os.cpu_count() or 1) // max(1, workers))
+    torch = sys.modules.get("torch")  # only if a preloaded model imported it
+    if torch is not None:
+        torch.set_num_threads(threads)
@@ -0,0 +1,113 @@
+"""Memoized screening results keyed by (JD hash, resume hash, scorer version).
+
+Screening the same resume against the same job description twice should not
+redo extraction, embedding and the LLM call. Results are stored under
+
+- ``job_hash``: SHA-256 of the whitespace-normalized JD text,
+- ``resume_hash``: SHA-256 of the resume file bytes,
+- ``scorer_version``: ``ats_service.scorer_version(mode)`` (embedding model,
+  skill rules, LLM backend, score rules, mode) or the backend screener's version.
+
+A change to any version component changes the key, so stale results are never
+returned; pruning just deletes rows with a version that is no longer current.
+
+The Flask app keeps results in its SQLite database (``ScreeningResult`` in
+app.py), the Mongo app in the ``screening_results`` collection; ``SqliteMemo``
+is a standalone store for the FastAPI backend, which has no database.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Union
+
+from metrics import record_cache
+from text_processing import process
+
+SCREENING_MEMO_PATH = os.getenv("SCREENING_MEMO_PATH", os.path.join(".cache", "screening_memo.sqlite3"))
+
+MemoKey = Tuple[str, str, str]  # (job_hash, resume_hash, scorer_version)
+
+
+def job_hash(job_text: str) -> str:
+    return process(job_text).sha256
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: Union[str, os.PathLike]) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dumps(result: Dict[str, Any]) -> str:
+    """Serialize a screening result (numpy scalars become floats, debug timings are dropped)."""
+    stored = {k: v for k, v in result.items() if k not in ("timings_ms", "queue", "result_id", "cached")}
+    return json.dumps(stored, default=float)
+
+
+class SqliteMemo:
+    """Standalone memo table in an SQLite file (used where there is no app database)."""
+
+    def __init__(self, path: str = SCREENING_MEMO_PATH, name: str = "screening_result"):
+        self.path = path
+        self.name = name
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS screening_result (id INTEGER PRIMARY KEY, job_hash TEXT NOT NULL, "
+                "resume_hash TEXT NOT NULL, scorer_version TEXT NOT NULL, result TEXT NOT NULL, created_at TEXT, "
+                "UNIQUE (job_hash, resume_hash, scorer_version))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: MemoKey) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """(id, result) for ``key``, or None."""
+        row = self._conn().execute(
+            "SELECT id, result FROM screening_result WHERE job_hash = ? AND resume_hash = ? AND scorer_version = ?",
+            key,
+        ).fetchone()
+        record_cache(self.name, row is not None)
+        return (row[0], json.loads(row[1])) if row else None
+
+    def get_by_id(self, result_id: int) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT result FROM screening_result WHERE id = ?", (result_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: MemoKey, result: Dict[str, Any]) -> int:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO screening_result (job_hash, resume_hash, scorer_version, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (job_hash, resume_hash, scorer_version) "
+                "DO UPDATE SET result = excluded.result",
+                (*key, dumps(result), datetime.utcnow().isoformat()),
+            )
+        return conn.execute(
+            "SELECT id FROM screening_result WHERE job_hash = ? AND resume_hash = ? AND scorer_version = ?", key
+        ).fetchone()[0]
+
+    def prune(self, keep_versions) -> int:
+        """Delete results computed with a scorer version not in ``keep_versions``."""
+        keep = list(keep_versions)
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                f"DELETE FROM screening_result WHERE scorer_version NOT IN ({','.join('?' * len(keep))})", keep
+            )
+        return cur.rowcount
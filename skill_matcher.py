@@ -0,0 +1,224 @@
+"""Semantic skill matching against a precomputed skill-embedding matrix.
+
+Exact string matching misses "Postgres" vs "PostgreSQL" or "ML" vs "machine
+learning". Here every surface form of every skill in ``SKILL_VOCABULARY`` is
+embedded once (cached on disk per embedding model version under
+``SKILL_CACHE_DIR``). A resume is split into short candidate phrases that are
+batch-encoded, and all phrases are scored against all skills with a single
+matrix multiply; a skill matches when any phrase reaches
+``SKILL_MATCH_THRESHOLD`` cosine. Only the phrase encoding costs anything per
+request.
+
+Enabled with ``SKILL_MATCHER=semantic`` (see ``ats_service.extract_skills``).
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from embeddings import current_version, get_embedder
+from metrics import Histogram, record_cache
+from text_processing import ProcessedText, process
+
+SKILL_MATCHER = os.getenv("SKILL_MATCHER", "exact")
+SKILL_MATCH_THRESHOLD = float(os.getenv("SKILL_MATCH_THRESHOLD", "0.75"))
+SKILL_MAX_PHRASES = int(os.getenv("SKILL_MAX_PHRASES", "384"))
+SKILL_CACHE_DIR = os.getenv("SKILL_CACHE_DIR", os.path.join(".cache", "skills"))
+
+SKILL_PHRASES = Histogram("skill_match_phrases", "Candidate phrases encoded per text.",
+                          buckets=(8, 16, 32, 64, 128, 256, 384, 512, 1024))
+
+# canonical skill -> other surface forms (abbreviations, spellings, versions)
+SKILL_VOCABULARY: Dict[str, Tuple[str, ...]] = {
+    "python": ("python3",),
+    "java": ("java se", "jvm"),
+    "javascript": ("js", "ecmascript", "es6"),
+    "typescript": (),
+    "c++": ("cpp",),
+    "c#": ("csharp", "c sharp"),
+    "go": ("golang",),
+    "ruby": ("ruby on rails", "rails"),
+    "php": ("laravel",),
+    "swift": ("ios development",),
+    "kotlin": ("android development",),
+    "sql": ("structured query language", "t-sql", "pl/sql"),
+    "django": ("django rest framework",),
+    "flask": (),
+    "fastapi": ("fast api",),
+    "react": ("reactjs", "react.js"),
+    "angular": ("angularjs",),
+    "vue": ("vuejs", "vue.js"),
+    "nextjs": ("next.js",),
+    "node": ("node.js", "nodejs"),
+    "express": ("express.js", "expressjs"),
+    "spring": ("spring boot",),
+    "dotnet": (".net", "asp.net"),
+    "pandas": ("dataframes",),
+    "numpy": (),
+    "scikit-learn": ("sklearn", "scikit learn"),
+    "pytorch": (),
+    "tensorflow": ("keras",),
+    "machine learning": ("ml",),
+    "deep learning": ("neural networks",),
+    "nlp": ("natural language processing",),
+    "data analysis": ("data analytics",),
+    "data science": (),
+    "spacy": (),
+    "postgresql": ("postgres", "psql"),
+    "mysql": ("mariadb",),
+    "mongodb": ("mongo",),
+    "redis": (),
+    "aws": ("amazon web services", "ec2"),
+    "azure": ("microsoft azure",),
+    "gcp": ("google cloud", "google cloud platform"),
+    "docker": ("containerization",),
+    "kubernetes": ("k8s",),
+    "ci/cd": ("continuous integration", "continuous delivery", "github actions", "jenkins"),
+    "devops": (),
+    "rest": ("rest api", "restful", "restful apis"),
+    "graphql": (),
+    "microservices": ("microservice architecture",),
+    "git": ("github", "gitlab", "version control"),
+    "linux": ("unix", "bash"),
+    "agile": ("scrum", "kanban"),
+}
+
+_SPLIT = re.compile(r"[\n,;|•·()\[\]:]+|\s+(?:and|with|using|in|of|for|on|at|to)\s+|\.\s+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+
+def vocabulary_version() -> str:
+    payload = json.dumps(SKILL_VOCABULARY, sort_keys=True).encode()
+    return hashlib.sha1(payload).hexdigest()[:10]
+
+
+def candidate_phrases(text: Union[str, ProcessedText], max_phrases: int = SKILL_MAX_PHRASES) -> List[str]:
+    """Short noun-phrase-like spans: list items and clause fragments of up to three
+    words, plus the unigrams/bigrams of longer fragments. Deduplicated, in order."""
+    seen: Dict[str, None] = {}
+    for segment in _SPLIT.split(process(text).lower):
+        words = _WORD.findall(segment)
+        if not words:
+            continue
+        if len(words) <= 3:
+            seen.setdefault(" ".join(words))
+        else:
+            for n in (1, 2):
+                for i in range(len(words) - n + 1):
+                    seen.setdefault(" ".join(words[i:i + n]))
+        if len(seen) >= max_phrases:
+            break
+    return list(seen)[:max_phrases]
+
+
+class SkillMatcher:
+    """Skill vocabulary embedded once; ``match`` costs one phrase batch-encode + one matmul."""
+
+    def __init__(self, vocabulary: Dict[str, Tuple[str, ...]] = SKILL_VOCABULARY,
+                 threshold: float = SKILL_MATCH_THRESHOLD, cache_dir: Optional[str] = SKILL_CACHE_DIR):
+        self.vocabulary = vocabulary
+        self.threshold = threshold
+        self.cache_dir = cache_dir
+        self.surface_forms: List[str] = []
+        self.canonical: List[str] = []
+        for skill, aliases in vocabulary.items():
+            for form in (skill,) + tuple(aliases):
+                self.surface_forms.append(form)
+                self.canonical.append(skill)
+        self._alias_to_skill = dict(zip(self.surface_forms, self.canonical))
+        self._exact = re.compile(
+            r"(?<![a-z0-9])(" + "|".join(re.escape(f) for f in sorted(self.surface_forms, key=len, reverse=True))
+            + r")(?![a-z0-9+#])"
+        )
+        self._matrices: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def skill_matrix(self) -> np.ndarray:
+        """(surface forms, dim) unit vectors for the current embedder, from memory, disk or a fresh encode."""
+        version = current_version()
+        matrix = self._matrices.get(version)
+        record_cache("skill_matrix", matrix is not None)
+        if matrix is not None:
+            return matrix
+        with self._lock:
+            matrix = self._matrices.get(version)
+            if matrix is None:
+                matrix = self._load_or_encode(version)
+                self._matrices[version] = matrix
+        return matrix
+
+    def _cache_path(self, version: str) -> Optional[str]:
+        key = hashlib.sha1(f"{version}|{vocabulary_version()}".encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key}.npy") if self.cache_dir else None
+
+    def _load_cached(self, version: str) -> Optional[np.ndarray]:
+        path = self._cache_path(version)
+        if path and os.path.exists(path):
+            matrix = np.load(path)
+            if matrix.shape[0] == len(self.surface_forms):
+                return matrix
+        return None
+
+    def load_cached(self) -> bool:
+        """Load the current embedder's matrix from the disk cache only (no encode).
+
+        Used by preload.preload() so a pre-forking master holds the matrix and the workers
+        share it; False when nothing is cached yet (each worker then encodes its own).
+        """
+        version = current_version()
+        with self._lock:
+            if version not in self._matrices:
+                matrix = self._load_cached(version)
+                if matrix is None:
+                    return False
+                self._matrices[version] = matrix
+        return True
+
+    def _load_or_encode(self, version: str) -> np.ndarray:
+        matrix = self._load_cached(version)
+        if matrix is not None:
+            return matrix
+        path = self._cache_path(version)
+        matrix = np.asarray(get_embedder().encode(self.surface_forms), dtype=np.float32)
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"  # unique per writer
+            np.save(tmp, matrix)
+            os.replace(tmp, path)
+        return matrix
+
+    def exact(self, text: Union[str, ProcessedText]) -> Set[str]:
+        """Canonical skills whose name or alias appears verbatim (word-bounded)."""
+        return {self._alias_to_skill[m] for m in self._exact.findall(process(text).lower)}
+
+    def match(self, text: Union[str, ProcessedText]) -> Set[str]:
+        """Canonical skills found in ``text``: exact alias hits plus semantic matches."""
+        doc = process(text)
+        found = self.exact(doc)
+        phrases = candidate_phrases(doc)
+        SKILL_PHRASES.observe(len(phrases))
+        if not phrases:
+            return found
+        matrix = self.skill_matrix()
+        vectors = np.asarray(get_embedder().encode(phrases), dtype=np.float32)
+        best = (vectors @ matrix.T).max(axis=0)  # best phrase similarity per surface form
+        found.update(self.canonical[i] for i in np.flatnonzero(best >= self.threshold))
+        return found
+
+
+_matcher: Optional[SkillMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """The process-wide matcher; concurrent first calls share one instance (and one vocabulary encode)."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher()
+    return _matcher
@@ -0,0 +1,139 @@
+"""Extractive summaries for the Job Summary / Resume Summary fields.
+
+``summarize`` picks whole sentences from the text itself. All candidate
+sentences (see ``ProcessedText.segments``) are encoded in one batch with the
+already-loaded embedding model. Sentences are then picked greedily by maximal
+marginal relevance: similarity to the document centroid (how central a
+sentence is) minus ``SUMMARY_MMR_LAMBDA``-weighted similarity to sentences
+already picked (redundancy). Picking stops when nothing else fits in the
+character budget. The picked sentences are returned in document order.
+
+Contact lines (emails, phone numbers, URLs) and fragments shorter than
+``SUMMARY_MIN_WORDS`` words are never candidates. Texts too short to
+choose from, or with ``SUMMARIZER=lead``, get the first sentences up to the
+budget instead. Recent summaries are cached by text hash, so a JD screened
+against many resumes is summarized once.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from embeddings import current_version, get_embedder
+from metrics import Histogram, record_cache
+from text_processing import ProcessedText, process
+
+SUMMARIZER = os.getenv("SUMMARIZER", "extractive")  # or "lead"
+SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "600"))
+SUMMARY_MMR_LAMBDA = float(os.getenv("SUMMARY_MMR_LAMBDA", "0.7"))
+SUMMARY_MIN_WORDS = int(os.getenv("SUMMARY_MIN_WORDS", "4"))
+SUMMARY_MAX_CANDIDATES = int(os.getenv("SUMMARY_MAX_CANDIDATES", "200"))
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "256"))
+# Bump when candidate selection or ranking changes
+SUMMARY_RULES_VERSION = "1"
+
+SUMMARY_CANDIDATES = Histogram("summary_candidate_sentences", "Sentences encoded per extractive summary.",
+                               buckets=(4, 8, 16, 32, 64, 128, 200, 400))
+
+_CONTACT = re.compile(r"@|https?://|www\.|linkedin\.com|github\.com|\+\d[\d ().-]{6,}\d|\(?\d{3}\)?[ .-]\d{3}[ .-]\d{4}",
+                      re.IGNORECASE)
+_END = (".", "!", "?")
+
+_cache: "OrderedDict[Tuple[str, str, int], str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def version() -> str:
+    """Identifies how summaries are produced (part of ats_service.scorer_version)."""
+    if SUMMARIZER == "lead":
+        return f"lead@{SUMMARY_MAX_CHARS}"
+    return f"extractive-{SUMMARY_RULES_VERSION}@{SUMMARY_MAX_CHARS}/{SUMMARY_MMR_LAMBDA:g}"
+
+
+def lead(text: Union[str, ProcessedText], max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """The first sentences of ``text`` up to ``max_chars``."""
+    out = []
+    total = 0
+    # Truncate at sentence boundary if possible
+    for s in process(text).sentences:
+        if total + len(s) > max_chars and out:
+            break
+        out.append(s)
+        total += len(s) + 1
+        if total >= max_chars:
+            break
+    return " ".join(out)[:max_chars]
+
+
+def candidates(doc: ProcessedText, max_chars: int = SUMMARY_MAX_CHARS) -> List[str]:
+    """Distinct sentences eligible for a summary, in document order (list items get a full stop)."""
+    seen = {}
+    for sentence in doc.segments:
+        if (len(sentence) >= max_chars or sentence.count(" ") + 1 < SUMMARY_MIN_WORDS
+                or _CONTACT.search(sentence)):
+            continue
+        seen.setdefault(sentence if sentence.endswith(_END) else sentence + ".")
+        if len(seen) >= SUMMARY_MAX_CANDIDATES:
+            break
+    return list(seen)
+
+
+def select(vectors: np.ndarray, lengths: List[int], max_chars: int, mmr_lambda: float = SUMMARY_MMR_LAMBDA) -> List[int]:
+    """Indices (ascending) of the sentences picked by MMR within ``max_chars``.
+
+    ``vectors`` are unit rows, one per sentence; the centroid is their normalized mean.
+    """
+    centroid = vectors.mean(axis=0)
+    centroid /= max(float(np.linalg.norm(centroid)), 1e-12)
+    relevance = vectors @ centroid
+    sizes = np.asarray(lengths)
+    redundancy = np.zeros(len(lengths), dtype=np.float32)  # max similarity to a picked sentence
+    available = np.ones(len(lengths), dtype=bool)
+    picked: List[int] = []
+    budget = max_chars
+    while True:
+        available &= sizes + (1 if picked else 0) <= budget
+        if not available.any():
+            break
+        mmr = mmr_lambda * relevance - (1.0 - mmr_lambda) * redundancy
+        best = int(np.argmax(np.where(available, mmr, -np.inf)))
+        picked.append(best)
+        available[best] = False
+        budget -= lengths[best] + (1 if len(picked) > 1 else 0)
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+    return sorted(picked)
+
+
+def summarize(text: Union[str, ProcessedText], max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """Extractive summary of ``text`` within ``max_chars`` (see module docstring)."""
+    doc = process(text)
+    if SUMMARIZER == "lead":
+        return lead(doc, max_chars)
+    # Keyed on the lines, not just the normalized text: line breaks decide the candidates
+    key = (hashlib.sha256(doc.lower.encode("utf-8") + doc.normalized.encode("utf-8")).hexdigest(),
+           current_version(), max_chars)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+    record_cache("summary", cached is not None)
+    if cached is not None:
+        return cached
+    sentences = candidates(doc, max_chars)
+    SUMMARY_CANDIDATES.observe(len(sentences))
+    if len(sentences) < 2:
+        summary = lead(doc, max_chars)
+    else:
+        vectors = np.asarray(get_embedder().encode(sentences), dtype=np.float32)
+        picked = select(vectors, [len(s) for s in sentences], max_chars)
+        summary = " ".join(sentences[i] for i in picked) if picked else lead(doc, max_chars)
+    with _cache_lock:
+        _cache[key] = summary
+        while len(_cache) > SUMMARY_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return summary
+
@@ -0,0 +1,87 @@
+"""Shared text preprocessing: normalize once, then read lines, sentences and tokens from it.
+
+``process(text)`` returns a ``ProcessedText``. One pass over the raw text
+splits it into lines and collapses whitespace within each line, which gives
+both views the pipeline needs:
+
+- ``normalized``: the lines joined by single spaces (what embeddings encode
+  and what screening_memo hashes, identical to collapsing all whitespace),
+- ``lower``: the lines lowercased and joined by newlines (what skill matching
+  reads; list items stay separate lines).
+
+``sentences``, ``segments``, ``tokens`` and ``sha256`` are computed from those on first use
+and kept on the object, so the scorer, summaries, skill matching and the memo
+all share one copy. Patterns are compiled once at import.
+"""
+import hashlib
+import re
+from functools import cached_property
+from typing import List, Union
+
+_SENTENCE_END = re.compile(r"[.!?] ")
+# Words, versions and tech names ("c++", "c#", "node.js", "3.11"); shared with bm25_index
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+def _split_sentences(text: str) -> List[str]:
+    if not text:
+        return []
+    out, start = [], 0
+    for m in _SENTENCE_END.finditer(text):
+        out.append(text[start:m.start() + 1])
+        start = m.end()
+    out.append(text[start:])
+    return out
+
+
+class ProcessedText:
+    """A text with its normalized forms; cheap to pass around, derived views are cached."""
+
+    def __init__(self, raw: str):
+        self.raw = raw or ""
+        # str.split() collapses whitespace in C, several times faster than a \s+ regex
+        self.lines: List[str] = [line for line in (" ".join(part.split()) for part in self.raw.split("\n")) if line]
+        self.normalized = " ".join(self.lines)
+
+    @cached_property
+    def lower(self) -> str:
+        return "\n".join(self.lines).lower()
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """Sentences of ``normalized``, split after ., ! and ?."""
+        return _split_sentences(self.normalized)
+
+    @cached_property
+    def segments(self) -> List[str]:
+        """Sentences within each line, so list items and headings stay separate units."""
+        return [sentence for line in self.lines for sentence in _split_sentences(line)]
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        return TOKEN.findall(self.lower)
+
+    @cached_property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.normalized.encode("utf-8")).hexdigest()
+
+    def __bool__(self) -> bool:
+        return bool(self.normalized)
+
+    def __len__(self) -> int:
+        return len(self.normalized)
+
+    def __repr__(self) -> str:
+        return f"ProcessedText({self.normalized[:40]!r}{'...' if len(self.normalized) > 40 else ''})"
+
+
+def process(text: Union[str, ProcessedText, None]) -> ProcessedText:
+    """``text`` as a ProcessedText (returned as-is if it already is one)."""
+    if isinstance(text, ProcessedText):
+        return text
+    return ProcessedText(text or "")
+
+
+def normalize(text: Union[str, ProcessedText, None]) -> str:
+    """Whitespace collapsed to single spaces, stripped."""
+    return process(text).normalized